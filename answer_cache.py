@@ -0,0 +1,108 @@
+"""
+Answer Cache for Supply Chain Validator
+Reuses LLM-generated answers when the same question meets the same evidence
+
+Answers are keyed by a hash of the normalized question and a hash of the
+serialized retrieval results, so any change in what the graph returns yields a
+different key. Each entry also remembers the node ids it was built from; when
+the database reports that one of those nodes changed, the entry is dropped.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from plan_cache import normalize_question
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class AnswerCache:
+    """LRU cache of answers keyed by (question hash, result-set hash), invalidated per node"""
+    
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # {(question hash, results hash): answer}
+        self._by_node = {}  # {node id: {key}}
+        self._nodes = {}  # {key: (node id, ...)}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._lock = threading.Lock()
+    
+    def key(self, question: str, results_json: str):
+        return (_digest(normalize_question(question)), _digest(results_json))
+    
+    def get(self, question: str, results_json: str) -> Optional[str]:
+        """Cached answer for a question over exactly these results, or None"""
+        key = self.key(question, results_json)
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return answer
+    
+    def put(self, question: str, results_json: str, answer: str, node_ids: Iterable[str] = ()):
+        """Store an answer; node_ids are the graph nodes whose mutation invalidates it"""
+        if self.maxsize <= 0:
+            return
+        key = self.key(question, results_json)
+        node_ids = tuple(set(node_ids))
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = answer
+            self._nodes[key] = node_ids
+            for node_id in node_ids:
+                self._by_node.setdefault(node_id, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+    
+    def _drop(self, key):
+        if self._entries.pop(key, None) is None:
+            return
+        for node_id in self._nodes.pop(key, ()):
+            keys = self._by_node.get(node_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_node[node_id]
+    
+    def invalidate(self, node_ids: Optional[Iterable[str]] = None):
+        """Drop every answer built from any of node_ids (all answers if None)"""
+        with self._lock:
+            if node_ids is None:
+                self._invalidations += len(self._entries)
+                self._entries.clear()
+                self._by_node.clear()
+                self._nodes.clear()
+                return
+            for node_id in node_ids:
+                for key in list(self._by_node.get(node_id, ())):
+                    self._drop(key)
+                    self._invalidations += 1
+    
+    def clear(self):
+        """Drop all answers and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._by_node.clear()
+            self._nodes.clear()
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Get answer cache statistics"""
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'invalidations': self._invalidations,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
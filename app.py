@@ -17,6 +17,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from graph_database import GraphDatabase
 from populate_data import populate_supply_chain_data
 from graph_rag_engine import GraphRAGEngine
+from plan_cache import PlanCache
+from semantic_cache import SemanticCache
+from result_packer import ResultPacker
 from certification_validator import CertificationValidator
 
 # Page configuration
@@ -77,8 +80,16 @@ st.markdown("""
 if 'db' not in st.session_state:
     with st.spinner("🔄 Initializing supply chain database..."):
         st.session_state.db = GraphDatabase()
-        populate_supply_chain_data(st.session_state.db)
-        st.session_state.engine = GraphRAGEngine(st.session_state.db)
+        populate_supply_chain_data(st.session_state.db, quiet=True)
+        # Set PLAN_CACHE_PATH to keep query plans across restarts; SEMANTIC_CACHE_THRESHOLD (0-1)
+        # sets how closely a re-phrased question must match an earlier one to reuse its answer;
+        # ANSWER_TOKEN_BUDGET caps the query results sent to the model for each answer
+        st.session_state.engine = GraphRAGEngine(
+            st.session_state.db.freeze(),
+            plan_cache=PlanCache(path=os.getenv('PLAN_CACHE_PATH')),
+            semantic_cache=SemanticCache(threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.7'))),
+            result_packer=ResultPacker(token_budget=int(os.getenv('ANSWER_TOKEN_BUDGET', '4000')))
+        )
         st.session_state.validator = CertificationValidator(st.session_state.db)
         st.session_state.query_history = []
 
@@ -96,12 +107,12 @@ with st.sidebar:
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Nodes", schema['node_count'])
-        st.metric("Suppliers", len(st.session_state.db.get_all_nodes('Supplier')))
-        st.metric("Materials", len(st.session_state.db.get_all_nodes('Material')))
+        st.metric("Suppliers", schema['label_counts'].get('Supplier', 0))
+        st.metric("Materials", schema['label_counts'].get('Material', 0))
     with col2:
         st.metric("Relationships", schema['relationship_count'])
-        st.metric("Factories", len(st.session_state.db.get_all_nodes('Factory')))
-        st.metric("Certifications", len(st.session_state.db.get_all_nodes('Certification')))
+        st.metric("Factories", schema['label_counts'].get('Factory', 0))
+        st.metric("Certifications", schema['label_counts'].get('Certification', 0))
     
     st.markdown("---")
     st.markdown("### 🎯 Features")
@@ -161,8 +172,25 @@ with tab1:
             st.rerun()
     
     if query_button and query:
-        with st.spinner("🤔 Analyzing your question..."):
-            result = st.session_state.engine.query(query)
+        with st.container():
+            # Stream the answer: show progress while planning and retrieving, then tokens as they arrive
+            st.markdown("### 💬 Answer")
+            progress = st.empty()
+            answer_box = st.empty()
+            progress.info("🤔 Analyzing your question...")
+            answer = ''
+            for event in st.session_state.engine.query_stream(query):
+                if event['type'] == 'plan':
+                    progress.info(f"🔎 Searching the supply chain graph (plan from {event['plan_source']})...")
+                elif event['type'] == 'results':
+                    progress.info(f"✍️ Writing the answer from {event['result_count']} results...")
+                elif event['type'] == 'token':
+                    answer += event['text']
+                    answer_box.success(answer)
+                else:
+                    result = event['result']
+            progress.empty()
+            answer_box.success(result['answer'])
             
             # Save to history
             st.session_state.query_history.append({
@@ -171,9 +199,12 @@ with tab1:
                 'result': result
             })
             
-            # Display answer
-            st.markdown("### 💬 Answer")
-            st.success(result['answer'])
+            if result['packing']['truncated_rows']:
+                st.caption(f"Answer based on the {result['packing']['rows']} most relevant of "
+                           f"{result['result_count']} results")
+            if result['semantic_match']:
+                st.caption(f"Answered like the earlier question \"{result['semantic_match']['question']}\" "
+                           f"(similarity {result['semantic_match']['similarity']:.2f})")
             
             # Display query plan
             with st.expander("🔧 Query Analysis"):
@@ -212,6 +243,17 @@ with tab1:
                     st.json(result['raw_results'])
                 else:
                     st.warning("No data found")
+            
+            # Display stage timings and token usage
+            with st.expander(f"⏱️ Performance ({result['timings_ms']['total']:.0f} ms)"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**Stage timings (ms):**")
+                    st.json({stage: round(ms, 2) for stage, ms in result['timings_ms'].items()})
+                with col2:
+                    st.markdown(f"**Query plan from:** {result['plan_source']}")
+                    st.markdown("**LLM tokens:**")
+                    st.json(result['token_usage'])
 
 # Tab 2: Validate Certifications
 with tab2:
@@ -401,12 +443,24 @@ with tab4:
     }
     
     label = label_map[data_type]
-    nodes = st.session_state.db.get_all_nodes(label)
+    total = st.session_state.db.count_nodes(label)
     
-    st.markdown(f"#### {data_type} ({len(nodes)} total)")
+    st.markdown(f"#### {data_type} ({total} total)")
+    
+    # Page through the label instead of loading it all
+    page_size = 20
+    page_count = max(1, -(-total // page_size))
+    page = 1
+    if page_count > 1:
+        page = st.number_input(f"Page (1-{page_count})", min_value=1, max_value=page_count, value=1, step=1)
+    rows = st.session_state.db.execute_cypher_iter(
+        f"MATCH (n:{label}) RETURN n SKIP $skip LIMIT $limit",
+        {'skip': (page - 1) * page_size, 'limit': page_size}
+    )
     
     # Display as cards
-    for node in nodes:
+    for row in rows:
+        node = row['n']
         with st.expander(f"📌 {node.get('name', node.get('id'))}"):
             # Display all properties
             for key, value in node.items():
@@ -0,0 +1,428 @@
+"""
+Benchmark Suite for Supply Chain Validator
+Latency percentiles and peak memory for the graph database and GraphRAG engine
+
+Runs against seeded synthetic graphs (synthetic_data.py) with a deterministic
+fake LLM, so results are reproducible and need no API key. Results can be saved
+as a baseline JSON and later runs compared against it:
+
+    python benchmark.py --scale 10 --save-baseline baseline.json
+    python benchmark.py --scale 10 --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Any, Optional
+import numpy as np
+
+from graph_database import GraphDatabase
+from graph_rag_engine import GraphRAGEngine
+from plan_cache import PlanCache
+from answer_cache import AnswerCache
+from semantic_cache import SemanticCache
+from lineage import build_trace
+from synthetic_data import populate_synthetic_data, generate_nodes, generate_relationships, scale_sizes, node_id
+
+# Query plans the fake LLM returns, keyed by the intent they exercise
+QUERY_PLANS = {
+    'supplier': {
+        "intent": "find suppliers",
+        "entities": ["Supplier"],
+        "filters": {"country": "Italy"},
+        "relationships": ["PROVIDES"],
+        "return_fields": ["name", "location"]
+    },
+    'material': {
+        "intent": "trace materials",
+        "entities": ["Material"],
+        "filters": {"type": "Leather"},
+        "relationships": ["PROVIDES", "SUPPLIED_TO"],
+        "return_fields": ["name", "origin"]
+    },
+    'factory': {
+        "intent": "find factory",
+        "entities": ["Factory"],
+        "filters": {"location": "Florence"},
+        "relationships": ["MANUFACTURES"],
+        "return_fields": ["name", "certifications"]
+    },
+    'certification': {
+        "intent": "verify certifications",
+        "entities": ["Certification"],
+        "filters": {"type": "Origin"},
+        "relationships": ["HAS_CERTIFICATION"],
+        "return_fields": ["name", "valid_until"]
+    },
+    'collection': {
+        "intent": "list collection",
+        "entities": ["Collection"],
+        "filters": {"year": {"gte": "2020", "lte": "2022"}},
+        "relationships": ["PART_OF"],
+        "return_fields": ["name", "brand"]
+    },
+    'product': {
+        "intent": "find products",
+        "entities": ["Product"],
+        "filters": {"category": "Handbag"},
+        "relationships": [],
+        "return_fields": ["name", "price_eur"]
+    },
+}
+
+# Questions for the end-to-end query benchmark; the fake LLM maps each to a plan by keyword
+QUESTIONS = [
+    "Which suppliers in Italy provide our materials?",
+    "Where does our leather material come from?",
+    "Which factory in Florence manufactures our goods?",
+    "Which certification proves origin?",
+    "What is in the 2020-2022 collection?",
+    "Show me all handbag products",
+]
+
+# Questions the rule-based planner answers without an LLM plan
+RULE_QUESTIONS = [
+    "List all suppliers in Florence",
+    "Show me all handbag products",
+    "Which factories are in Italy?",
+    "Collections from 2024",
+]
+
+# Simulated model round trip (seconds) for the end-to-end query cases
+LLM_LATENCY = 0.005
+
+
+class FakeLLM:
+    """Deterministic stand-in for the chat model: plans by keyword, answers by result size.
+
+    Token usage is estimated at four characters per token. latency (seconds)
+    simulates the network round trip of every call.
+    """
+    
+    def __init__(self, latency: float = 0.0):
+        self.calls = 0
+        self.latency = latency
+    
+    def invoke(self, messages) -> SimpleNamespace:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._reply(messages)
+    
+    async def ainvoke(self, messages) -> SimpleNamespace:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._reply(messages)
+    
+    def stream(self, messages):
+        """Word-by-word chunks of the reply; the last chunk carries the token usage"""
+        reply = self.invoke(messages)
+        for piece in re.findall(r'\S+\s*', reply.content):
+            yield SimpleNamespace(content=piece, usage_metadata=None)
+        yield SimpleNamespace(content='', usage_metadata=reply.usage_metadata)
+    
+    def _reply(self, messages) -> SimpleNamespace:
+        self.calls += 1
+        prompt = messages[-1].content
+        if 'Response (JSON only):' in prompt:
+            question = prompt.split('Question:', 1)[1].split('\n', 1)[0].lower()
+            plan = next((plan for keyword, plan in QUERY_PLANS.items() if keyword in question), None)
+            content = json.dumps(plan) if plan else 'not json'
+        else:
+            results = prompt.split('Query Results:', 1)[-1]
+            content = f"Answer based on {len(results)} characters of results."
+        usage = {'input_tokens': len(prompt) // 4, 'output_tokens': len(content) // 4}
+        return SimpleNamespace(content=content, usage_metadata=usage)
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.array(samples) * 1000
+    return {
+        'n': len(samples),
+        'mean_ms': float(values.mean()),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+    }
+
+
+def measure(fn: Callable[[int], Any], iterations: int, ops: int = 1) -> Dict[str, float]:
+    """Time fn(i) for each iteration, then rerun one iteration under tracemalloc for peak memory.
+
+    ops is the number of operations one call performs; latencies are reported
+    per operation and ops_per_sec is derived from the total time.
+    """
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - start) / ops)
+    stats = _percentiles(samples)
+    stats['ops_per_sec'] = len(samples) / sum(samples) if sum(samples) else 0.0
+    
+    tracemalloc.start()
+    try:
+        fn(iterations)
+        stats['peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+    return stats
+
+
+class BenchmarkSuite:
+    """Benchmarks over one synthetic graph; each case is a method named bench_<case>"""
+    
+    def __init__(self, scale: float = 1.0, seed: int = 42, iterations: int = 50):
+        self.scale = scale
+        self.seed = seed
+        self.iterations = iterations
+        self.rng = random.Random(seed)
+        self.sizes = scale_sizes(scale)
+        self.db = populate_synthetic_data(GraphDatabase(), scale, seed, quiet=True)
+        self.engine = GraphRAGEngine(self.db, llm=FakeLLM())
+    
+    def _random_id(self, label: str) -> str:
+        return node_id(label, self.rng.randrange(self.sizes[label]))
+    
+    def cases(self) -> List[str]:
+        return [name[len('bench_'):] for name in dir(self) if name.startswith('bench_')]
+    
+    def run(self, only: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        results = {}
+        for case in self.cases():
+            if only and not any(pattern in case for pattern in only):
+                continue
+            results.update(getattr(self, f'bench_{case}')())
+        return results
+    
+    # ---- GraphDatabase ----
+    
+    def bench_create_node(self):
+        nodes = list(generate_nodes(self.scale, self.seed + 1))
+        batch = max(1, len(nodes) // self.iterations)
+        
+        def run(i):
+            db = GraphDatabase()
+            for label, properties in nodes[:batch]:
+                db.create_node(label, properties)
+        return {'create_node': measure(run, self.iterations, batch)}
+    
+    def bench_create_relationship(self):
+        edges = list(generate_relationships(self.scale, self.seed))
+        batch = max(1, len(edges) // self.iterations)
+        db = GraphDatabase()
+        db.bulk_load(generate_nodes(self.scale, self.seed))
+        
+        def run(i):
+            start = (i * batch) % len(edges)
+            for from_id, to_id, rel_type, properties in edges[start:start + batch]:
+                db.create_relationship(from_id, to_id, rel_type, properties)
+        return {'create_relationship': measure(run, self.iterations, batch)}
+    
+    def bench_bulk_load(self):
+        nodes = list(generate_nodes(self.scale, self.seed))
+        edges = list(generate_relationships(self.scale, self.seed))
+        return {'bulk_load': measure(lambda i: GraphDatabase().bulk_load(nodes, edges), 3, len(nodes) + len(edges))}
+    
+    def bench_execute_cypher(self):
+        db = self.db
+        db.clear_query_cache()
+        node_query = 'MATCH (s:Supplier {id: $id}) RETURN s'
+        rel_query = 'MATCH (s:Supplier)-[:PROVIDES]->(m:Material {id: $id}) RETURN s, m'
+        path_query = 'MATCH (s:Supplier)-[:PROVIDES]->(m:Material)-[:SUPPLIED_TO]->(f:Factory {id: $id}) RETURN s, m, f'
+        return {
+            'execute_cypher[node]': measure(
+                lambda i: db.execute_cypher(node_query, {'id': self._random_id('Supplier')}), self.iterations),
+            'execute_cypher[relationship]': measure(
+                lambda i: db.execute_cypher(rel_query, {'id': self._random_id('Material')}), self.iterations),
+            'execute_cypher[path]': measure(
+                lambda i: db.execute_cypher(path_query, {'id': self._random_id('Factory')}), self.iterations),
+        }
+    
+    def bench_get_all_nodes(self):
+        return {
+            f'get_all_nodes[{label}]': measure(lambda i: self.db.get_all_nodes(label), max(3, self.iterations // 10))
+            for label in ('Supplier', 'Product')
+        }
+    
+    def bench_json_io(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, 'graph.json')
+            jsonl_path = os.path.join(tmp, 'graph.jsonl')
+            results = {
+                'export_to_json': measure(lambda i: self.db.export_to_json(json_path), 3),
+                'import_from_json': measure(lambda i: GraphDatabase().import_from_json(json_path), 3),
+                'export_jsonl': measure(lambda i: self.db.export_jsonl(jsonl_path), 3),
+                'import_jsonl': measure(lambda i: GraphDatabase().import_jsonl(jsonl_path), 3),
+            }
+        return results
+    
+    # ---- GraphRAGEngine ----
+    
+    def bench_execute_query_plan(self):
+        iterations = max(3, self.iterations // 5)
+        return {
+            f'execute_query_plan[{intent}]': measure(lambda i: self.engine._execute_query_plan(plan), iterations)
+            for intent, plan in QUERY_PLANS.items()
+        }
+    
+    def bench_execute_query_plan_fanout(self):
+        # One plan touching every label, on a frozen snapshot
+        plan = {"intent": "overview", "entities": list(scale_sizes(1)), "filters": {},
+                "relationships": ["PROVIDES", "SUPPLIED_TO"], "return_fields": []}
+        engine = GraphRAGEngine(self.db.freeze(), llm=FakeLLM())
+        iterations = max(3, self.iterations // 10)
+        return {'execute_query_plan[all labels, snapshot]': measure(
+            lambda i: engine._execute_query_plan(plan), iterations)}
+    
+    def bench_filter_nodes(self):
+        # A substring filter over the largest label, with no index to narrow it
+        filters = {"category": "bag"}
+        snapshot = GraphRAGEngine(self.db.freeze(), llm=FakeLLM())
+        iterations = max(3, self.iterations // 10)
+        return {
+            'filter_nodes[Product]': measure(lambda i: self.engine._filter_nodes('Product', filters), iterations),
+            'filter_nodes[Product, snapshot]': measure(
+                lambda i: snapshot._filter_nodes('Product', filters), iterations),
+        }
+    
+    def bench_get_node_relationships(self):
+        types = ['PROVIDES', 'SUPPLIED_TO', 'HAS_CERTIFICATION']
+        return {'get_node_relationships': measure(
+            lambda i: self.engine._get_node_relationships(self._random_id('Material'), types), self.iterations)}
+    
+    def bench_trace_supply_chain(self):
+        self.engine.lineage_view.materialize()
+        return {
+            'trace_supply_chain[build]': measure(
+                lambda i: build_trace(self.db, self._random_id('Product')), self.iterations),
+            'trace_supply_chain': measure(
+                lambda i: self.engine.trace_supply_chain(self._random_id('Product')), self.iterations),
+        }
+    
+    def bench_query(self):
+        # The model round trip is simulated so the cases show what each cache saves
+        iterations = max(len(QUESTIONS), self.iterations // 5)
+        uncached = GraphRAGEngine(self.db, llm=FakeLLM(LLM_LATENCY), plan_cache=PlanCache(maxsize=0),
+                                  answer_cache=AnswerCache(maxsize=0), rule_planner=False)
+        plan_cached = GraphRAGEngine(self.db, llm=FakeLLM(LLM_LATENCY), answer_cache=AnswerCache(maxsize=0),
+                                     rule_planner=False)
+        answer_cached = GraphRAGEngine(self.db, llm=FakeLLM(LLM_LATENCY), rule_planner=False)
+        rule_planned = GraphRAGEngine(self.db, llm=FakeLLM(LLM_LATENCY), plan_cache=PlanCache(maxsize=0),
+                                      answer_cache=AnswerCache(maxsize=0))
+        for question in QUESTIONS:
+            plan_cached.query(question)
+            answer_cached.query(question)
+        results = {
+            'query': measure(lambda i: uncached.query(QUESTIONS[i % len(QUESTIONS)]), iterations),
+            'query[plan cached]': measure(lambda i: plan_cached.query(QUESTIONS[i % len(QUESTIONS)]), iterations),
+            'query[answer cached]': measure(lambda i: answer_cached.query(QUESTIONS[i % len(QUESTIONS)]), iterations),
+            'query[rule planned]': measure(
+                lambda i: rule_planned.query(RULE_QUESTIONS[i % len(RULE_QUESTIONS)]), iterations),
+        }
+        for engine in (uncached, plan_cached, answer_cached, rule_planned):
+            engine.close()
+        return results
+    
+    def bench_query_many(self):
+        # 32 questions against a model with a 5 ms round trip, one at a time and 16 at once
+        questions = [QUESTIONS[i % len(QUESTIONS)] for i in range(32)]
+        with GraphRAGEngine(self.db, llm=FakeLLM(LLM_LATENCY), plan_cache=PlanCache(maxsize=0),
+                            answer_cache=AnswerCache(maxsize=0), rule_planner=False) as engine:
+            return {
+                'query_many[serial]': measure(lambda i: [engine.query(q) for q in questions], 3, len(questions)),
+                'aquery_many[concurrency=16]': measure(
+                    lambda i: asyncio.run(engine.aquery_many(questions, concurrency=16)), 3, len(questions)),
+            }
+    
+    def bench_semantic_cache(self):
+        cache = SemanticCache()
+        for i in range(cache.maxsize):
+            cache.add(f"Which {self.rng.choice(list(self.sizes))} items were made in {2000 + i} batch {i % 7}?", '', {})
+        return {'semantic_cache_lookup': measure(
+            lambda i: cache.lookup(f"items made in {2000 + i % cache.maxsize} batch {i % 7}", ''), self.iterations)}
+
+
+# Peak memory growth below this many KB is treated as noise
+PEAK_SLACK_KB = 64
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            metric: str = 'p50_ms', tolerance: float = 0.2) -> List[str]:
+    """Describe cases whose metric (or peak memory) exceeds the baseline by more than tolerance"""
+    regressions = []
+    for case, stats in results.items():
+        base = baseline.get(case)
+        if not base:
+            continue
+        for key, slack in ((metric, 0.0), ('peak_kb', PEAK_SLACK_KB)):
+            if base.get(key) and stats[key] > base[key] * (1 + tolerance) + slack:
+                regressions.append(f"{case} {key}: {base[key]:.3f} -> {stats[key]:.3f}")
+    return regressions
+
+
+def format_report(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    lines = [f"{'case':34} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'ops/s':>12} {'peak KB':>10} {'vs base':>8}"]
+    for case, stats in results.items():
+        change = ''
+        if baseline and baseline.get(case, {}).get('p50_ms'):
+            change = f"{stats['p50_ms'] / baseline[case]['p50_ms'] - 1:+.0%}"
+        lines.append(
+            f"{case:34} {stats['n']:>5} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+            f"{stats['p99_ms']:>10.3f} {stats['ops_per_sec']:>12,.0f} {stats['peak_kb']:>10,.0f} {change:>8}"
+        )
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the supply chain graph database and GraphRAG engine")
+    parser.add_argument('--scale', type=float, default=1.0, help="synthetic graph scale (1 = ~1,000 nodes)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--only', nargs='*', help="run only cases whose name contains one of these")
+    parser.add_argument('--baseline', help="compare against this baseline JSON")
+    parser.add_argument('--save-baseline', help="write results to this baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+    
+    suite = BenchmarkSuite(args.scale, args.seed, args.iterations)
+    print(f"📊 Benchmarking scale={args.scale} seed={args.seed}: "
+          f"{suite.db.count_nodes():,} nodes, {suite.db.count_relationships():,} relationships\n")
+    results = suite.run(args.only)
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    print(format_report(results, baseline))
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({
+                'meta': {
+                    'scale': args.scale,
+                    'seed': args.seed,
+                    'iterations': args.iterations,
+                    'python': platform.python_version(),
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S')
+                },
+                'results': results
+            }, f, indent=2)
+        print(f"\n💾 Baseline written to: {args.save_baseline}")
+    
+    if baseline:
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print(f"\n✅ No regressions over {args.tolerance:.0%}")
@@ -3,125 +3,1323 @@ In-Memory Graph Database for Supply Chain Validator
 Simulates Neo4j functionality with Cypher-like query interface
 """
 
+import gzip
+import itertools
 import json
 import re
-from typing import Dict, List, Any, Optional
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
+import numpy as np
 
-class GraphDatabase:
-    """In-memory graph database with Cypher-like query support"""
+INDEX_KINDS = ('hash', 'sorted')
+
+# Comparison operators supported in WHERE clauses
+COMPARISON_OPERATORS = {
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+
+def _index_key(value: Any) -> Any:
+    """Make a property value usable as a hash index key"""
+    if isinstance(value, list):
+        return tuple(_index_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _index_key(v)) for k, v in value.items()))
+    return value
+
+
+def _sort_key(value: Any) -> tuple:
+    """Order property values of mixed types: numbers, then strings, then anything else"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    if isinstance(value, str):
+        return (1, value)
+    return (2, repr(value))
+
+
+class HashIndex:
+    """Equality index over one property of one label: {value: {node_id: None}}"""
+    
+    kind = 'hash'
+    
+    def __init__(self):
+        self.entries = {}
+    
+    def add(self, value: Any, node_id: str):
+        self.entries.setdefault(_index_key(value), {})[node_id] = None
+    
+    def remove(self, value: Any, node_id: str):
+        key = _index_key(value)
+        ids = self.entries.get(key)
+        if ids is not None:
+            ids.pop(node_id, None)
+            if not ids:
+                del self.entries[key]
+    
+    def clear(self):
+        self.entries = {}
+    
+    def extend(self, items):
+        """Add many (value, node_id) pairs"""
+        entries = self.entries
+        for value, node_id in items:
+            entries.setdefault(_index_key(value), {})[node_id] = None
+    
+    @classmethod
+    def from_items(cls, items) -> 'HashIndex':
+        """Build an index from (value, node_id) pairs in one pass"""
+        index = cls()
+        index.extend(items)
+        return index
+    
+    def copy(self) -> 'HashIndex':
+        index = HashIndex()
+        index.entries = {key: dict(ids) for key, ids in self.entries.items()}
+        return index
+    
+    def lookup(self, value: Any) -> List[str]:
+        return list(self.entries.get(_index_key(value), ()))
+    
+    def values(self):
+        """Distinct indexed values"""
+        return self.entries.keys()
+    
+    def lookup_values(self, values) -> List[str]:
+        ids = []
+        for value in values:
+            ids.extend(self.entries.get(value, ()))
+        return ids
+
+
+class SortedIndex:
+    """Ordered index over one property of one label, supporting equality and range lookups"""
+    
+    kind = 'sorted'
     
     def __init__(self):
-        self.nodes = {}  # {node_id: {label: str, properties: dict}}
-        self.relationships = []  # [{from: id, to: id, type: str, properties: dict}]
+        self.keys = []  # sorted sort keys
+        self.ids = []  # node ids, parallel to keys
+    
+    def add(self, value: Any, node_id: str):
+        key = _sort_key(value)
+        pos = bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.ids.insert(pos, node_id)
+    
+    def remove(self, value: Any, node_id: str):
+        key = _sort_key(value)
+        for pos in range(bisect_left(self.keys, key), bisect_right(self.keys, key)):
+            if self.ids[pos] == node_id:
+                del self.keys[pos]
+                del self.ids[pos]
+                return
+    
+    def clear(self):
+        self.keys = []
+        self.ids = []
+    
+    def extend(self, items):
+        """Add many (value, node_id) pairs.
+        
+        Small batches are inserted one by one; larger ones are merged with a
+        single stable sort, which keeps existing entries ahead of new ones with
+        equal keys just as add() does.
+        """
+        pairs = [(_sort_key(value), node_id) for value, node_id in items]
+        if len(pairs) * 8 < len(self.keys):
+            for key, node_id in pairs:
+                pos = bisect_right(self.keys, key)
+                self.keys.insert(pos, key)
+                self.ids.insert(pos, node_id)
+            return
+        merged = sorted(list(zip(self.keys, self.ids)) + pairs, key=lambda pair: pair[0])
+        self.keys = [key for key, _ in merged]
+        self.ids = [node_id for _, node_id in merged]
+    
+    @classmethod
+    def from_items(cls, items) -> 'SortedIndex':
+        """Build an index from (value, node_id) pairs with a single sort"""
+        index = cls()
+        index.extend(items)
+        return index
+    
+    def copy(self) -> 'SortedIndex':
+        index = SortedIndex()
+        index.keys = list(self.keys)
+        index.ids = list(self.ids)
+        return index
+    
+    def lookup(self, value: Any) -> List[str]:
+        return self.lookup_range(value, value)
+    
+    def lookup_range(self, low: Any = None, high: Any = None,
+                     include_low: bool = True, include_high: bool = True) -> List[str]:
+        """Node ids whose value lies between low and high (None means unbounded)"""
+        if low is None and high is None:
+            return list(self.ids)
+        # An open end stays within the type class of the other bound
+        type_class = _sort_key(low if low is not None else high)[0]
+        if low is None:
+            start = bisect_left(self.keys, (type_class,))
+        elif include_low:
+            start = bisect_left(self.keys, _sort_key(low))
+        else:
+            start = bisect_right(self.keys, _sort_key(low))
+        if high is None:
+            end = bisect_left(self.keys, (type_class + 1,))
+        elif include_high:
+            end = bisect_right(self.keys, _sort_key(high))
+        else:
+            end = bisect_left(self.keys, _sort_key(high))
+        return self.ids[start:end]
+    
+    def values(self):
+        """Distinct indexed values"""
+        distinct = []
+        for key in self.keys:
+            if not distinct or distinct[-1] != key:
+                distinct.append(key)
+        return [value for _, value in distinct]
+    
+    def lookup_values(self, values) -> List[str]:
+        ids = []
+        for value in values:
+            ids.extend(self.lookup(value))
+        return ids
+
+
+class Parameter:
+    """A $name placeholder in a compiled query, bound from params at execution time"""
+    
+    def __init__(self, name: str):
+        self.name = name
+    
+    def __repr__(self):
+        return f"${self.name}"
+
+
+class NodePattern:
+    """A node in a MATCH path, e.g. (s:Supplier {name: "..."})"""
+    
+    def __init__(self, var: Optional[str], label: Optional[str], properties: Dict[str, Any]):
+        self.var = var
+        self.label = label
+        self.properties = properties
+
+
+class RelPattern:
+    """A relationship in a MATCH path, e.g. -[r:PROVIDES|SUPPLIED_TO*1..3]->"""
+    
+    def __init__(self, var: Optional[str], types: Optional[List[str]], direction: str,
+                 min_hops: int = 1, max_hops: Optional[int] = 1, properties: Dict[str, Any] = None):
+        self.var = var
+        self.types = types  # None matches any type
+        self.direction = direction  # 'out', 'in' or 'both'
+        self.min_hops = min_hops
+        self.max_hops = max_hops  # None means unbounded
+        self.properties = properties or {}
+    
+    @property
+    def variable_length(self) -> bool:
+        return (self.min_hops, self.max_hops) != (1, 1)
+
+
+class CompiledQuery:
+    """Parsed form of a Cypher-like query, cached by normalized query text"""
+    
+    def __init__(self, kind: str, nodes: List[NodePattern] = None, rels: List[RelPattern] = None,
+                 conditions: Dict[str, List[tuple]] = None, return_vars: Optional[List[str]] = None,
+                 skip: Any = None, limit: Any = None, paths: List['CompiledQuery'] = None):
+        self.kind = kind  # MATCH, CREATE, RETURN or UNKNOWN
+        self.nodes = nodes or []  # path of n node patterns joined by n - 1 relationship patterns
+        self.rels = rels or []
+        self.conditions = conditions or {}  # {var: [(property, operator, value | Parameter)]}
+        self.return_vars = return_vars  # None returns every named variable
+        self.skip = skip  # int | Parameter | None
+        self.limit = limit  # int | Parameter | None
+        self.paths = paths or []  # further comma-separated path patterns, joined as a cartesian product
+
+
+_NODE_PATTERN = re.compile(r'\(\s*(\w+)?\s*(?::\s*(\w+))?\s*(?:\{([^}]*)\})?\s*\)')
+_REL_PATTERN = re.compile(
+    r'(<)?-(?:\[\s*(\w+)?\s*(?::\s*(\w+(?:\s*\|\s*:?\s*\w+)*))?\s*'
+    r'(\*\s*(\d*)\s*(?:\.\.\s*(\d*))?)?\s*(?:\{([^}]*)\})?\s*\])?-(>)?'
+)
+
+
+def _split_patterns(clause: str) -> List[str]:
+    """Split a MATCH clause at the commas between path patterns"""
+    patterns, depth, start, quote = [], 0, 0, None
+    for i, ch in enumerate(clause):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in '"\'':
+            quote = ch
+        elif ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            patterns.append(clause[start:i].strip())
+            start = i + 1
+    patterns.append(clause[start:].strip())
+    return patterns
+
+
+def _mask_quoted(query: str) -> str:
+    """Blank out the inside of quoted strings, keeping offsets, so keywords are only found outside them"""
+    return re.sub(r'"[^"]*"|\'[^\']*\'', lambda m: m.group()[0] + '_' * (len(m.group()) - 2) + m.group()[-1], query)
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace outside of quoted strings"""
+    parts = re.split(r'("[^"]*"|\'[^\']*\')', query.strip())
+    return ''.join(
+        part if i % 2 else re.sub(r'\s+', ' ', part)
+        for i, part in enumerate(parts)
+    )
+
+
+def _resolve(value: Any, params: Dict[str, Any]) -> Any:
+    if isinstance(value, Parameter):
+        if value.name not in params:
+            raise ValueError(f"Missing query parameter: ${value.name}")
+        return params[value.name]
+    return value
+
+
+def _bind(template, params: Dict[str, Any]):
+    """Substitute parameters in a property dict or a list of (property, operator, value) conditions"""
+    if isinstance(template, dict):
+        return {key: _resolve(value, params) for key, value in template.items()}
+    return [(prop, op, _resolve(value, params)) for prop, op, value in template]
+
+
+def _open_text(filepath: str, mode: str):
+    """Open a text file for streaming, transparently gzip-compressed when the path ends in .gz"""
+    if filepath.endswith('.gz'):
+        return gzip.open(filepath, mode + 't', encoding='utf-8')
+    return open(filepath, mode, encoding='utf-8')
+
+
+class PropertySchema:
+    """Interned property key layout shared by every record with the same keys"""
+    
+    __slots__ = ('keys', 'positions')
+    
+    def __init__(self, keys: tuple):
+        self.keys = keys
+        self.positions = {key: pos for pos, key in enumerate(keys)}
+    
+    def get(self, values: tuple, key: str, default: Any = None) -> Any:
+        pos = self.positions.get(key)
+        return default if pos is None else values[pos]
+    
+    def to_dict(self, values: tuple) -> Dict[str, Any]:
+        return dict(zip(self.keys, values))
+
+
+EMPTY_SCHEMA = PropertySchema(())
+
+
+class NodeView(Mapping):
+    """Read-only {node_id: {'label': str, 'properties': dict}} view over the compact node store"""
+    
+    def __init__(self, db: 'GraphDatabase'):
+        self._db = db
+    
+    def __getitem__(self, node_id: str) -> Dict[str, Any]:
+        index = self._db._id_map[node_id]
+        return {'label': self._db._node_label(index), 'properties': self._db._node_properties(index)}
+    
+    def __contains__(self, node_id) -> bool:
+        return node_id in self._db._id_map
+    
+    def __iter__(self):
+        return iter(self._db._ids)
+    
+    def __len__(self) -> int:
+        return len(self._db._ids)
+
+
+class RelationshipView(Sequence):
+    """Read-only [{'from', 'to', 'type', 'properties'}] view over the compact edge store"""
+    
+    def __init__(self, db: 'GraphDatabase'):
+        self._db = db
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._db._edge_record(e) for e in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("relationship index out of range")
+        return self._db._edge_record(index)
+    
+    def __len__(self) -> int:
+        return len(self._db._edge_src)
+
+
+class GraphDatabase:
+    """In-memory graph database with Cypher-like query support
+    
+    Nodes and relationships are stored column-wise under integer ids, with
+    interned labels, relationship types and property layouts. The nodes and
+    relationships attributes are dict/list-like views built on access.
+    """
+    
+    def __init__(self, query_cache_size: int = 256):
+        self.nodes = NodeView(self)  # {node_id: {label: str, properties: dict}}
+        self.relationships = RelationshipView(self)  # [{from: id, to: id, type: str, properties: dict}]
         self.node_counter = 0
         
+        # Interned labels, relationship types and property layouts
+        self._labels = []
+        self._label_ids = {}
+        self._types = []
+        self._type_ids = {}
+        self._schemas = {(): EMPTY_SCHEMA}
+        
+        # Secondary property indexes: {label: {property: HashIndex | SortedIndex}}
+        self._property_indexes = {}
+        
+        # Mutation listeners: [(callback, called for relationship changes too)], see add_listener
+        self._listeners = []
+        
+        self._reset_storage()
+        
+        # Compiled query plans: LRU of {normalized query: CompiledQuery}
+        self.query_cache_size = query_cache_size
+        self._query_cache = OrderedDict()
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+    
+    def _reset_storage(self):
+        """Empty the node and edge columns and every index"""
+        # Nodes, indexed by integer id
+        self._ids = []  # int id -> node id
+        self._id_map = {}  # node id -> int id
+        self._node_label_ids = array('i')
+        self._node_schemas = []
+        self._node_values = []
+        
+        # Edges, indexed by integer id
+        self._edge_src = array('i')
+        self._edge_dst = array('i')
+        self._edge_type_ids = array('i')
+        self._edge_schemas = []
+        self._edge_values = []
+        
+        # Adjacency indexes: per int node id, an array of edge ids (or None)
+        self._out_index = []
+        self._in_index = []
+        
+        # Label index and running counters
+        self._label_index = {}  # {label: array of int node ids} (insertion order)
+        self._rel_type_counts = {}  # {rel_type: count}
+        
+        for indexes in self._property_indexes.values():
+            for index in indexes.values():
+                index.clear()
+    
+    def _intern_schema(self, keys: tuple) -> PropertySchema:
+        schema = self._schemas.get(keys)
+        if schema is None:
+            schema = PropertySchema(tuple(sys.intern(k) if isinstance(k, str) else k for k in keys))
+            self._schemas[keys] = schema
+        return schema
+    
+    def _intern_type(self, rel_type: str) -> int:
+        type_id = self._type_ids.get(rel_type)
+        if type_id is None:
+            type_id = self._type_ids[rel_type] = len(self._types)
+            self._types.append(sys.intern(rel_type))
+        return type_id
+    
+    def _pack_properties(self, properties: Dict[str, Any]):
+        """Split a property dict into an interned schema and a values tuple"""
+        if not properties:
+            return EMPTY_SCHEMA, ()
+        values = tuple([sys.intern(v) if type(v) is str else v for v in properties.values()])
+        return self._intern_schema(tuple(properties)), values
+    
+    def _node_label(self, index: int) -> str:
+        return self._labels[self._node_label_ids[index]]
+    
+    def _node_properties(self, index: int) -> Dict[str, Any]:
+        return self._node_schemas[index].to_dict(self._node_values[index])
+    
+    def _node_value(self, index: int, key: str) -> Any:
+        return self._node_schemas[index].get(self._node_values[index], key)
+    
+    def _edge_record(self, edge: int) -> Dict[str, Any]:
+        return {
+            'from': self._ids[self._edge_src[edge]],
+            'to': self._ids[self._edge_dst[edge]],
+            'type': self._types[self._edge_type_ids[edge]],
+            'properties': self._edge_schemas[edge].to_dict(self._edge_values[edge])
+        }
+    
+    def node_index(self, node_id: str) -> Optional[int]:
+        """Integer id of a node, or None if it does not exist"""
+        return self._id_map.get(node_id)
+    
+    def node_id(self, index: int) -> str:
+        """Node id for an integer id"""
+        return self._ids[index]
+    
+    def add_listener(self, callback: Callable[[Optional[List[str]]], None], relationships: bool = True):
+        """Call callback(node_ids) whenever existing nodes change.
+
+        node_ids lists nodes whose properties or label were overwritten or,
+        unless relationships is False, that gained a relationship; it is None
+        when the whole graph was cleared or replaced.
+        """
+        self._listeners.append((callback, relationships))
+    
+    def remove_listener(self, callback: Callable[[Optional[List[str]]], None]):
+        """Stop calling a listener registered with add_listener"""
+        self._listeners = [listener for listener in self._listeners if listener[0] != callback]
+    
+    def _notify(self, node_ids: Optional[List[str]], relationships: bool = False):
+        """Call the listeners; relationships=True means only relationships were added"""
+        for callback, wants_relationships in list(self._listeners):
+            if wants_relationships or not relationships:
+                callback(node_ids)
+    
     def create_node(self, label: str, properties: Dict[str, Any]) -> str:
         """Create a node with label and properties"""
         node_id = properties.get('id', f"{label}_{self.node_counter}")
         self.node_counter += 1
+        return self._put_node(node_id, label, properties)
+    
+    def _put_node(self, node_id: str, label: str, properties: Dict[str, Any], index_properties: bool = True) -> str:
+        """Insert or overwrite a node under an explicit id (index_properties=False leaves secondary indexes alone)"""
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = self._label_ids[label] = len(self._labels)
+            self._labels.append(sys.intern(label))
+        schema, values = self._pack_properties(properties)
         
-        self.nodes[node_id] = {
-            'label': label,
-            'properties': properties
-        }
+        index = self._id_map.get(node_id)
+        if index is not None:
+            old_label = self._node_label(index)
+            if index_properties:
+                self._unindex_properties(old_label, node_id, self._node_properties(index))
+            if old_label != label:
+                self._unindex_label(old_label, index)
+                self._label_index.setdefault(label, array('i')).append(index)
+            self._node_label_ids[index] = label_id
+            self._node_schemas[index] = schema
+            self._node_values[index] = values
+            if self._listeners:
+                self._notify([node_id])
+        else:
+            index = len(self._ids)
+            self._ids.append(node_id)
+            self._id_map[node_id] = index
+            self._node_label_ids.append(label_id)
+            self._node_schemas.append(schema)
+            self._node_values.append(values)
+            self._out_index.append(None)
+            self._in_index.append(None)
+            self._label_index.setdefault(label, array('i')).append(index)
+        
+        if index_properties:
+            self._index_properties(label, node_id, properties)
         return node_id
     
+    def update_node(self, node_id: str, properties: Dict[str, Any]) -> str:
+        """Merge properties into an existing node"""
+        index = self._id_map.get(node_id)
+        if index is None:
+            raise ValueError(f"Node not found: {node_id}")
+        return self._put_node(node_id, self._node_label(index), {**self._node_properties(index), **properties})
+    
+    def create_index(self, label: str, property: str, kind: str = 'hash'):
+        """Create a secondary index on a node property ('hash' for equality, 'sorted' for ranges)"""
+        if kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind: {kind} (expected one of {', '.join(INDEX_KINDS)})")
+        
+        existing = self.get_index(label, property)
+        if existing is not None and existing.kind == kind:
+            return
+        
+        index = HashIndex() if kind == 'hash' else SortedIndex()
+        for node_index in self._label_index.get(label, ()):
+            value = self._node_value(node_index, property)
+            if value is not None:
+                index.add(value, self._ids[node_index])
+        self._property_indexes.setdefault(label, {})[property] = index
+    
+    def get_index(self, label: str, property: str):
+        """Get the secondary index on label.property, or None if there is none"""
+        return self._property_indexes.get(label, {}).get(property)
+    
+    def list_indexes(self) -> List[Dict[str, str]]:
+        """Describe all secondary indexes"""
+        return [
+            {'label': label, 'property': prop, 'kind': index.kind}
+            for label, indexes in self._property_indexes.items()
+            for prop, index in indexes.items()
+        ]
+    
+    def _index_properties(self, label: str, node_id: str, properties: Dict[str, Any]):
+        for prop, index in self._property_indexes.get(label, {}).items():
+            value = properties.get(prop)
+            if value is not None:
+                index.add(value, node_id)
+    
+    def _unindex_properties(self, label: str, node_id: str, properties: Dict[str, Any]):
+        for prop, index in self._property_indexes.get(label, {}).items():
+            value = properties.get(prop)
+            if value is not None:
+                index.remove(value, node_id)
+    
+    def lookup_nodes(self, label: str, property: str, value: Any) -> Optional[List[str]]:
+        """Node ids with label.property == value, or None if the property is not indexed"""
+        index = self.get_index(label, property)
+        if index is None:
+            return None
+        return index.lookup(value)
+    
+    def lookup_range(self, label: str, property: str, low: Any = None, high: Any = None,
+                     include_low: bool = True, include_high: bool = True) -> Optional[List[str]]:
+        """Node ids with label.property in a range, or None if there is no sorted index"""
+        index = self.get_index(label, property)
+        if index is None or index.kind != 'sorted':
+            return None
+        return index.lookup_range(low, high, include_low, include_high)
+    
+    def search_index(self, label: str, property: str, needle: str) -> Optional[List[str]]:
+        """Node ids whose string label.property contains needle (case-insensitive), or None if not indexed"""
+        index = self.get_index(label, property)
+        if index is None:
+            return None
+        needle = needle.lower()
+        return index.lookup_values([
+            value for value in index.values()
+            if isinstance(value, str) and needle in value.lower()
+        ])
+    
+    def _unindex_label(self, label: str, index: int):
+        """Remove an int node id from the label index"""
+        members = self._label_index.get(label)
+        if members is not None:
+            members.remove(index)
+            if not members:
+                del self._label_index[label]
+    
     def create_relationship(self, from_id: str, to_id: str, rel_type: str, properties: Dict[str, Any] = None):
         """Create a relationship between two nodes"""
-        if from_id not in self.nodes or to_id not in self.nodes:
+        src = self._id_map.get(from_id)
+        dst = self._id_map.get(to_id)
+        if src is None or dst is None:
             raise ValueError(f"Node not found: {from_id} or {to_id}")
         
-        self.relationships.append({
-            'from': from_id,
-            'to': to_id,
-            'type': rel_type,
-            'properties': properties or {}
-        })
+        type_id = self._intern_type(rel_type)
+        schema, values = self._pack_properties(properties)
+        
+        edge = len(self._edge_src)
+        self._edge_src.append(src)
+        self._edge_dst.append(dst)
+        self._edge_type_ids.append(type_id)
+        self._edge_schemas.append(schema)
+        self._edge_values.append(values)
+        self._index_relationship(edge, src, dst, rel_type)
+        if self._listeners:
+            self._notify([from_id, to_id], relationships=True)
     
-    def execute_cypher(self, query: str) -> List[Dict[str, Any]]:
-        """Execute a Cypher-like query and return results"""
-        query = query.strip()
+    def bulk_load(self, nodes=(), relationships=()) -> Dict[str, int]:
+        """Load many nodes and relationships in one call.
         
-        # Handle MATCH queries
-        if query.upper().startswith('MATCH'):
-            return self._execute_match(query)
+        nodes yields (label, properties) pairs and relationships yields
+        (from_id, to_id, rel_type[, properties]) tuples. Every relationship
+        endpoint is checked against existing and incoming node ids in a single
+        set pass before anything is written, so a dangling reference raises
+        ValueError and leaves the database unchanged. New nodes are added to the
+        secondary indexes in one batch per index rather than one at a time.
+        """
+        nodes = [(label, properties or {}) for label, properties in nodes]
+        node_ids = [
+            properties.get('id', f"{label}_{self.node_counter + position}")
+            for position, (label, properties) in enumerate(nodes)
+        ]
+        edges = list(relationships)
+        from_ids = [edge[0] for edge in edges]
+        to_ids = [edge[1] for edge in edges]
         
-        # Handle CREATE queries
-        elif query.upper().startswith('CREATE'):
-            return self._execute_create(query)
+        missing = set(from_ids).union(to_ids).difference(self._id_map, node_ids)
+        if missing:
+            sample = ', '.join(sorted(map(str, missing))[:5])
+            raise ValueError(f"Node not found for {len(missing)} relationship endpoint(s): {sample}")
         
-        # Handle simple RETURN queries
-        elif query.upper().startswith('RETURN'):
-            return [{'result': 'OK'}]
+        # Nodes: overwrites keep their indexes current, new nodes are indexed together afterwards
+        first = len(self._ids)
+        id_map = self._id_map
+        try:
+            for node_id, (label, properties) in zip(node_ids, nodes):
+                self._put_node(node_id, label, properties, index_properties=id_map.get(node_id, first) < first)
+        finally:
+            self._index_nodes(range(first, len(self._ids)))
+        self.node_counter += len(nodes)
+        if not edges:
+            return {'nodes': len(nodes), 'relationships': 0}
+        
+        # Relationships, appended column-wise
+        count = len(edges)
+        src = np.fromiter(map(id_map.__getitem__, from_ids), dtype=np.int32, count=count)
+        dst = np.fromiter(map(id_map.__getitem__, to_ids), dtype=np.int32, count=count)
+        type_ids = np.fromiter((self._intern_type(edge[2]) for edge in edges), dtype=np.int32, count=count)
+        pack = self._pack_properties
+        for edge in edges:
+            schema, values = pack(edge[3] if len(edge) > 3 else None)
+            self._edge_schemas.append(schema)
+            self._edge_values.append(values)
+        
+        first = len(self._edge_src)
+        self._edge_src.frombytes(src.tobytes())
+        self._edge_dst.frombytes(dst.tobytes())
+        self._edge_type_ids.frombytes(type_ids.tobytes())
+        
+        # Adjacency: group the new edge ids by node and extend each node's array once
+        edge_ids = np.arange(first, first + count, dtype=np.int32)
+        for adjacency, ends in ((self._out_index, src), (self._in_index, dst)):
+            order = np.argsort(ends, kind='stable')
+            nodes_sorted = ends[order]
+            starts = np.flatnonzero(np.r_[True, nodes_sorted[1:] != nodes_sorted[:-1]])
+            bounds = np.r_[starts, count].tolist()
+            grouped = edge_ids[order]
+            for node, lo, hi in zip(nodes_sorted[starts].tolist(), bounds, bounds[1:]):
+                if adjacency[node] is None:
+                    adjacency[node] = array('i')
+                adjacency[node].frombytes(grouped[lo:hi].tobytes())
+        
+        rel_types, counts = np.unique(type_ids, return_counts=True)
+        for type_id, type_count in zip(rel_types.tolist(), counts.tolist()):
+            rel_type = self._types[type_id]
+            self._rel_type_counts[rel_type] = self._rel_type_counts.get(rel_type, 0) + type_count
+        
+        if self._listeners:
+            self._notify(list(set(from_ids).union(to_ids)), relationships=True)
+        return {'nodes': len(nodes), 'relationships': len(edges)}
+    
+    def _index_nodes(self, node_indexes):
+        """Add nodes to the secondary indexes of their labels, one batch per index"""
+        by_label = {}
+        for i in node_indexes:
+            by_label.setdefault(self._node_label_ids[i], []).append(i)
+        for label_id, members in by_label.items():
+            for prop, index in self._property_indexes.get(self._labels[label_id], {}).items():
+                index.extend(
+                    (value, self._ids[i])
+                    for i in members
+                    for value in (self._node_value(i, prop),)
+                    if value is not None
+                )
+    
+    def _index_relationship(self, edge: int, src: int, dst: int, rel_type: str):
+        """Add an edge to the outgoing and incoming adjacency indexes"""
+        if self._out_index[src] is None:
+            self._out_index[src] = array('i')
+        self._out_index[src].append(edge)
+        if self._in_index[dst] is None:
+            self._in_index[dst] = array('i')
+        self._in_index[dst].append(edge)
+        self._rel_type_counts[rel_type] = self._rel_type_counts.get(rel_type, 0) + 1
+    
+    def _type_filter(self, rel_type) -> Optional[set]:
+        """Turn a relationship type (or list of types) into a set of type ids; None matches any type"""
+        if rel_type is None:
+            return None
+        if isinstance(rel_type, str):
+            rel_type = (rel_type,)
+        return {self._type_ids[t] for t in rel_type if t in self._type_ids}
+    
+    def _out_edge_ids(self, index: int, type_ids: Optional[set] = None):
+        return self._filter_edges(self._out_index[index], type_ids)
+    
+    def _in_edge_ids(self, index: int, type_ids: Optional[set] = None):
+        return self._filter_edges(self._in_index[index], type_ids)
+    
+    def _filter_edges(self, edges, type_ids: Optional[set]):
+        if edges is None:
+            return ()
+        if type_ids is None:
+            return edges
+        edge_types = self._edge_type_ids
+        return [e for e in edges if edge_types[e] in type_ids]
+    
+    def out_edges(self, node_id: str, rel_type=None) -> List[Dict[str, Any]]:
+        """Get outgoing relationships of a node, optionally filtered by type (or list of types)"""
+        index = self._id_map.get(node_id)
+        if index is None:
+            return []
+        return [self._edge_record(e) for e in self._out_edge_ids(index, self._type_filter(rel_type))]
+    
+    def in_edges(self, node_id: str, rel_type=None) -> List[Dict[str, Any]]:
+        """Get incoming relationships of a node, optionally filtered by type (or list of types)"""
+        index = self._id_map.get(node_id)
+        if index is None:
+            return []
+        return [self._edge_record(e) for e in self._in_edge_ids(index, self._type_filter(rel_type))]
+    
+    def neighbours(self, node_id: str, rel_type=None, direction: str = 'out') -> List[str]:
+        """Ids of the nodes at the other end of a node's relationships, in edge order"""
+        index = self._id_map.get(node_id)
+        if index is None:
+            return []
+        type_ids = self._type_filter(rel_type)
+        if direction == 'out':
+            ends = [self._edge_dst[e] for e in self._out_edge_ids(index, type_ids)]
+        elif direction == 'in':
+            ends = [self._edge_src[e] for e in self._in_edge_ids(index, type_ids)]
+        elif direction == 'both':
+            edges = sorted(list(self._out_edge_ids(index, type_ids)) + list(self._in_edge_ids(index, type_ids)))
+            ends = [self._edge_dst[e] if self._edge_src[e] == index else self._edge_src[e] for e in edges]
+        else:
+            raise ValueError(f"Unknown direction: {direction} (expected 'out', 'in' or 'both')")
+        return [self._ids[i] for i in ends]
+    
+    def neighbourhoods(self, node_ids, rel_type=None, key: str = 'name') -> Dict[str, Dict[str, List[tuple]]]:
+        """Outgoing and incoming neighbours of many nodes, in one pass over the adjacency indexes
+        
+        Returns {node_id: {'outgoing': [...], 'incoming': [...]}} with one
+        (rel_type, neighbour id, neighbour label, neighbour's key property or
+        its id if it has none) tuple per relationship, in edge order. Unknown
+        node ids are left out.
+        """
+        type_ids = self._type_filter(rel_type)
+        ids, types, edge_types = self._ids, self._types, self._edge_type_ids
+        described = {}  # {int neighbour id: (id, label, key value)}, shared across all nodes
+        
+        def entries(edges, ends):
+            listed = []
+            for e in self._filter_edges(edges, type_ids):
+                end = ends[e]
+                neighbour = described.get(end)
+                if neighbour is None:
+                    neighbour = described[end] = (
+                        ids[end], self._node_label(end),
+                        self._node_schemas[end].get(self._node_values[end], key, ids[end])
+                    )
+                listed.append((types[edge_types[e]], *neighbour))
+            return listed
+        
+        result = {}
+        for node_id in node_ids:
+            index = self._id_map.get(node_id)
+            if index is not None and node_id not in result:
+                result[node_id] = {
+                    'outgoing': entries(self._out_index[index], self._edge_dst),
+                    'incoming': entries(self._in_index[index], self._edge_src)
+                }
+        return result
+    
+    def freeze(self) -> 'GraphSnapshot':
+        """Create an immutable, read-optimized snapshot with NumPy CSR adjacency"""
+        from graph_snapshot import GraphSnapshot
+        return GraphSnapshot.from_database(self)
+    
+    def execute_cypher(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Execute a Cypher-like query and return results
         
-        return []
+        Values may be given as $name placeholders and supplied through params,
+        so that repeated queries share one cached plan. MATCH accepts one or
+        more comma-separated path patterns; a pattern it cannot parse raises
+        ValueError.
+        """
+        return list(self.execute_cypher_iter(query, params))
     
-    def _execute_match(self, query: str) -> List[Dict[str, Any]]:
-        """Execute MATCH queries"""
-        results = []
+    def execute_cypher_iter(self, query: str, params: Optional[Dict[str, Any]] = None):
+        """Execute a Cypher-like query and yield result rows lazily
         
-        # Parse simple patterns like: MATCH (s:Supplier) RETURN s
-        # or MATCH (s:Supplier)-[:PROVIDES]->(m:Material) RETURN s, m
+        SKIP and LIMIT are applied inside the scan, so only the requested rows
+        are ever materialized. The database should not be modified while the
+        iterator is being consumed.
+        """
+        plan = self._compile_query(query)
+        
+        # Handle MATCH queries
+        if plan.kind == 'MATCH':
+            yield from self._match_rows(plan, params or {})
         
-        # Extract node patterns
-        node_pattern = r'\((\w+):(\w+)(?:\s*\{([^}]+)\})?\)'
-        rel_pattern = r'-\[:(\w+)\]->'
+        # Handle CREATE queries
+        elif plan.kind == 'CREATE':
+            yield from self._execute_create(plan)
+        
+        # Handle simple RETURN queries
+        elif plan.kind == 'RETURN':
+            yield {'result': 'OK'}
+    
+    def query_cache_stats(self) -> Dict[str, int]:
+        """Get compiled query cache statistics"""
+        return {
+            'hits': self._query_cache_hits,
+            'misses': self._query_cache_misses,
+            'size': len(self._query_cache),
+            'maxsize': self.query_cache_size
+        }
+    
+    def clear_query_cache(self):
+        """Drop all compiled query plans and reset the cache statistics"""
+        self._query_cache.clear()
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+    
+    def _compile_query(self, query: str) -> 'CompiledQuery':
+        """Get the compiled plan for a query from the LRU cache, parsing it on a miss"""
+        key = _normalize_query(query)
+        plan = self._query_cache.get(key)
+        if plan is not None:
+            self._query_cache.move_to_end(key)
+            self._query_cache_hits += 1
+            return plan
         
-        nodes_match = re.findall(node_pattern, query)
-        rels_match = re.findall(rel_pattern, query)
+        self._query_cache_misses += 1
+        plan = self._parse_query(key)
+        if self.query_cache_size > 0:
+            self._query_cache[key] = plan
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+        return plan
+    
+    def _parse_query(self, query: str) -> 'CompiledQuery':
+        """Parse a normalized query into a CompiledQuery"""
+        keyword = next((k for k in ('MATCH', 'CREATE', 'RETURN') if query.upper().startswith(k)), 'UNKNOWN')
+        if keyword != 'MATCH':
+            return CompiledQuery(keyword)
         
-        if not nodes_match:
-            return results
+        # Parse path patterns like: MATCH (s:Supplier) RETURN s
+        # or MATCH (s:Supplier)-[:PROVIDES]->(m:Material)-[:SUPPLIED_TO]->(f:Factory) RETURN s, f
+        # or MATCH (p:Product)<-[:MANUFACTURES|SUPPLIED_TO*1..3]-(n) RETURN n
+        # or several comma-separated paths like: MATCH (f:Factory), (c:Certification) RETURN f, c
+        # with an optional WHERE clause like: WHERE s.established < "1950"
+        clause = re.match(r'MATCH\s*(.*?)\s*(?:\bWHERE\b|\bRETURN\b|$)', _mask_quoted(query), re.IGNORECASE | re.DOTALL)
+        clause = query[clause.start(1):clause.end(1)]
+        paths = [self._parse_path(pattern) for pattern in _split_patterns(clause)]
+        conditions = self._parse_where(query)
+        (nodes, rels), others = paths[0], paths[1:]
         
-        # Simple single node query
-        if len(nodes_match) == 1 and not rels_match:
-            var_name, label, props = nodes_match[0]
+        return CompiledQuery(
+            'MATCH',
+            nodes=nodes,
+            rels=rels,
+            conditions=conditions,
+            return_vars=self._parse_return(query),
+            skip=self._parse_paging(query, 'SKIP'),
+            limit=self._parse_paging(query, 'LIMIT'),
+            paths=[CompiledQuery('MATCH', nodes=n, rels=r, conditions=conditions) for n, r in others]
+        )
+    
+    def _parse_path(self, clause: str):
+        """Parse a path pattern into alternating node and relationship patterns"""
+        nodes, rels = [], []
+        pos = 0
+        while True:
+            node_match = _NODE_PATTERN.match(clause, pos)
+            if not node_match:
+                raise ValueError(f"Unsupported MATCH pattern: {clause}")
+            var, label, props = node_match.groups()
+            nodes.append(NodePattern(var, label, self._parse_properties(props) if props else {}))
+            pos = node_match.end()
             
-            # Filter nodes by label
-            matching_nodes = [
-                {var_name: {'id': nid, **node['properties']}}
-                for nid, node in self.nodes.items()
-                if node['label'] == label
-            ]
+            while pos < len(clause) and clause[pos].isspace():
+                pos += 1
+            if pos == len(clause):
+                return nodes, rels
             
-            # Apply property filters if specified
-            if props:
-                prop_filters = self._parse_properties(props)
-                matching_nodes = [
-                    n for n in matching_nodes
-                    if all(n[var_name].get(k) == v for k, v in prop_filters.items())
-                ]
+            rel_match = _REL_PATTERN.match(clause, pos)
+            if not rel_match:
+                raise ValueError(f"Unsupported MATCH pattern: {clause}")
+            left, var, types, hops, min_hops, max_hops, props, right = rel_match.groups()
             
-            results = matching_nodes
-        
-        # Relationship query
-        elif len(nodes_match) >= 2 and rels_match:
-            var1, label1, props1 = nodes_match[0]
-            var2, label2, props2 = nodes_match[1]
-            rel_type = rels_match[0]
+            if left and not right:
+                direction = 'in'
+            elif right and not left:
+                direction = 'out'
+            else:
+                direction = 'both'
+            
+            if not hops:
+                min_hops, max_hops = 1, 1
+            elif '..' not in hops:
+                # *n means exactly n hops, a bare * means one or more
+                min_hops, max_hops = (int(min_hops), int(min_hops)) if min_hops else (1, None)
+            else:
+                min_hops = int(min_hops) if min_hops else 1
+                max_hops = int(max_hops) if max_hops else None
             
-            # Find matching relationships
-            for rel in self.relationships:
-                if rel['type'] != rel_type:
+            rels.append(RelPattern(
+                var,
+                [t.strip().lstrip(':').strip() for t in types.split('|')] if types else None,
+                direction,
+                min_hops,
+                max_hops,
+                self._parse_properties(props) if props else {}
+            ))
+            pos = rel_match.end()
+            while pos < len(clause) and clause[pos].isspace():
+                pos += 1
+    
+    def _parse_return(self, query: str) -> Optional[List[str]]:
+        """Parse 'RETURN a, b' into a list of variables (None for RETURN * or expressions)"""
+        return_match = re.search(r'\bRETURN\b\s+(.*?)(?:\s+(?:SKIP|LIMIT)\b.*)?$', _mask_quoted(query),
+                                 re.IGNORECASE | re.DOTALL)
+        if not return_match:
+            return None
+        items = [item.strip() for item in query[return_match.start(1):return_match.end(1)].split(',')]
+        if not all(re.fullmatch(r'\w+', item) for item in items):
+            return None
+        return items
+    
+    def _parse_paging(self, query: str, keyword: str) -> Any:
+        """Parse 'SKIP n' or 'LIMIT n' (n may be a $parameter)"""
+        match = re.search(rf'\b{keyword}\s+(\$?\w+)', _mask_quoted(query), re.IGNORECASE)
+        if not match:
+            return None
+        value = self._parse_literal(query[match.start(1):match.end(1)])
+        if not isinstance(value, (int, Parameter)):
+            raise ValueError(f"{keyword} expects an integer, got {query[match.start(1):match.end(1)]}")
+        return value
+    
+    def _match_rows(self, plan: 'CompiledQuery', params: Dict[str, Any]):
+        """Yield result rows of a MATCH path as an index-backed join.
+        
+        The join starts at the node pattern with the fewest candidates (by
+        secondary index lookup or label count) and expands outwards along the
+        path through the adjacency indexes.
+        """
+        if not plan.nodes:
+            return
+        
+        skip = _resolve(plan.skip, params) or 0
+        limit = _resolve(plan.limit, params)
+        for keyword, value in (('SKIP', skip), ('LIMIT', limit)):
+            if value is not None and (not isinstance(value, int) or value < 0):
+                raise ValueError(f"{keyword} expects a non-negative integer, got {value!r}")
+        if limit == 0:
+            return
+        if plan.paths:
+            yield from self._match_product(plan, params, skip, limit)
+            return
+        
+        nodes = [
+            (p.label, _bind(p.properties, params), _bind(plan.conditions.get(p.var, []), params) if p.var else [])
+            for p in plan.nodes
+        ]
+        rels = [
+            (r, _bind(r.properties, params),
+             _bind(plan.conditions.get(r.var, []), params) if r.var and not r.variable_length else [])
+            for r in plan.rels
+        ]
+        
+        # Pick the most selective node pattern to start from
+        candidates = [self._index_candidates(label, filters, conds) for label, filters, conds in nodes]
+        sizes = [
+            len(ids) if ids is not None else self.count_nodes(label)
+            for ids, (label, _, _) in zip(candidates, nodes)
+        ]
+        start = min(range(len(nodes)), key=sizes.__getitem__)
+        
+        # Expand right from the start pattern, then left
+        steps = [(i, True) for i in range(start, len(rels))] + [(i, False) for i in range(start - 1, -1, -1)]
+        
+        # Positions sharing a variable must bind the same node
+        same_var = [
+            [j for j, q in enumerate(plan.nodes) if j != i and p.var and q.var == p.var]
+            for i, p in enumerate(plan.nodes)
+        ]
+        
+        # Work on interned label and type ids from here on (-1 never matches)
+        label, filters, conds = nodes[start]
+        nodes = [
+            (self._label_ids.get(label, -1) if label else None, filters, conds)
+            for label, filters, conds in nodes
+        ]
+        rels = [(r, self._type_filter(r.types), filters, conds) for r, filters, conds in rels]
+        node_ids = [None] * len(nodes)
+        rel_edges = [None] * len(rels)
+        matched = 0
+        for node_id in self._iter_node_ids(label, filters, conds, candidates[start]):
+            node_ids[start] = node_id
+            for _ in self._expand(nodes, rels, steps, 0, node_ids, rel_edges, same_var, set()):
+                # Skipped rows are counted but never materialized
+                matched += 1
+                if matched <= skip:
                     continue
-                
-                from_node = self.nodes.get(rel['from'])
-                to_node = self.nodes.get(rel['to'])
-                
-                if not from_node or not to_node:
+                yield self._build_row(plan, node_ids, rel_edges)
+                if limit is not None and matched - skip >= limit:
+                    return
+            node_ids[start] = None
+    
+    def _match_product(self, plan: 'CompiledQuery', params: Dict[str, Any], skip: int, limit: Optional[int]):
+        """Yield rows of comma-separated path patterns: every combination of the paths' rows
+        that binds shared variables to the same node or relationship"""
+        paths = [CompiledQuery('MATCH', nodes=plan.nodes, rels=plan.rels, conditions=plan.conditions)] + plan.paths
+        names = [
+            {p.var for p in path.nodes + path.rels if p.var}
+            for path in paths
+        ]
+        # The first path is streamed; the others are joined against it from memory
+        others = [list(self._match_rows(path, params)) for path in paths[1:]]
+        
+        matched = 0
+        for first in self._match_rows(paths[0], params):
+            for combination in itertools.product(*others):
+                row = dict(first)
+                bound = set(names[0])
+                for path_names, other in zip(names[1:], combination):
+                    if any(row[var] != other[var] for var in path_names & bound):
+                        break
+                    row.update(other)
+                    bound |= path_names
+                else:
+                    matched += 1
+                    if matched <= skip:
+                        continue
+                    if plan.return_vars is not None:
+                        row = {var: row[var] for var in plan.return_vars if var in row}
+                    yield row
+                    if limit is not None and matched - skip >= limit:
+                        return
+    
+    def _expand(self, nodes, rels, steps, k, node_ids, rel_edges, same_var, used):
+        """Recursively bind the remaining path steps; yields once per complete binding"""
+        if k == len(steps):
+            yield True
+            return
+        
+        i, forward = steps[k]
+        current, nxt = (node_ids[i], i + 1) if forward else (node_ids[i + 1], i)
+        rel, type_ids, rel_filters, rel_conds = rels[i]
+        label_id, filters, conds = nodes[nxt]
+        
+        for neighbour, edges in self._traverse(current, rel, type_ids, forward, rel_filters, rel_conds, used):
+            if any(node_ids[j] is not None and node_ids[j] != neighbour for j in same_var[nxt]):
+                continue
+            if label_id is not None and self._node_label_ids[neighbour] != label_id:
+                continue
+            if (filters or conds) and not self._record_matches(
+                    self._node_schemas[neighbour], self._node_values[neighbour], filters, conds, self._ids[neighbour]):
+                continue
+            
+            node_ids[nxt] = neighbour
+            rel_edges[i] = edges
+            used.update(edges)
+            yield from self._expand(nodes, rels, steps, k + 1, node_ids, rel_edges, same_var, used)
+            used.difference_update(edges)
+            node_ids[nxt] = None
+            rel_edges[i] = None
+    
+    def _traverse(self, index: int, rel: 'RelPattern', type_ids: Optional[set], forward: bool,
+                  filters: Dict[str, Any], conditions: List[tuple], used: set):
+        """Yield (neighbour, [edges]) int ids reachable from a node through a relationship pattern.
+        
+        Variable-length patterns are expanded depth-first without reusing an edge
+        within the same path.
+        """
+        if rel.direction == 'both':
+            directions = ('out', 'in')
+        elif (rel.direction == 'out') == forward:
+            directions = ('out',)
+        else:
+            directions = ('in',)
+        
+        def neighbours(current):
+            for direction in directions:
+                if direction == 'out':
+                    for edge in self._out_edge_ids(current, type_ids):
+                        yield edge, self._edge_dst[edge]
+                else:
+                    for edge in self._in_edge_ids(current, type_ids):
+                        yield edge, self._edge_src[edge]
+        
+        def edge_ok(edge, path_keys):
+            if edge in used or edge in path_keys:
+                return False
+            return not (filters or conditions) or self._record_matches(
+                self._edge_schemas[edge], self._edge_values[edge], filters, conditions)
+        
+        if not rel.variable_length:
+            for edge, neighbour in neighbours(index):
+                if edge_ok(edge, ()):
+                    yield neighbour, [edge]
+            return
+        
+        if rel.min_hops == 0:
+            yield index, []
+        
+        stack = [(index, [], set())]
+        while stack:
+            current, path, path_keys = stack.pop()
+            if rel.max_hops is not None and len(path) >= rel.max_hops:
+                continue
+            for edge, neighbour in neighbours(current):
+                if not edge_ok(edge, path_keys):
                     continue
-                
-                if from_node['label'] == label1 and to_node['label'] == label2:
-                    results.append({
-                        var1: {'id': rel['from'], **from_node['properties']},
-                        var2: {'id': rel['to'], **to_node['properties']},
-                        'relationship': rel['type']
-                    })
+                next_path = path + [edge]
+                if len(next_path) >= rel.min_hops:
+                    yield neighbour, next_path
+                stack.append((neighbour, next_path, path_keys | {edge}))
+    
+    def _build_row(self, plan: 'CompiledQuery', node_ids: List[int], rel_edges: List[list]) -> Dict[str, Any]:
+        """Materialize one result row from bound int node and edge ids"""
+        row = {}
+        for pattern, index in zip(plan.nodes, node_ids):
+            if pattern.var:
+                row[pattern.var] = {'id': self._ids[index], **self._node_properties(index)}
+        for pattern, edges in zip(plan.rels, rel_edges):
+            if pattern.var:
+                records = []
+                for e in edges:
+                    record = self._edge_record(e)
+                    records.append({'type': record['type'], 'from': record['from'], 'to': record['to'],
+                                    **record['properties']})
+                row[pattern.var] = records if pattern.variable_length else records[0]
+        
+        if plan.return_vars is not None:
+            row = {var: row[var] for var in plan.return_vars if var in row}
+        
+        # Single anonymous hop patterns also report the relationship type
+        if len(plan.rels) == 1 and not plan.rels[0].var and not plan.rels[0].variable_length:
+            row['relationship'] = self._types[self._edge_type_ids[rel_edges[0][0]]]
+        return row
+    
+    def _index_candidates(self, label: Optional[str], filters: Dict[str, Any],
+                          conditions: List[tuple]) -> Optional[List[str]]:
+        """Most selective index lookup for a node pattern (the id map or a secondary index), or None"""
+        candidates = None
+        
+        for prop, value in filters.items():
+            ids = self._id_candidates(label, value) if prop == 'id' else self.lookup_nodes(label, prop, value)
+            if ids is not None and (candidates is None or len(ids) < len(candidates)):
+                candidates = ids
+        
+        for prop, op, value in conditions:
+            if op == '=':
+                ids = self._id_candidates(label, value) if prop == 'id' else self.lookup_nodes(label, prop, value)
+            elif op in ('<', '<=', '>', '>='):
+                if op.startswith('<'):
+                    ids = self.lookup_range(label, prop, high=value, include_high=(op == '<='))
+                else:
+                    ids = self.lookup_range(label, prop, low=value, include_low=(op == '>='))
+            else:
+                ids = None
+            if ids is not None and (candidates is None or len(ids) < len(candidates)):
+                candidates = ids
+        
+        return candidates
+    
+    def _id_candidates(self, label: Optional[str], node_id: Any) -> List[str]:
+        """Primary-key lookup: [node_id] if that node exists (with the label, if one is given)"""
+        try:
+            index = self._id_map.get(node_id)
+        except TypeError:  # unhashable literal, never an id
+            return []
+        if index is None or (label and self._node_label(index) != label):
+            return []
+        return [node_id]
+    
+    def _iter_node_ids(self, label: Optional[str], filters: Dict[str, Any], conditions: List[tuple],
+                       candidates: Optional[List[str]] = None):
+        """Yield int ids of nodes of a label matching property filters and WHERE conditions.
+        
+        Uses the most selective secondary index lookup available before falling
+        back to a scan of the label.
+        """
+        if candidates is None:
+            candidates = self._index_candidates(label, filters, conditions)
+        if candidates is None:
+            candidates = self._label_index.get(label, ()) if label else range(len(self._ids))
+        else:
+            candidates = (self._id_map[nid] for nid in candidates)
         
-        return results
+        if not (filters or conditions):
+            yield from candidates
+            return
+        for index in candidates:
+            if self._record_matches(self._node_schemas[index], self._node_values[index], filters, conditions,
+                                    self._ids[index]):
+                yield index
     
-    def _execute_create(self, query: str) -> List[Dict[str, Any]]:
+    def _record_matches(self, schema: PropertySchema, values: tuple, filters: Dict[str, Any],
+                        conditions: List[tuple], node_id: Optional[str] = None) -> bool:
+        """Check packed node or edge properties against equality filters and WHERE conditions
+        
+        For nodes, node_id is given and the id property always resolves to it,
+        whether or not the id was stored among the properties.
+        """
+        for prop, value in filters.items():
+            if (node_id if prop == 'id' and node_id is not None else schema.get(values, prop)) != value:
+                return False
+        for prop, op, value in conditions:
+            node_value = node_id if prop == 'id' and node_id is not None else schema.get(values, prop)
+            if node_value is None:
+                return False
+            try:
+                if not COMPARISON_OPERATORS[op](node_value, value):
+                    return False
+            except TypeError:
+                return False
+        return True
+    
+    def _parse_where(self, query: str) -> Dict[str, List[tuple]]:
+        """Parse a WHERE clause like 'WHERE c.year >= "2023" AND c.type = "ISO"'
+        into {var: [(property, operator, value), ...]}"""
+        conditions = {}
+        masked = _mask_quoted(query)
+        where_match = re.search(r'\bWHERE\b(.*?)(?:\bRETURN\b|$)', masked, re.IGNORECASE | re.DOTALL)
+        if not where_match:
+            return conditions
+        
+        # Split at the ANDs outside quoted strings
+        bounds = [where_match.start(1)]
+        for and_match in re.finditer(r'\bAND\b', masked[:where_match.end(1)], re.IGNORECASE):
+            if and_match.start() >= bounds[0]:
+                bounds.extend(and_match.span())
+        bounds.append(where_match.end(1))
+        
+        condition_pattern = r'(\w+)\.(\w+)\s*(<>|!=|<=|>=|=|<|>)\s*(.+)'
+        for start, end in zip(bounds[::2], bounds[1::2]):
+            match = re.match(condition_pattern, query[start:end].strip(), re.DOTALL)
+            if match:
+                var, prop, op, value = match.groups()
+                conditions.setdefault(var, []).append((prop, op, self._parse_literal(value)))
+        return conditions
+    
+    def _parse_literal(self, value: str) -> Any:
+        """Parse a literal like "Leather", 'Leather', 2024, 4.5 or true"""
+        value = value.strip()
+        if value.startswith('$'):
+            return Parameter(value[1:])
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            return value[1:-1]
+        if value.lower() in ('true', 'false'):
+            return value.lower() == 'true'
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    
+    def _execute_create(self, plan: 'CompiledQuery') -> List[Dict[str, Any]]:
         """Execute CREATE queries"""
         # This is a simplified implementation
         return [{'result': 'Created'}]
@@ -134,52 +1332,97 @@ class GraphDatabase:
             if ':' in pair:
                 key, value = pair.split(':', 1)
                 key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                props[key] = value
+                value = value.strip()
+                if value.startswith('$'):
+                    props[key] = Parameter(value[1:])
+                else:
+                    props[key] = value.strip('"').strip("'")
         return props
     
     def get_all_nodes(self, label: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all nodes, optionally filtered by label"""
         if label:
             return [
-                {'id': nid, **node['properties']}
-                for nid, node in self.nodes.items()
-                if node['label'] == label
+                {'id': self._ids[index], **self._node_properties(index)}
+                for index in self._label_index.get(label, ())
             ]
         return [
-            {'id': nid, 'label': node['label'], **node['properties']}
-            for nid, node in self.nodes.items()
+            {'id': node_id, 'label': self._node_label(index), **self._node_properties(index)}
+            for index, node_id in enumerate(self._ids)
         ]
     
+    def get_nodes(self, node_ids) -> List[Dict[str, Any]]:
+        """Get nodes by id, skipping unknown ids"""
+        nodes = []
+        for node_id in node_ids:
+            index = self._id_map.get(node_id)
+            if index is not None:
+                nodes.append({'id': node_id, **self._node_properties(index)})
+        return nodes
+    
     def get_all_relationships(self, rel_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get all relationships, optionally filtered by type"""
         if rel_type:
-            return [r for r in self.relationships if r['type'] == rel_type]
-        return self.relationships
+            type_id = self._type_ids.get(rel_type)
+            return [
+                self._edge_record(edge)
+                for edge, edge_type in enumerate(self._edge_type_ids)
+                if edge_type == type_id
+            ]
+        return list(self.relationships)
+    
+    def count_nodes(self, label: Optional[str] = None) -> int:
+        """Count nodes, optionally filtered by label"""
+        if label:
+            return len(self._label_index.get(label, ()))
+        return len(self._ids)
+    
+    def count_relationships(self, rel_type: Optional[str] = None) -> int:
+        """Count relationships, optionally filtered by type"""
+        if rel_type:
+            return self._rel_type_counts.get(rel_type, 0)
+        return len(self._edge_src)
+    
+    def first_node(self, label: str) -> Optional[Dict[str, Any]]:
+        """First node of a label (get_all_nodes(label)[0] without building the rest), or None"""
+        members = self._label_index.get(label)
+        if not members:
+            return None
+        return {'id': self._ids[members[0]], **self._node_properties(members[0])}
+    
+    def first_relationship(self, rel_type: str) -> Optional[Dict[str, Any]]:
+        """First relationship of a type (get_all_relationships(rel_type)[0] without building the rest), or None"""
+        type_id = self._type_ids.get(rel_type)
+        if type_id is None:
+            return None
+        try:
+            return self._edge_record(self._edge_type_ids.index(type_id))
+        except ValueError:
+            return None
     
     def clear(self):
         """Clear all data from the database"""
-        self.nodes = {}
-        self.relationships = []
+        self._reset_storage()
         self.node_counter = 0
+        self._notify(None)
     
     def get_schema(self) -> Dict[str, Any]:
         """Get database schema information"""
-        labels = set(node['label'] for node in self.nodes.values())
-        rel_types = set(rel['type'] for rel in self.relationships)
-        
         return {
-            'node_labels': list(labels),
-            'relationship_types': list(rel_types),
-            'node_count': len(self.nodes),
-            'relationship_count': len(self.relationships)
+            'node_labels': list(self._label_index),
+            'relationship_types': list(self._rel_type_counts),
+            'label_counts': {label: len(ids) for label, ids in self._label_index.items()},
+            'relationship_type_counts': dict(self._rel_type_counts),
+            'node_count': len(self._ids),
+            'relationship_count': len(self._edge_src)
         }
     
     def export_to_json(self, filepath: str):
         """Export database to JSON file"""
         data = {
-            'nodes': self.nodes,
-            'relationships': self.relationships
+            'nodes': dict(self.nodes.items()),
+            'relationships': list(self.relationships),
+            'node_counter': self.node_counter
         }
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=2)
@@ -188,9 +1431,125 @@ class GraphDatabase:
         """Import database from JSON file"""
         with open(filepath, 'r') as f:
             data = json.load(f)
-        self.nodes = data.get('nodes', {})
-        self.relationships = data.get('relationships', [])
-
+        self._reset_storage()
+        listeners, self._listeners = self._listeners, []
+        try:
+            for node_id, node in data.get('nodes', {}).items():
+                self._put_node(node_id, node['label'], node['properties'])
+            for rel in data.get('relationships', []):
+                self.create_relationship(rel['from'], rel['to'], rel['type'], rel.get('properties'))
+        finally:
+            self._listeners = listeners
+        self.node_counter = data.get('node_counter', len(self._ids))
+        self._notify(None)
+    
+    def export_jsonl(self, filepath: str, batch_size: int = 10000,
+                     progress: Optional[Callable[[int, int], None]] = None):
+        """Export database to JSON Lines, one record per line (gzip-compressed if the path ends in .gz).
+        
+        The first line is a header with the node counter and index definitions,
+        followed by every node and then every relationship. Lines are written in
+        batches of batch_size, and progress(nodes, relationships) is called after
+        each batch with the running totals.
+        """
+        with _open_text(filepath, 'w') as f:
+            header = {'kind': 'header', 'node_counter': self.node_counter, 'indexes': self.list_indexes()}
+            f.write(json.dumps(header) + '\n')
+            
+            batch = []
+            nodes = relationships = 0
+            for index, node_id in enumerate(self._ids):
+                batch.append(json.dumps({
+                    'kind': 'node',
+                    'id': node_id,
+                    'label': self._node_label(index),
+                    'properties': self._node_properties(index)
+                }, default=str) + '\n')
+                nodes += 1
+                if len(batch) >= batch_size:
+                    f.writelines(batch)
+                    batch = []
+                    if progress:
+                        progress(nodes, relationships)
+            
+            for edge in range(len(self._edge_src)):
+                batch.append(json.dumps({'kind': 'relationship', **self._edge_record(edge)}, default=str) + '\n')
+                relationships += 1
+                if len(batch) >= batch_size:
+                    f.writelines(batch)
+                    batch = []
+                    if progress:
+                        progress(nodes, relationships)
+            
+            f.writelines(batch)
+            if progress:
+                progress(nodes, relationships)
+    
+    def import_jsonl(self, filepath: str, batch_size: int = 10000,
+                     progress: Optional[Callable[[int, int], None]] = None, append: bool = False):
+        """Import database from JSON Lines written by export_jsonl (or any node/relationship records).
+        
+        The file is read line by line and applied in batches of batch_size, so
+        memory use is bounded by the graph itself rather than the file size.
+        Secondary indexes (those already defined and those named in the header)
+        are maintained as nodes arrive. progress(nodes, relationships) is called
+        after each batch with the running totals. Unless append is True the
+        database is emptied first.
+        """
+        if not append:
+            self._reset_storage()
+            self.node_counter = 0
+            self._notify(None)
+        node_counter = None
+        nodes = relationships = 0
+        
+        with _open_text(filepath, 'r') as f:
+            batch = []
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                kind = record.get('kind')
+                if kind == 'header':
+                    node_counter = record.get('node_counter')
+                    for index in record.get('indexes', []):
+                        self.create_index(index['label'], index['property'], index.get('kind', 'hash'))
+                    continue
+                if kind not in ('node', 'relationship'):
+                    raise ValueError(f"Unknown record kind on line {line_number}: {kind}")
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    added = self._apply_records(batch)
+                    nodes += added[0]
+                    relationships += added[1]
+                    batch = []
+                    if progress:
+                        progress(nodes, relationships)
+            
+            added = self._apply_records(batch)
+            nodes += added[0]
+            relationships += added[1]
+            if progress:
+                progress(nodes, relationships)
+        
+        if node_counter is not None:
+            self.node_counter = max(self.node_counter, node_counter)
+        else:
+            self.node_counter += nodes
+    
+    def _apply_records(self, records: List[Dict[str, Any]]):
+        """Insert a batch of node and relationship records; returns (nodes, relationships) added"""
+        nodes = relationships = 0
+        for record in records:
+            if record['kind'] == 'node':
+                properties = record.get('properties', {})
+                self._put_node(record.get('id', properties.get('id')), record['label'], properties)
+                nodes += 1
+            else:
+                self.create_relationship(record['from'], record['to'], record['type'], record.get('properties'))
+                relationships += 1
+        return nodes, relationships
 
 # Global database instance
 db = GraphDatabase()
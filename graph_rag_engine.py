@@ -3,28 +3,110 @@ GraphRAG Query Engine using LangChain
 Translates natural language questions into graph queries
 """
 
+import asyncio
 import os
-from typing import Dict, List, Any, Optional
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Any, Optional, Union
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from graph_database import GraphDatabase
+from graph_snapshot import GraphSnapshot
+from metrics import MetricsSink, span
+from plan_cache import PlanCache, schema_fingerprint
+from answer_cache import AnswerCache
+from semantic_cache import SemanticCache
+from rule_planner import RulePlanner
+from result_packer import ResultPacker
+from query_filters import CompiledFilters
+from lineage import LineageView
 import json
 
+# Retrieval branches of a query plan: (stage name, label, intent keyword), in result order
+RETRIEVAL_BRANCHES = (
+    ('query_suppliers', 'Supplier', 'supplier'),
+    ('query_materials', 'Material', 'material'),
+    ('query_factories', 'Factory', 'factory'),
+    ('query_certifications', 'Certification', 'certification'),
+    ('query_collections', 'Collection', 'collection'),
+    ('query_products', 'Product', 'product'),
+)
+
 class GraphRAGEngine:
     """Graph Retrieval Augmented Generation Engine"""
     
-    def __init__(self, db: GraphDatabase, model: str = "gpt-4.1-mini"):
-        """Initialize the GraphRAG engine with database and LLM"""
+    def __init__(self, db: Union[GraphDatabase, GraphSnapshot], model: str = "gpt-4.1-mini", llm: Any = None,
+                 metrics: Optional[MetricsSink] = None, plan_cache: Optional[PlanCache] = None,
+                 answer_cache: Optional[AnswerCache] = None, semantic_cache: Optional[SemanticCache] = None,
+                 rule_planner: Union[RulePlanner, bool] = True, result_packer: Optional[ResultPacker] = None,
+                 lineage_view: Optional[LineageView] = None):
+        """Initialize the GraphRAG engine with a database (or a frozen snapshot of one) and LLM
+        
+        llm can be any chat model with invoke(messages) -> message; by default
+        a ChatOpenAI client for model is created. Stage latencies and token
+        counts of every query are reported to metrics (e.g. a HistogramRegistry).
+        Query plans are reused for repeated questions through plan_cache
+        (an in-memory PlanCache by default), and answers for a repeated
+        question over identical results through answer_cache; a mutable
+        database invalidates cached answers whose nodes change. With a
+        semantic_cache, re-phrasings of an earlier question reuse its plan
+        and answer as well. Questions the rule_planner recognizes are planned
+        without the LLM (True builds a RulePlanner over db, False disables it).
+        result_packer bounds the results sent to the answer prompt (by default
+        a ResultPacker with a 4000-token budget). Product traces are served from lineage_view (a
+        LineageView over db by default).
+        
+        The caches follow changes to a mutable db until close() is called
+        (or the engine is used as a context manager and the block exits).
+        """
         self.db = db
-        self.llm = ChatOpenAI(model=model, temperature=0)
+        self.llm = llm if llm is not None else ChatOpenAI(model=model, temperature=0, stream_usage=True)
+        self.metrics = metrics if metrics is not None else MetricsSink()
+        self.plan_cache = plan_cache if plan_cache is not None else PlanCache()
+        self.answer_cache = answer_cache if answer_cache is not None else AnswerCache()
+        if hasattr(db, 'add_listener'):
+            db.add_listener(self.answer_cache.invalidate)
+        self.semantic_cache = semantic_cache
+        self.rule_planner = RulePlanner(db) if rule_planner is True else rule_planner or None
+        self.result_packer = result_packer if result_packer is not None else ResultPacker()
+        self.lineage_view = lineage_view if lineage_view is not None else LineageView(db)
         
         # Get schema information
-        self.schema = self._get_schema_description()
+        self.refresh_schema()
         
         # Create prompts
         self.query_prompt = self._create_query_prompt()
         self.answer_prompt = self._create_answer_prompt()
     
+    def close(self):
+        """Unregister the answer cache, lineage view and rule planner from the database's listeners"""
+        if hasattr(self.db, 'remove_listener'):
+            self.db.remove_listener(self.answer_cache.invalidate)
+        self.lineage_view.close()
+        if self.rule_planner is not None:
+            self.rule_planner.close()
+    
+    def __enter__(self) -> 'GraphRAGEngine':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _schema_signature(self) -> tuple:
+        """Cheap summary of the schema (labels and relationship types) used to notice schema changes"""
+        schema = self.db.get_schema()
+        return tuple(schema['node_labels']), tuple(schema['relationship_types'])
+    
+    def refresh_schema(self):
+        """Re-read the schema from the database; cached plans made for another schema are dropped"""
+        self._seen_schema_signature = self._schema_signature()
+        self.schema = self._get_schema_description()
+        # Node and relationship counts change with every write, so they are left out of the fingerprint
+        self.schema_fingerprint = schema_fingerprint(self.schema.split('\nTotal Nodes:')[0])
+        self.plan_cache.retain(self.schema_fingerprint)
+        if self.semantic_cache is not None:
+            self.semantic_cache.retain(self.schema_fingerprint)
+    
     def _get_schema_description(self) -> str:
         """Generate a human-readable schema description"""
         schema = self.db.get_schema()
@@ -32,18 +114,16 @@ class GraphRAGEngine:
         # Get sample nodes for each label
         node_descriptions = []
         for label in schema['node_labels']:
-            nodes = self.db.get_all_nodes(label)
-            if nodes:
-                sample = nodes[0]
+            sample = self.db.first_node(label)
+            if sample:
                 properties = ', '.join(sample.keys())
                 node_descriptions.append(f"  - {label}: {properties}")
         
         # Get relationship descriptions
         rel_descriptions = []
         for rel_type in schema['relationship_types']:
-            rels = self.db.get_all_relationships(rel_type)
-            if rels:
-                sample = rels[0]
+            sample = self.db.first_relationship(rel_type)
+            if sample:
                 from_node = self.db.nodes.get(sample['from'])
                 to_node = self.db.nodes.get(sample['to'])
                 if from_node and to_node:
@@ -79,7 +159,7 @@ Question: {question}
 Provide your response as a JSON object with these fields:
 - "intent": What the user wants to know (e.g., "find suppliers", "trace materials", "verify certifications")
 - "entities": List of entity types involved (e.g., ["Supplier", "Material"])
-- "filters": Any specific filters mentioned (e.g., {{"year": "2024", "location": "Florence"}})
+- "filters": Any specific filters mentioned (e.g., {{"year": "2024", "location": "Florence"}}); use {{"gte": ..., "lte": ...}} for ranges (e.g., {{"year": {{"gte": "2023"}}}})
 - "relationships": List of relationship types to traverse (e.g., ["PROVIDES", "SUPPLIED_TO"])
 - "return_fields": What information to return
 
@@ -113,160 +193,316 @@ Answer:"""
             question: Natural language question about the supply chain
             
         Returns:
-            Dictionary with query results and generated answer
+            Dictionary with query results, generated answer, per-stage
+            timings in milliseconds and LLM token usage
         """
+        steps = self._query_steps(question)
+        try:
+            kind, payload = next(steps)
+            while True:
+                kind, payload = steps.send(None if kind == 'event' else self.llm.invoke(payload))
+        except StopIteration as done:
+            return done.value
+    
+    async def aquery(self, question: str) -> Dict[str, Any]:
+        """Asynchronous query(): LLM calls go through the model's ainvoke
         
-        # Step 1: Convert question to structured query plan
-        messages = self.query_prompt.format_messages(
-            schema=self.schema,
-            question=question
-        )
-        query_plan_response = self.llm.invoke(messages).content
-        
+        Models without ainvoke are called in a worker thread. Retrieval runs
+        on the event loop; it is in-memory and short next to an LLM round trip.
+        """
+        steps = self._query_steps(question)
         try:
-            query_plan = json.loads(query_plan_response)
-        except json.JSONDecodeError:
-            # Fallback if LLM doesn't return valid JSON
-            query_plan = {
-                "intent": "general_query",
-                "entities": [],
-                "filters": {},
-                "relationships": [],
-                "return_fields": []
-            }
+            kind, payload = next(steps)
+            while True:
+                kind, payload = steps.send(None if kind == 'event' else await self._ainvoke(payload))
+        except StopIteration as done:
+            return done.value
+    
+    def query_stream(self, question: str) -> Iterator[Dict[str, Any]]:
+        """query() as a stream of events, so callers can show progress before the answer is complete
+        
+        Yields, in order:
+            {"type": "plan", "query_plan", "plan_source"} once the plan is known
+            {"type": "results", "raw_results", "result_count"} after retrieval
+            {"type": "token", "text"} for each piece of the answer as the model streams it
+                (a cached answer arrives as a single token event)
+            {"type": "done", "result"} with the same result dict query() returns
+        
+        timings_ms gains "first_token", the time until the first answer token;
+        answer_generation then includes the time the consumer spends between tokens.
+        """
+        started = time.perf_counter()
+        first_token = None
+        steps = self._query_steps(question)
+        reply = None
+        try:
+            while True:
+                kind, payload = steps.send(reply)
+                reply = None
+                if kind == 'event':
+                    yield payload
+                elif kind == 'plan':
+                    reply = self.llm.invoke(payload)
+                else:
+                    for event in self._stream_answer(payload):
+                        if event['type'] == 'token':
+                            if first_token is None:
+                                first_token = (time.perf_counter() - started) * 1000
+                            yield event
+                        else:
+                            reply = event['message']
+        except StopIteration as done:
+            result = done.value
+        
+        if first_token is None:
+            first_token = (time.perf_counter() - started) * 1000
+            yield {"type": "token", "text": result['answer']}
+        result['timings_ms']['first_token'] = first_token
+        self.metrics.observe('graphrag_stage_seconds', first_token / 1000, {'stage': 'first_token'})
+        yield {"type": "done", "result": result}
+    
+    def _stream_answer(self, messages) -> Iterator[Dict[str, Any]]:
+        """Token events from the model's stream, then {"type": "message"} with the assembled reply"""
+        stream = getattr(self.llm, 'stream', None)
+        if stream is None:
+            message = self.llm.invoke(messages)
+            yield {"type": "token", "text": message.content}
+            yield {"type": "message", "message": message}
+            return
+        pieces = []
+        usage = {'input_tokens': 0, 'output_tokens': 0}
+        for chunk in stream(messages):
+            if chunk.content:
+                pieces.append(chunk.content)
+                yield {"type": "token", "text": chunk.content}
+            for kind, tokens in self._token_usage(chunk).items():
+                usage[kind] += tokens
+        yield {"type": "message", "message": SimpleNamespace(content=''.join(pieces), usage_metadata=usage)}
+    
+    async def aquery_many(self, questions: List[str], concurrency: int = 8,
+                          return_exceptions: bool = False) -> List[Any]:
+        """Answer many questions concurrently, with at most concurrency queries in flight
+        
+        Results come back in the order of questions. With return_exceptions
+        a failing question yields its exception instead of aborting the batch.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(question):
+            async with semaphore:
+                return await self.aquery(question)
+        
+        return await asyncio.gather(*(run(question) for question in questions), return_exceptions=return_exceptions)
+    
+    async def _ainvoke(self, messages) -> Any:
+        ainvoke = getattr(self.llm, 'ainvoke', None)
+        if ainvoke is None:
+            return await asyncio.to_thread(self.llm.invoke, messages)
+        return await ainvoke(messages)
+    
+    def _query_steps(self, question: str):
+        """The query pipeline as a generator shared by query() and aquery()
+        
+        It yields ("plan", messages) and ("answer", messages) for each LLM call
+        and is sent back the model's reply, and ("event", event) for progress
+        notifications (see query_stream); the query result is its return value.
+        """
+        timings = {}
+        started = time.perf_counter()
+        if self._schema_signature() != self._seen_schema_signature:
+            self.refresh_schema()
+        
+        # Step 1: Convert question to structured query plan, reusing the plan of a repeated question
+        # and planning recognizable questions by rule before asking the LLM
+        with span(timings, 'plan_cache'):
+            query_plan = self.plan_cache.get(question, self.schema_fingerprint)
+        plan_source = 'cache'
+        if query_plan is None and self.rule_planner is not None:
+            with span(timings, 'rule_planner'):
+                query_plan = self.rule_planner.plan(question)
+            plan_source = 'rules'
+            if query_plan is not None and self.semantic_cache is not None:
+                self.semantic_cache.add(question, self.schema_fingerprint, query_plan)
+        semantic_match = None
+        if query_plan is None and self.semantic_cache is not None:
+            with span(timings, 'semantic_cache'):
+                semantic_match = self.semantic_cache.lookup(question, self.schema_fingerprint)
+            if semantic_match is not None:
+                query_plan = semantic_match['plan']
+                plan_source = 'semantic'
+            self.metrics.increment('graphrag_semantic_cache_total', 1,
+                                   {'result': 'miss' if semantic_match is None else 'hit'})
+        plan_cached = plan_source in ('cache', 'semantic') and query_plan is not None
+        # A paraphrase shares the cached answers of the question it matched
+        cache_question = semantic_match['question'] if semantic_match else question
+        plan_message = None
+        
+        if query_plan is None:
+            plan_source = 'llm'
+            messages = self.query_prompt.format_messages(
+                schema=self.schema,
+                question=question
+            )
+            with span(timings, 'plan_generation'):
+                plan_message = yield 'plan', messages
+            query_plan_response = plan_message.content
+            
+            with span(timings, 'plan_parsing'):
+                try:
+                    query_plan = json.loads(query_plan_response)
+                    self.plan_cache.put(question, self.schema_fingerprint, query_plan)
+                    if self.semantic_cache is not None:
+                        self.semantic_cache.add(question, self.schema_fingerprint, query_plan)
+                except json.JSONDecodeError:
+                    # Fallback if LLM doesn't return valid JSON
+                    query_plan = {
+                        "intent": "general_query",
+                        "entities": [],
+                        "filters": {},
+                        "relationships": [],
+                        "return_fields": []
+                    }
+        
+        yield 'event', {"type": "plan", "query_plan": query_plan, "plan_source": plan_source}
         
         # Step 2: Execute graph queries based on the plan
-        raw_results = self._execute_query_plan(query_plan)
+        with span(timings, 'retrieval'):
+            raw_results = self._execute_query_plan(query_plan, timings)
+        yield 'event', {"type": "results", "raw_results": raw_results, "result_count": len(raw_results)}
         
         # Step 3: Generate natural language answer
-        answer_messages = self.answer_prompt.format_messages(
-            question=question,
-            results=json.dumps(raw_results, indent=2)
-        )
-        answer = self.llm.invoke(answer_messages).content
+        with span(timings, 'packing'):
+            results_json, packing = self.result_packer.pack(question, query_plan, raw_results)
+        with span(timings, 'answer_cache'):
+            answer = self.answer_cache.get(cache_question, results_json)
+        answer_cached = answer is not None
+        answer_message = None
+        
+        if not answer_cached:
+            answer_messages = self.answer_prompt.format_messages(
+                question=question,
+                results=results_json
+            )
+            with span(timings, 'answer_generation'):
+                answer_message = yield 'answer', answer_messages
+            answer = answer_message.content
+            self.answer_cache.put(cache_question, results_json, answer, self._result_node_ids(raw_results))
+        timings['total'] = (time.perf_counter() - started) * 1000
+        
+        token_usage = {
+            'plan': self._token_usage(plan_message),
+            'answer': self._token_usage(answer_message)
+        }
+        self._record_metrics(timings, token_usage)
+        self.metrics.increment('graphrag_plan_cache_total', 1, {'result': 'hit' if plan_source == 'cache' else 'miss'})
+        self.metrics.increment('graphrag_plan_source_total', 1, {'source': plan_source})
+        self.metrics.increment('graphrag_answer_cache_total', 1, {'result': 'hit' if answer_cached else 'miss'})
+        self.metrics.increment('graphrag_result_rows_truncated_total', packing['truncated_rows'])
         
         return {
             "question": question,
             "query_plan": query_plan,
+            "plan_cached": plan_cached,
+            "plan_source": plan_source,
+            "answer_cached": answer_cached,
+            "semantic_match": semantic_match and {
+                "question": semantic_match['question'],
+                "similarity": semantic_match['similarity']
+            },
             "raw_results": raw_results,
             "answer": answer.strip(),
-            "result_count": len(raw_results)
+            "result_count": len(raw_results),
+            "packing": packing,
+            "timings_ms": timings,
+            "token_usage": token_usage
         }
     
-    def _execute_query_plan(self, query_plan: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Execute the structured query plan against the graph database"""
+    @staticmethod
+    def _result_node_ids(raw_results: Any) -> set:
+        """Ids of every node referenced by the results (node ids and relationship endpoints)"""
+        node_ids = set()
+        stack = [raw_results]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    if key in ('id', 'from', 'to') and isinstance(item, str):
+                        node_ids.add(item)
+                    elif isinstance(item, (dict, list)):
+                        stack.append(item)
+            elif isinstance(value, list):
+                stack.extend(value)
+        return node_ids
+    
+    @staticmethod
+    def _token_usage(message: Any) -> Dict[str, int]:
+        """Input and output token counts reported by the LLM for one call (zero if not reported)"""
+        usage = getattr(message, 'usage_metadata', None)
+        if not usage:
+            token_usage = (getattr(message, 'response_metadata', None) or {}).get('token_usage') or {}
+            usage = {
+                'input_tokens': token_usage.get('prompt_tokens'),
+                'output_tokens': token_usage.get('completion_tokens')
+            }
+        return {
+            'input_tokens': int(usage.get('input_tokens') or 0),
+            'output_tokens': int(usage.get('output_tokens') or 0)
+        }
+    
+    def _record_metrics(self, timings: Dict[str, float], token_usage: Dict[str, Dict[str, int]]):
+        """Send stage latencies (in seconds) and token counts to the metrics sink"""
+        for stage, elapsed_ms in timings.items():
+            self.metrics.observe('graphrag_stage_seconds', elapsed_ms / 1000, {'stage': stage})
+        for call, usage in token_usage.items():
+            for kind, tokens in usage.items():
+                self.metrics.increment('graphrag_llm_tokens_total', tokens, {'call': call, 'kind': kind[:-len('_tokens')]})
+        self.metrics.increment('graphrag_queries_total')
+    
+    def _execute_query_plan(self, query_plan: Dict[str, Any],
+                            timings: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Execute the structured query plan against the graph database
+        
+        Every label the plan asks for is one retrieval branch that selects the
+        label's matching nodes. Their rows are concatenated in
+        RETRIEVAL_BRANCHES order and then enriched with relationships in a
+        single pass. The time spent in each branch and in
+        enrichment is recorded in timings (milliseconds) if given.
+        """
         
-        intent = query_plan.get("intent", "")
+        intent = query_plan.get("intent", "").lower()
         entities = query_plan.get("entities", [])
-        filters = query_plan.get("filters", {})
+        filters = CompiledFilters(query_plan.get("filters", {}))
         relationships = query_plan.get("relationships", [])
         
-        results = []
+        if timings is None:
+            timings = {}
         
         # Handle different query intents
-        if "supplier" in intent.lower() or "Supplier" in entities:
-            results.extend(self._query_suppliers(filters, relationships))
-        
-        if "material" in intent.lower() or "Material" in entities:
-            results.extend(self._query_materials(filters, relationships))
-        
-        if "factory" in intent.lower() or "Factory" in entities:
-            results.extend(self._query_factories(filters, relationships))
-        
-        if "certification" in intent.lower() or "Certification" in entities:
-            results.extend(self._query_certifications(filters, relationships))
-        
-        if "collection" in intent.lower() or "Collection" in entities:
-            results.extend(self._query_collections(filters, relationships))
+        branches = [(stage, label) for stage, label, keyword in RETRIEVAL_BRANCHES
+                    if keyword in intent or label in entities]
+        results = []
+        for stage, label in branches:
+            with span(timings, stage):
+                results.extend(self._filter_nodes(label, filters))
         
-        if "product" in intent.lower() or "Product" in entities:
-            results.extend(self._query_products(filters, relationships))
+        if results and relationships:
+            with span(timings, 'enrichment'):
+                self._enrich(results, relationships)
         
         # If no specific intent matched, return all relevant data
         if not results:
-            results = self._general_search(query_plan)
+            with span(timings, 'general_search'):
+                results = self._general_search(query_plan)
         
         return results
     
-    def _query_suppliers(self, filters: Dict, relationships: List[str]) -> List[Dict]:
-        """Query suppliers with optional filters and relationships"""
-        suppliers = self.db.get_all_nodes('Supplier')
-        
-        # Apply filters
-        if filters:
-            suppliers = [s for s in suppliers if self._matches_filters(s, filters)]
-        
-        # Enrich with relationships if specified
-        if relationships:
-            for supplier in suppliers:
-                supplier['relationships'] = self._get_node_relationships(supplier['id'], relationships)
-        
-        return suppliers
-    
-    def _query_materials(self, filters: Dict, relationships: List[str]) -> List[Dict]:
-        """Query materials with optional filters and relationships"""
-        materials = self.db.get_all_nodes('Material')
-        
-        if filters:
-            materials = [m for m in materials if self._matches_filters(m, filters)]
-        
-        if relationships:
-            for material in materials:
-                material['relationships'] = self._get_node_relationships(material['id'], relationships)
-        
-        return materials
-    
-    def _query_factories(self, filters: Dict, relationships: List[str]) -> List[Dict]:
-        """Query factories with optional filters and relationships"""
-        factories = self.db.get_all_nodes('Factory')
-        
-        if filters:
-            factories = [f for f in factories if self._matches_filters(f, filters)]
-        
-        if relationships:
-            for factory in factories:
-                factory['relationships'] = self._get_node_relationships(factory['id'], relationships)
-        
-        return factories
-    
-    def _query_certifications(self, filters: Dict, relationships: List[str]) -> List[Dict]:
-        """Query certifications with optional filters and relationships"""
-        certifications = self.db.get_all_nodes('Certification')
-        
-        if filters:
-            certifications = [c for c in certifications if self._matches_filters(c, filters)]
-        
-        if relationships:
-            for cert in certifications:
-                cert['relationships'] = self._get_node_relationships(cert['id'], relationships)
-        
-        return certifications
-    
-    def _query_collections(self, filters: Dict, relationships: List[str]) -> List[Dict]:
-        """Query collections with optional filters and relationships"""
-        collections = self.db.get_all_nodes('Collection')
-        
-        if filters:
-            collections = [c for c in collections if self._matches_filters(c, filters)]
-        
-        if relationships:
-            for collection in collections:
-                collection['relationships'] = self._get_node_relationships(collection['id'], relationships)
-        
-        return collections
-    
-    def _query_products(self, filters: Dict, relationships: List[str]) -> List[Dict]:
-        """Query products with optional filters and relationships"""
-        products = self.db.get_all_nodes('Product')
-        
-        if filters:
-            products = [p for p in products if self._matches_filters(p, filters)]
-        
-        if relationships:
-            for product in products:
-                product['relationships'] = self._get_node_relationships(product['id'], relationships)
-        
-        return products
+    def _enrich(self, rows: List[Dict], relationships: List[str]):
+        """Attach the relationships of the given types to every row, looked up for all rows at once"""
+        grouped = self.db.neighbourhoods([row['id'] for row in rows], relationships or None)
+        for row in rows:
+            row['relationships'] = self._relationship_entries(grouped.get(row['id']))
     
     def _general_search(self, query_plan: Dict) -> List[Dict]:
         """Perform a general search across all node types"""
@@ -280,42 +516,28 @@ Answer:"""
         
         return results
     
-    def _matches_filters(self, node: Dict, filters: Dict) -> bool:
-        """Check if a node matches the given filters"""
-        for key, value in filters.items():
-            node_value = node.get(key, '')
-            if isinstance(node_value, str) and isinstance(value, str):
-                if value.lower() not in node_value.lower():
-                    return False
-            elif node_value != value:
-                return False
-        return True
+    def _filter_nodes(self, label: str, filters: Union[Dict, CompiledFilters]) -> List[Dict]:
+        """Get nodes of a label matching the filters, narrowing candidates through secondary indexes first"""
+        if not isinstance(filters, CompiledFilters):
+            filters = CompiledFilters(filters)
+        return filters.select(self.db, label)
     
     def _get_node_relationships(self, node_id: str, rel_types: List[str]) -> Dict[str, List]:
         """Get all relationships for a node, filtered by type"""
+        return self._relationship_entries(self.db.neighbourhoods([node_id], rel_types or None).get(node_id))
+    
+    def _relationship_entries(self, grouped: Optional[Dict[str, List[tuple]]]) -> Dict[str, List]:
+        """Relationship dicts for a row from one node's entry of db.neighbourhoods"""
         relationships = {'outgoing': [], 'incoming': []}
-        
-        for rel in self.db.relationships:
-            if rel['from'] == node_id and (not rel_types or rel['type'] in rel_types):
-                to_node = self.db.nodes.get(rel['to'])
-                if to_node:
-                    relationships['outgoing'].append({
-                        'type': rel['type'],
-                        'to': rel['to'],
-                        'to_label': to_node['label'],
-                        'to_name': to_node['properties'].get('name', rel['to'])
-                    })
-            
-            if rel['to'] == node_id and (not rel_types or rel['type'] in rel_types):
-                from_node = self.db.nodes.get(rel['from'])
-                if from_node:
-                    relationships['incoming'].append({
-                        'type': rel['type'],
-                        'from': rel['from'],
-                        'from_label': from_node['label'],
-                        'from_name': from_node['properties'].get('name', rel['from'])
-                    })
-        
+        if grouped:
+            relationships['outgoing'] = [
+                {'type': rel_type, 'to': to_id, 'to_label': label, 'to_name': name}
+                for rel_type, to_id, label, name in grouped['outgoing']
+            ]
+            relationships['incoming'] = [
+                {'type': rel_type, 'from': from_id, 'from_label': label, 'from_name': name}
+                for rel_type, from_id, label, name in grouped['incoming']
+            ]
         return relationships
     
     def trace_supply_chain(self, product_id: str) -> Dict[str, Any]:
@@ -323,76 +545,11 @@ Answer:"""
         Trace the complete supply chain for a product
         Returns the full path from suppliers to final product
         """
-        
-        # Get the product
-        product_node = self.db.nodes.get(product_id)
-        if not product_node:
+        trace = self.lineage_view.get(product_id)
+        if trace is None:
             return {"error": f"Product {product_id} not found"}
-        
-        trace = {
-            "product": product_node['properties'],
-            "factory": None,
-            "materials": [],
-            "suppliers": [],
-            "certifications": []
-        }
-        
-        # Find factory that manufactures this product
-        for rel in self.db.relationships:
-            if rel['to'] == product_id and rel['type'] == 'MANUFACTURES':
-                factory_node = self.db.nodes.get(rel['from'])
-                if factory_node:
-                    trace['factory'] = factory_node['properties']
-                    
-                    # Find factory certifications
-                    for cert_rel in self.db.relationships:
-                        if cert_rel['from'] == rel['from'] and cert_rel['type'] == 'HAS_CERTIFICATION':
-                            cert_node = self.db.nodes.get(cert_rel['to'])
-                            if cert_node:
-                                trace['certifications'].append(cert_node['properties'])
-        
-        # Find materials supplied to the factory
-        if trace['factory']:
-            factory_id = None
-            for rel in self.db.relationships:
-                if rel['to'] == product_id and rel['type'] == 'MANUFACTURES':
-                    factory_id = rel['from']
-                    break
-            
-            if factory_id:
-                for rel in self.db.relationships:
-                    if rel['to'] == factory_id and rel['type'] == 'SUPPLIED_TO':
-                        material_node = self.db.nodes.get(rel['from'])
-                        if material_node:
-                            material_info = material_node['properties'].copy()
-                            
-                            # Find suppliers for this material
-                            material_suppliers = []
-                            for sup_rel in self.db.relationships:
-                                if sup_rel['to'] == rel['from'] and sup_rel['type'] == 'PROVIDES':
-                                    supplier_node = self.db.nodes.get(sup_rel['from'])
-                                    if supplier_node:
-                                        material_suppliers.append(supplier_node['properties'])
-                            
-                            material_info['suppliers'] = material_suppliers
-                            trace['materials'].append(material_info)
-                            
-                            # Add suppliers to main list
-                            trace['suppliers'].extend(material_suppliers)
-        
-        # Remove duplicates from suppliers
-        seen = set()
-        unique_suppliers = []
-        for supplier in trace['suppliers']:
-            supplier_id = supplier.get('id')
-            if supplier_id not in seen:
-                seen.add(supplier_id)
-                unique_suppliers.append(supplier)
-        trace['suppliers'] = unique_suppliers
-        
         return trace
 
-
 if __name__ == "__main__":
     # Test the GraphRAG engine
     from populate_data import populate_supply_chain_data
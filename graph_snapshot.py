@@ -0,0 +1,838 @@
+"""
+Frozen Graph Snapshots for Supply Chain Validator
+Immutable, read-optimized copy of a GraphDatabase with CSR adjacency in NumPy
+
+Snapshots are columnar: node ids and string values live in string tables,
+properties in one typed column per key, and adjacency in CSR arrays. The same
+layout is written to disk by save() and memory-mapped back by load(), so a
+snapshot file opens without parsing and its pages are shared between processes.
+"""
+
+import json
+import mmap
+from bisect import bisect_left
+from typing import Callable, Dict, List, Any, Optional, Tuple
+import numpy as np
+
+from graph_database import NodeView, RelationshipView, HashIndex, SortedIndex
+
+SNAPSHOT_MAGIC = b'SCGSNAP\0'
+SNAPSHOT_VERSION = 1
+SECTION_ALIGNMENT = 64
+
+# Column kinds and the NumPy dtype of their data array
+COLUMN_DTYPES = {
+    'str': np.int32,  # index into the value string table
+    'json': np.int32,  # index into the value string table, JSON-encoded
+    'int': np.int64,
+    'float': np.float64,
+    'bool': np.uint8,
+}
+
+
+def _readonly(values: np.ndarray) -> np.ndarray:
+    values.flags.writeable = False
+    return values
+
+
+def _build_csr(sources: np.ndarray, targets: np.ndarray, edge_ids: np.ndarray, node_count: int):
+    """Build (indptr, indices, edge_ids) CSR arrays for edges grouped by source"""
+    order = np.argsort(sources, kind='stable')
+    counts = np.bincount(sources, minlength=node_count)
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return (
+        _readonly(indptr),
+        _readonly(targets[order].astype(np.int32)),
+        _readonly(edge_ids[order].astype(np.int32))
+    )
+
+
+def _gather(indptr: np.ndarray, nodes: np.ndarray):
+    """Vectorized CSR row gather.
+    
+    Returns (origin, positions): for every edge leaving one of the given nodes,
+    the position of its node in the input and its position in the CSR arrays.
+    """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    block_starts = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - block_starts, lengths) + np.arange(total)
+    origin = np.repeat(np.arange(len(nodes)), lengths)
+    return origin, positions
+
+
+class StringTable:
+    """Immutable sequence of strings stored as UTF-8 offsets and blob arrays"""
+    
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+        self._bytes = None  # blob as bytes, made on the first take()
+    
+    @classmethod
+    def build(cls, strings: List[str]) -> 'StringTable':
+        encoded = [s.encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(_readonly(offsets), _readonly(blob.copy()))
+    
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.blob[start:end].tobytes().decode('utf-8')
+    
+    def take(self, indices: np.ndarray) -> List[str]:
+        """Strings at many positions; each distinct string is decoded once"""
+        if self._bytes is None:
+            self._bytes = self.blob.tobytes()
+        blob = self._bytes
+        unique, inverse = np.unique(indices, return_inverse=True)
+        decoded = [
+            blob[start:end].decode('utf-8')
+            for start, end in zip(self.offsets[unique].tolist(), self.offsets[unique + 1].tolist())
+        ]
+        return [decoded[i] for i in inverse.tolist()]
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __iter__(self):
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+
+class _SortedIds:
+    """Node ids in lexicographic order, as a lazy sequence for binary search"""
+    
+    def __init__(self, ids: StringTable, order: np.ndarray):
+        self._ids = ids
+        self._order = order
+    
+    def __getitem__(self, position: int) -> str:
+        return self._ids[self._order[position]]
+    
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class IdIndex:
+    """Read-only node id -> int id map backed by a sorted permutation of the id table"""
+    
+    def __init__(self, ids: StringTable, order: np.ndarray):
+        self._order = order
+        self._sorted = _SortedIds(ids, order)
+    
+    def get(self, node_id: str, default: Optional[int] = None) -> Optional[int]:
+        if not isinstance(node_id, str):
+            return default
+        position = bisect_left(self._sorted, node_id)
+        if position < len(self._sorted) and self._sorted[position] == node_id:
+            return int(self._order[position])
+        return default
+    
+    def __getitem__(self, node_id: str) -> int:
+        index = self.get(node_id)
+        if index is None:
+            raise KeyError(node_id)
+        return index
+    
+    def __contains__(self, node_id) -> bool:
+        return self.get(node_id) is not None
+    
+    def __len__(self) -> int:
+        return len(self._order)
+
+
+class PropertyColumn:
+    """One property key stored column-wise; presence is given by the record's schema"""
+    
+    def __init__(self, kind: str, data: np.ndarray, strings: StringTable):
+        self.kind = kind
+        self.data = data
+        self.strings = strings
+    
+    @classmethod
+    def build(cls, values: List[Any], rows: List[int], size: int, intern: Dict[str, int],
+              strings: List[str]) -> 'PropertyColumn':
+        """Build a column of the narrowest kind that round-trips every value"""
+        kinds = {type(v) for v in values}
+        if kinds <= {str}:
+            kind = 'str'
+        elif kinds <= {bool}:
+            kind = 'bool'
+        elif kinds <= {int} and all(-2**63 <= v < 2**63 for v in values):
+            kind = 'int'
+        elif kinds <= {float}:
+            kind = 'float'
+        else:
+            kind = 'json'
+        
+        data = np.zeros(size, dtype=COLUMN_DTYPES[kind])
+        if kind == 'str' or kind == 'json':
+            data[:] = -1
+            encoded = values if kind == 'str' else [json.dumps(v, default=str) for v in values]
+            ids = []
+            for value in encoded:
+                string_id = intern.get(value)
+                if string_id is None:
+                    string_id = intern[value] = len(strings)
+                    strings.append(value)
+                ids.append(string_id)
+            data[rows] = ids
+        else:
+            data[rows] = values
+        return cls(kind, _readonly(data), None)
+    
+    def get(self, row: int) -> Any:
+        value = self.data[row]
+        if self.kind == 'str':
+            return self.strings[value]
+        if self.kind == 'json':
+            return json.loads(self.strings[value])
+        if self.kind == 'bool':
+            return bool(value)
+        return value.item()
+    
+    def take(self, rows: np.ndarray) -> List[Any]:
+        """Values of many rows, all of which must have the key"""
+        data = self.data[rows]
+        if self.kind == 'str':
+            return self.strings.take(data)
+        if self.kind == 'json':
+            return [json.loads(value) for value in self.strings.take(data)]
+        if self.kind == 'bool':
+            return data.astype(bool).tolist()
+        return data.tolist()
+
+
+class _PropertyStore:
+    """Columnar properties for nodes or edges: per-record schema ids plus one column per key"""
+    
+    def __init__(self, schemas: List[tuple], schema_ids: np.ndarray, columns: Dict[str, PropertyColumn]):
+        self.schemas = schemas
+        self.schema_ids = schema_ids
+        self.columns = columns
+    
+    @classmethod
+    def build(cls, records, size: int, intern: Dict[str, int], strings: List[str]) -> '_PropertyStore':
+        """Build from an iterable of (keys tuple, values tuple) per record"""
+        schema_ids = np.zeros(size, dtype=np.int32)
+        schema_lookup = {}
+        schemas = []
+        column_values = {}
+        for row, (keys, values) in enumerate(records):
+            schema_id = schema_lookup.get(keys)
+            if schema_id is None:
+                schema_id = schema_lookup[keys] = len(schemas)
+                schemas.append(keys)
+            schema_ids[row] = schema_id
+            for key, value in zip(keys, values):
+                rows, vals = column_values.setdefault(key, ([], []))
+                rows.append(row)
+                vals.append(value)
+        columns = {
+            key: PropertyColumn.build(vals, rows, size, intern, strings)
+            for key, (rows, vals) in column_values.items()
+        }
+        return cls(schemas, _readonly(schema_ids), columns)
+    
+    def attach(self, strings: StringTable):
+        for column in self.columns.values():
+            column.strings = strings
+    
+    def get(self, row: int, key: str, default: Any = None) -> Any:
+        if key not in self.schemas[self.schema_ids[row]]:
+            return default
+        return self.columns[key].get(row)
+    
+    def to_dict(self, row: int) -> Dict[str, Any]:
+        columns = self.columns
+        return {key: columns[key].get(row) for key in self.schemas[self.schema_ids[row]]}
+    
+    def to_dicts(self, rows: np.ndarray, keys: Optional[set] = None,
+                 leading: Tuple[Tuple[str, List[Any]], ...] = ()) -> List[Dict[str, Any]]:
+        """to_dict for many rows, gathered one column at a time per schema
+        
+        keys restricts the properties returned; leading (key, values) pairs,
+        aligned with rows, are put first in every dict.
+        """
+        if not len(rows):
+            return []
+        schema_ids = self.schema_ids[rows]
+        order = np.argsort(schema_ids, kind='stable')
+        grouped = schema_ids[order]
+        starts = np.flatnonzero(grouped[1:] != grouped[:-1]) + 1
+        bounds = [0, *starts.tolist(), len(rows)]
+        records = [None] * len(rows)
+        for start, stop in zip(bounds, bounds[1:]):
+            positions = order[start:stop]
+            schema = self.schemas[grouped[start]]
+            if keys is not None:
+                schema = tuple(key for key in schema if key in keys)
+            group = rows[positions]
+            names = [key for key, _ in leading] + list(schema)
+            if len(bounds) == 2:
+                columns = [values for _, values in leading]
+            else:
+                columns = [[values[i] for i in positions.tolist()] for _, values in leading]
+            columns += [self.columns[key].take(group) for key in schema]
+            built = [dict(zip(names, values)) for values in zip(*columns)] if columns else [{} for _ in group]
+            if len(bounds) == 2:
+                return built
+            for position, record in zip(positions.tolist(), built):
+                records[position] = record
+        return records
+
+
+class GraphSnapshot:
+    """Immutable snapshot of a GraphDatabase for read-heavy traversal
+    
+    Adjacency is stored per relationship type (and for all types together) as
+    CSR arrays, in both directions, so neighbour, k-hop and reachability queries
+    run as NumPy array operations. It offers the same read API as GraphDatabase
+    (nodes, relationships, get_all_nodes, out_edges, lookup_nodes, ...), so a
+    GraphRAGEngine can be pointed at either.
+    
+    Create one with GraphDatabase.freeze() or GraphSnapshot.load(path).
+    """
+    
+    def __init__(self, header: Dict[str, Any], arrays: Dict[str, np.ndarray], buffer=None):
+        self._buffer = buffer  # keeps a memory map alive for the arrays that view it
+        self._header = header
+        
+        # Nodes
+        self._ids = StringTable(arrays['ids.offsets'], arrays['ids.blob'])
+        self._id_map = IdIndex(self._ids, arrays['ids.order'])
+        self._labels = header['labels']
+        self._label_ids = {label: i for i, label in enumerate(self._labels)}
+        self._node_label_ids = arrays['nodes.label']
+        self._label_index = {label: arrays[f'label.{label}'] for label in header['label_index']}
+        
+        # Edges
+        self._types = header['types']
+        self._type_ids = {rel_type: i for i, rel_type in enumerate(self._types)}
+        self._edge_src = arrays['edges.src']
+        self._edge_dst = arrays['edges.dst']
+        self._edge_type_ids = arrays['edges.type']
+        self._rel_type_counts = header['relationship_type_counts']
+        
+        # Properties
+        self._strings = StringTable(arrays['strings.offsets'], arrays['strings.blob'])
+        self._node_props = self._load_store(header['node_properties'], 'nodes', arrays)
+        self._edge_props = self._load_store(header['edge_properties'], 'edges', arrays)
+        
+        # Adjacency: {type id or None: (indptr, indices, edge_ids)}
+        self._out_csr, self._in_csr = {}, {}
+        for key in [None] + list(range(len(self._types))):
+            name = 'all' if key is None else str(key)
+            self._out_csr[key] = tuple(arrays[f'csr.out.{name}.{part}'] for part in ('indptr', 'indices', 'edges'))
+            self._in_csr[key] = tuple(arrays[f'csr.in.{name}.{part}'] for part in ('indptr', 'indices', 'edges'))
+        
+        # Secondary indexes are rebuilt from the columns on first use
+        self._index_defs = {(d['label'], d['property']): d['kind'] for d in header['indexes']}
+        self._property_indexes = {}
+        # The value string table as NumPy arrays (values, lower-cased), built on first column-wise filter
+        self._string_arrays = None
+        
+        self.nodes = NodeView(self)
+        self.relationships = RelationshipView(self)
+    
+    def _load_store(self, meta: Dict[str, Any], prefix: str, arrays: Dict[str, np.ndarray]) -> _PropertyStore:
+        columns = {
+            key: PropertyColumn(kind, arrays[f'{prefix}.col.{key}'], self._strings)
+            for key, kind in meta['columns'].items()
+        }
+        return _PropertyStore([tuple(keys) for keys in meta['schemas']], arrays[f'{prefix}.schema'], columns)
+    
+    @classmethod
+    def from_database(cls, db) -> 'GraphSnapshot':
+        """Build a snapshot from the current contents of a GraphDatabase"""
+        node_count = len(db._ids)
+        edge_count = len(db._edge_src)
+        arrays = {}
+        
+        ids = StringTable.build(db._ids)
+        arrays['ids.offsets'], arrays['ids.blob'] = ids.offsets, ids.blob
+        arrays['ids.order'] = _readonly(np.array(sorted(range(node_count), key=db._ids.__getitem__), dtype=np.int32))
+        arrays['nodes.label'] = _readonly(np.array(db._node_label_ids, dtype=np.int32))
+        for label, members in db._label_index.items():
+            arrays[f'label.{label}'] = _readonly(np.array(members, dtype=np.int32))
+        
+        src = _readonly(np.array(db._edge_src, dtype=np.int32))
+        dst = _readonly(np.array(db._edge_dst, dtype=np.int32))
+        types = _readonly(np.array(db._edge_type_ids, dtype=np.int32))
+        arrays['edges.src'], arrays['edges.dst'], arrays['edges.type'] = src, dst, types
+        
+        # Shared string table for property values
+        intern, strings = {}, []
+        node_props = _PropertyStore.build(
+            ((schema.keys, values) for schema, values in zip(db._node_schemas, db._node_values)),
+            node_count, intern, strings
+        )
+        edge_props = _PropertyStore.build(
+            ((schema.keys, values) for schema, values in zip(db._edge_schemas, db._edge_values)),
+            edge_count, intern, strings
+        )
+        value_table = StringTable.build(strings)
+        arrays['strings.offsets'], arrays['strings.blob'] = value_table.offsets, value_table.blob
+        for prefix, store in (('nodes', node_props), ('edges', edge_props)):
+            arrays[f'{prefix}.schema'] = store.schema_ids
+            for key, column in store.columns.items():
+                arrays[f'{prefix}.col.{key}'] = column.data
+        
+        edge_ids = np.arange(edge_count, dtype=np.int32)
+        for key in [None] + list(range(len(db._types))):
+            name = 'all' if key is None else str(key)
+            mask = slice(None) if key is None else types == key
+            out_csr = _build_csr(src[mask], dst[mask], edge_ids[mask], node_count)
+            in_csr = _build_csr(dst[mask], src[mask], edge_ids[mask], node_count)
+            for direction, csr in (('out', out_csr), ('in', in_csr)):
+                for part, values in zip(('indptr', 'indices', 'edges'), csr):
+                    arrays[f'csr.{direction}.{name}.{part}'] = values
+        
+        header = {
+            'version': SNAPSHOT_VERSION,
+            'node_count': node_count,
+            'edge_count': edge_count,
+            'labels': list(db._labels),
+            'types': list(db._types),
+            'label_index': list(db._label_index),
+            'relationship_type_counts': dict(db._rel_type_counts),
+            'node_properties': {
+                'schemas': [list(keys) for keys in node_props.schemas],
+                'columns': {key: column.kind for key, column in node_props.columns.items()}
+            },
+            'edge_properties': {
+                'schemas': [list(keys) for keys in edge_props.schemas],
+                'columns': {key: column.kind for key, column in edge_props.columns.items()}
+            },
+            'indexes': db.list_indexes(),
+        }
+        snapshot = cls(header, arrays)
+        snapshot._property_indexes = {
+            (label, prop): index.copy()
+            for label, indexes in db._property_indexes.items()
+            for prop, index in indexes.items()
+        }
+        snapshot._arrays = arrays
+        return snapshot
+    
+    # ---- binary format ----
+    
+    def save(self, filepath: str):
+        """Write the snapshot in the versioned binary format.
+        
+        Layout: magic (8 bytes), format version (uint32), header length (uint32),
+        JSON header, then every array as a 64-byte aligned section. The header
+        records each section's dtype, length and offset from the data start.
+        """
+        arrays = self._arrays
+        sections = {}
+        offset = 0
+        for name, values in arrays.items():
+            sections[name] = {'dtype': values.dtype.str, 'length': int(values.size), 'offset': offset}
+            offset += -(-values.nbytes // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+        header = json.dumps({**self._header, 'sections': sections}).encode('utf-8')
+        
+        with open(filepath, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(np.array([SNAPSHOT_VERSION, len(header)], dtype='<u4').tobytes())
+            f.write(header)
+            f.write(b'\0' * (-f.tell() % SECTION_ALIGNMENT))
+            data_start = f.tell()
+            for name, values in arrays.items():
+                f.write(b'\0' * (data_start + sections[name]['offset'] - f.tell()))
+                f.write(np.ascontiguousarray(values).tobytes())
+    
+    @classmethod
+    def load(cls, filepath: str) -> 'GraphSnapshot':
+        """Open a snapshot file through mmap; arrays are read-only views of the mapped pages"""
+        with open(filepath, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if buffer[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            raise ValueError(f"Not a graph snapshot file: {filepath}")
+        version, header_length = np.frombuffer(buffer, dtype='<u4', count=2, offset=len(SNAPSHOT_MAGIC))
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+        
+        header_start = len(SNAPSHOT_MAGIC) + 8
+        header = json.loads(buffer[header_start:header_start + int(header_length)].decode('utf-8'))
+        data_start = header_start + int(header_length)
+        data_start += -data_start % SECTION_ALIGNMENT
+        
+        arrays = {
+            name: np.frombuffer(buffer, dtype=np.dtype(meta['dtype']), count=meta['length'],
+                                offset=data_start + meta['offset'])
+            for name, meta in header.pop('sections').items()
+        }
+        snapshot = cls(header, arrays, buffer)
+        snapshot._arrays = arrays
+        return snapshot
+    
+    # ---- id translation ----
+    
+    def node_index(self, node_id: str) -> Optional[int]:
+        """Integer id of a node, or None if it does not exist"""
+        return self._id_map.get(node_id)
+    
+    def node_id(self, index: int) -> str:
+        """Node id for an integer id"""
+        return self._ids[index]
+    
+    def indices(self, node_ids) -> np.ndarray:
+        """Integer ids for node ids, skipping unknown ids"""
+        found = (self._id_map.get(n) for n in node_ids)
+        return np.array([i for i in found if i is not None], dtype=np.int64)
+    
+    def ids_of(self, indices: np.ndarray) -> List[str]:
+        """Node ids for an array of integer ids"""
+        return self._ids.take(np.asarray(indices, dtype=np.int64))
+    
+    # ---- vectorized traversal ----
+    
+    def _csr_list(self, rel_type, direction: str):
+        """CSR structures to traverse for a type filter and direction ('out', 'in' or 'both')"""
+        if rel_type is None:
+            type_ids = [None]
+        else:
+            if isinstance(rel_type, str):
+                rel_type = (rel_type,)
+            type_ids = [self._type_ids[t] for t in rel_type if t in self._type_ids]
+        
+        csrs = []
+        if direction in ('out', 'both'):
+            csrs.extend(self._out_csr[t] for t in type_ids)
+        if direction in ('in', 'both'):
+            csrs.extend(self._in_csr[t] for t in type_ids)
+        if direction not in ('out', 'in', 'both'):
+            raise ValueError(f"Unknown direction: {direction} (expected 'out', 'in' or 'both')")
+        return csrs
+    
+    def expand(self, nodes: np.ndarray, rel_type=None, direction: str = 'out'):
+        """Every edge touching the given int node ids.
+        
+        Returns (origin, neighbours, edge_ids) arrays, where origin is the position
+        of the edge's node in the input array.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        origins, neighbours, edges = [], [], []
+        for indptr, indices, edge_ids in self._csr_list(rel_type, direction):
+            origin, positions = _gather(indptr, nodes)
+            origins.append(origin)
+            neighbours.append(indices[positions])
+            edges.append(edge_ids[positions])
+        if not origins:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(origins), np.concatenate(neighbours), np.concatenate(edges)
+    
+    def neighbour_indices(self, nodes: np.ndarray, rel_type=None, direction: str = 'out') -> np.ndarray:
+        """Sorted unique int ids of the neighbours of the given int node ids"""
+        _, neighbours, _ = self.expand(nodes, rel_type, direction)
+        return np.unique(neighbours)
+    
+    def k_hop(self, nodes: np.ndarray, k: int, rel_type=None, direction: str = 'out') -> np.ndarray:
+        """Sorted int ids of nodes reachable in 1..k hops (seeds included only if revisited)"""
+        visited = np.zeros(len(self._ids), dtype=bool)
+        reached = np.zeros(len(self._ids), dtype=bool)
+        frontier = np.unique(np.asarray(nodes, dtype=np.int64))
+        visited[frontier] = True
+        for _ in range(k):
+            if not len(frontier):
+                break
+            neighbours = self.neighbour_indices(frontier, rel_type, direction)
+            reached[neighbours] = True
+            frontier = neighbours[~visited[neighbours]]
+            visited[frontier] = True
+        return np.flatnonzero(reached)
+    
+    def reachable(self, sources: np.ndarray, rel_type=None, direction: str = 'out',
+                  max_hops: Optional[int] = None) -> np.ndarray:
+        """Boolean mask over all nodes that can be reached from the sources (sources included)"""
+        visited = np.zeros(len(self._ids), dtype=bool)
+        frontier = np.unique(np.asarray(sources, dtype=np.int64))
+        visited[frontier] = True
+        hops = 0
+        while len(frontier) and (max_hops is None or hops < max_hops):
+            neighbours = self.neighbour_indices(frontier, rel_type, direction)
+            frontier = neighbours[~visited[neighbours]]
+            visited[frontier] = True
+            hops += 1
+        return visited
+    
+    # ---- GraphDatabase-compatible read API ----
+    
+    def _node_label(self, index: int) -> str:
+        return self._labels[self._node_label_ids[index]]
+    
+    def _node_properties(self, index: int) -> Dict[str, Any]:
+        return self._node_props.to_dict(index)
+    
+    def _node_records(self, rows: np.ndarray, label: bool = False) -> List[Dict[str, Any]]:
+        """{'id'[, 'label'], **properties} dicts for many int node ids, gathered column-wise"""
+        rows = np.asarray(rows, dtype=np.int64)
+        leading = [('id', self.ids_of(rows))]
+        if label:
+            leading.append(('label', [self._labels[i] for i in self._node_label_ids[rows].tolist()]))
+        return self._node_props.to_dicts(rows, leading=tuple(leading))
+    
+    def _node_value(self, index: int, key: str) -> Any:
+        return self._node_props.get(index, key)
+    
+    def _edge_record(self, edge: int) -> Dict[str, Any]:
+        return {
+            'from': self._ids[self._edge_src[edge]],
+            'to': self._ids[self._edge_dst[edge]],
+            'type': self._types[self._edge_type_ids[edge]],
+            'properties': self._edge_props.to_dict(edge)
+        }
+    
+    def _edges(self, node_id: str, rel_type, direction: str) -> List[Dict[str, Any]]:
+        index = self._id_map.get(node_id)
+        if index is None:
+            return []
+        _, _, edges = self.expand(np.array([index]), rel_type, direction)
+        if rel_type is not None and not isinstance(rel_type, str):
+            edges = np.sort(edges)
+        return [self._edge_record(e) for e in edges.tolist()]
+    
+    def out_edges(self, node_id: str, rel_type=None) -> List[Dict[str, Any]]:
+        """Get outgoing relationships of a node, optionally filtered by type (or list of types)"""
+        return self._edges(node_id, rel_type, 'out')
+    
+    def in_edges(self, node_id: str, rel_type=None) -> List[Dict[str, Any]]:
+        """Get incoming relationships of a node, optionally filtered by type (or list of types)"""
+        return self._edges(node_id, rel_type, 'in')
+    
+    def neighbours(self, node_id: str, rel_type=None, direction: str = 'out') -> List[str]:
+        """Ids of the nodes at the other end of a node's relationships, in edge order"""
+        index = self._id_map.get(node_id)
+        if index is None:
+            return []
+        _, neighbours, edges = self.expand(np.array([index]), rel_type, direction)
+        return self.ids_of(neighbours[np.argsort(edges, kind='stable')])
+    
+    def neighbourhoods(self, node_ids, rel_type=None, key: str = 'name') -> Dict[str, Dict[str, List[tuple]]]:
+        """Outgoing and incoming neighbours of many nodes, gathered from the CSR arrays at once
+        
+        Same result as GraphDatabase.neighbourhoods: per node, one (rel_type,
+        neighbour id, neighbour label, neighbour's key property or its id)
+        tuple per relationship, in edge order.
+        """
+        found = {}
+        for node_id in node_ids:
+            index = self._id_map.get(node_id)
+            if index is not None:
+                found.setdefault(node_id, index)
+        nodes = np.fromiter(found.values(), dtype=np.int64, count=len(found))
+        result = {node_id: {'outgoing': [], 'incoming': []} for node_id in found}
+        groups = list(result.values())
+        
+        for direction, name in (('out', 'outgoing'), ('in', 'incoming')):
+            origin, neighbours, edges = self.expand(nodes, rel_type, direction)
+            if not len(edges):
+                continue
+            order = np.lexsort((edges, origin))
+            unique, inverse = np.unique(neighbours, return_inverse=True)
+            described = [
+                (self._ids[i], self._node_label(i), self._node_props.get(i, key, self._ids[i]))
+                for i in unique.tolist()
+            ]
+            types = self._types
+            for position, type_id, neighbour in zip(origin[order].tolist(),
+                                                     self._edge_type_ids[edges[order]].tolist(),
+                                                     inverse[order].tolist()):
+                groups[position][name].append((types[type_id], *described[neighbour]))
+        return result
+    
+    def get_index(self, label: str, property: str):
+        """Get the secondary index on label.property, or None if there is none"""
+        kind = self._index_defs.get((label, property))
+        if kind is None:
+            return None
+        index = self._property_indexes.get((label, property))
+        if index is None:
+            index_class = HashIndex if kind == 'hash' else SortedIndex
+            index = index_class.from_items(
+                (value, self._ids[i])
+                for i in self._label_index.get(label, np.empty(0, dtype=np.int32)).tolist()
+                for value in (self._node_value(i, property),)
+                if value is not None
+            )
+            self._property_indexes[(label, property)] = index
+        return index
+    
+    def list_indexes(self) -> List[Dict[str, str]]:
+        """Describe all secondary indexes"""
+        return [
+            {'label': label, 'property': prop, 'kind': kind}
+            for (label, prop), kind in self._index_defs.items()
+        ]
+    
+    def lookup_nodes(self, label: str, property: str, value: Any) -> Optional[List[str]]:
+        """Node ids with label.property == value, or None if the property is not indexed"""
+        index = self.get_index(label, property)
+        if index is None:
+            return None
+        return index.lookup(value)
+    
+    def lookup_range(self, label: str, property: str, low: Any = None, high: Any = None,
+                     include_low: bool = True, include_high: bool = True) -> Optional[List[str]]:
+        """Node ids with label.property in a range, or None if there is no sorted index"""
+        index = self.get_index(label, property)
+        if index is None or index.kind != 'sorted':
+            return None
+        return index.lookup_range(low, high, include_low, include_high)
+    
+    def search_index(self, label: str, property: str, needle: str) -> Optional[List[str]]:
+        """Node ids whose string label.property contains needle (case-insensitive), or None if not indexed"""
+        index = self.get_index(label, property)
+        if index is None:
+            return None
+        needle = needle.lower()
+        return index.lookup_values([
+            value for value in index.values()
+            if isinstance(value, str) and needle in value.lower()
+        ])
+    
+    def get_all_nodes(self, label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all nodes, optionally filtered by label"""
+        if label:
+            return self._node_records(self._label_index.get(label, np.empty(0, dtype=np.int32)))
+        return self._node_records(np.arange(len(self._ids)), label=True)
+    
+    def get_nodes(self, node_ids) -> List[Dict[str, Any]]:
+        """Get nodes by id, skipping unknown ids"""
+        return self._node_records(self.indices(node_ids))
+    
+    def select_nodes(self, label: str, tests: List[tuple],
+                     predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> List[Dict[str, Any]]:
+        """Nodes of a label that may pass (key, op, operand) filter tests, narrowed column-wise
+        
+        op is "contains" (lower-cased needle), "equals" or "range" (bounds
+        dict), as produced by query_filters.CompiledFilters. Tests a column
+        cannot evaluate are skipped, so the result is a superset unless a
+        predicate is given. When the tests narrowed the label to under half,
+        the predicate sees each remaining node's filtered properties only and
+        full nodes are built just for those it accepts.
+        """
+        rows = self._label_index.get(label, np.empty(0, dtype=np.int32))
+        mask = np.ones(len(rows), dtype=bool)
+        for key, op, operand in tests:
+            column_mask = self._column_mask(rows, key, op, operand)
+            if column_mask is not None:
+                mask &= column_mask
+        selective = 2 * int(mask.sum()) < len(rows)
+        rows = rows[mask]
+        if predicate is None:
+            return self._node_records(rows)
+        if not selective:
+            # Most rows survive anyway, so a separate pass over their filtered properties would not pay off
+            return [node for node in self._node_records(rows) if predicate(node)]
+        keys = {key for key, _, _ in tests}
+        keep = [predicate(properties) for properties in self._node_props.to_dicts(rows, keys)]
+        return self._node_records(rows[np.array(keep, dtype=bool)] if len(rows) else rows)
+    
+    def _string_columns(self):
+        if self._string_arrays is None:
+            values = np.array(list(self._strings), dtype=np.dtypes.StringDType())
+            self._string_arrays = (values, np.strings.lower(values))
+        return self._string_arrays
+    
+    def _column_mask(self, rows: np.ndarray, key: str, op: str, operand: Any) -> Optional[np.ndarray]:
+        """Rows that may pass one filter test, or None if the column cannot evaluate it
+        
+        Nodes without the property are treated as having '' (as the engine's
+        filters do), so they pass an empty needle and may pass a range.
+        """
+        absent = operand == '' if op == 'contains' else op == 'range'
+        column = self._node_props.columns.get(key)
+        if column is None:
+            return np.full(len(rows), absent)
+        has_key = np.array([key in schema for schema in self._node_props.schemas], dtype=bool)
+        present = has_key[self._node_props.schema_ids[rows]]
+        data = column.data[rows][present]
+        
+        if op == 'contains' and column.kind == 'str':
+            # Search each distinct string once, in the lower-cased shadow of the string table
+            unique, inverse = np.unique(data, return_inverse=True)
+            hits = (np.strings.find(self._string_columns()[1][unique], operand) >= 0)[inverse]
+        elif op == 'equals' and column.kind in ('int', 'float', 'bool') and isinstance(operand, (int, float)):
+            hits = data == operand
+        elif op == 'range':
+            bounds = list(operand.values())
+            if column.kind == 'str' and all(isinstance(bound, str) for bound in bounds):
+                unique, inverse = np.unique(data, return_inverse=True)
+                values = self._string_columns()[0][unique]
+            elif column.kind in ('int', 'float') and all(
+                    isinstance(bound, (int, float)) and not isinstance(bound, bool) for bound in bounds):
+                values, inverse = data, None
+            else:
+                return None
+            hits = np.ones(len(values), dtype=bool)
+            for name, compare in (('gt', np.greater), ('gte', np.greater_equal), ('lt', np.less), ('lte', np.less_equal)):
+                if name in operand:
+                    hits &= compare(values, operand[name])
+            if inverse is not None:
+                hits = hits[inverse]
+        else:
+            return None
+        
+        mask = np.full(len(rows), absent)
+        mask[present] = hits
+        return mask
+    
+    def get_all_relationships(self, rel_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get all relationships, optionally filtered by type"""
+        if rel_type:
+            type_id = self._type_ids.get(rel_type)
+            if type_id is None:
+                return []
+            return [self._edge_record(e) for e in np.sort(self._out_csr[type_id][2]).tolist()]
+        return list(self.relationships)
+    
+    def count_nodes(self, label: Optional[str] = None) -> int:
+        """Count nodes, optionally filtered by label"""
+        if label:
+            return len(self._label_index.get(label, ()))
+        return len(self._ids)
+    
+    def count_relationships(self, rel_type: Optional[str] = None) -> int:
+        """Count relationships, optionally filtered by type"""
+        if rel_type:
+            return self._rel_type_counts.get(rel_type, 0)
+        return len(self._edge_src)
+    
+    def first_node(self, label: str) -> Optional[Dict[str, Any]]:
+        """First node of a label (get_all_nodes(label)[0] without building the rest), or None"""
+        members = self._label_index.get(label)
+        if members is None or not len(members):
+            return None
+        index = int(members[0])
+        return {'id': self._ids[index], **self._node_properties(index)}
+    
+    def first_relationship(self, rel_type: str) -> Optional[Dict[str, Any]]:
+        """First relationship of a type (get_all_relationships(rel_type)[0] without building the rest), or None"""
+        type_id = self._type_ids.get(rel_type)
+        if type_id is None or not len(self._out_csr[type_id][2]):
+            return None
+        return self._edge_record(int(self._out_csr[type_id][2].min()))
+    
+    def get_schema(self) -> Dict[str, Any]:
+        """Get database schema information"""
+        return {
+            'node_labels': list(self._label_index),
+            'relationship_types': list(self._rel_type_counts),
+            'label_counts': {label: len(ids) for label, ids in self._label_index.items()},
+            'relationship_type_counts': dict(self._rel_type_counts),
+            'node_count': len(self._ids),
+            'relationship_count': len(self._edge_src)
+        }
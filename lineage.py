@@ -0,0 +1,170 @@
+"""
+Supply Chain Lineage View for Supply Chain Validator
+Materialized product -> factory -> materials -> suppliers -> certifications traces
+
+Each product's trace is built once by walking the adjacency indexes and then
+kept, together with the ids of every node it was built from. A mutable
+GraphDatabase reports nodes that change or gain relationships; every trace
+that includes one of them is marked stale and rebuilt on its next read, so a
+new edge only costs the products whose lineage it touches. Reads of an
+up-to-date trace are a lookup and an unpickle: traces are kept pickled, so
+every caller gets its own copy and may modify it.
+"""
+
+import pickle
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+def build_trace(db, product_id: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Trace of a product and the ids of the nodes it includes ((None, []) if there is no such product)"""
+    product_node = db.nodes.get(product_id)
+    if not product_node:
+        return None, []
+    
+    trace = {
+        "product": product_node['properties'],
+        "factory": None,
+        "materials": [],
+        "suppliers": [],
+        "certifications": []
+    }
+    node_ids = [product_id]
+    
+    # Find factory that manufactures this product
+    factory_ids = db.neighbours(product_id, 'MANUFACTURES', 'in')
+    for factory_id in factory_ids:
+        trace['factory'] = db.nodes[factory_id]['properties']
+        node_ids.append(factory_id)
+        
+        # Find factory certifications
+        for cert_id in db.neighbours(factory_id, 'HAS_CERTIFICATION'):
+            trace['certifications'].append(db.nodes[cert_id]['properties'])
+            node_ids.append(cert_id)
+    
+    # Find materials supplied to the factory
+    if factory_ids:
+        for material_id in db.neighbours(factory_ids[0], 'SUPPLIED_TO', 'in'):
+            material_info = db.nodes[material_id]['properties']
+            node_ids.append(material_id)
+            
+            # Find suppliers for this material
+            supplier_ids = db.neighbours(material_id, 'PROVIDES', 'in')
+            material_info['suppliers'] = [db.nodes[supplier_id]['properties'] for supplier_id in supplier_ids]
+            node_ids.extend(supplier_ids)
+            trace['materials'].append(material_info)
+            
+            # Add suppliers to main list
+            trace['suppliers'].extend(material_info['suppliers'])
+    
+    # Remove duplicates from suppliers
+    seen = set()
+    unique_suppliers = []
+    for supplier in trace['suppliers']:
+        supplier_id = supplier.get('id')
+        if supplier_id not in seen:
+            seen.add(supplier_id)
+            unique_suppliers.append(supplier)
+    trace['suppliers'] = unique_suppliers
+    
+    return trace, node_ids
+
+
+class LineageView:
+    """Materialized supply chain traces per product, kept current through the database's change listeners"""
+    
+    def __init__(self, db):
+        self.db = db
+        self._traces = {}  # {product id: pickled trace}
+        self._nodes = {}  # {product id: (node id, ...)}
+        self._by_node = {}  # {node id: {product id}}
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._generation = 0  # bumped by every invalidation, so a trace built across one is not kept
+        self._lock = threading.Lock()
+        if hasattr(db, 'add_listener'):
+            db.add_listener(self.invalidate)
+    
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of the trace of a product, or None if there is no such product"""
+        with self._lock:
+            pickled = self._traces.get(product_id)
+            if pickled is None:
+                self._misses += 1
+                generation = self._generation
+            else:
+                self._hits += 1
+        if pickled is not None:
+            return pickle.loads(pickled)
+        
+        trace, node_ids = build_trace(self.db, product_id)
+        if trace is not None:
+            with self._lock:
+                if generation != self._generation:
+                    return trace
+                self._drop(product_id)
+                self._traces[product_id] = pickle.dumps(trace, pickle.HIGHEST_PROTOCOL)
+                self._nodes[product_id] = tuple(node_ids)
+                for node_id in node_ids:
+                    self._by_node.setdefault(node_id, set()).add(product_id)
+        return trace
+    
+    def materialize(self, product_ids: Optional[Iterable[str]] = None) -> int:
+        """Build the traces of the given products (all products by default); returns how many were built"""
+        if product_ids is None:
+            product_ids = [node['id'] for node in self.db.get_all_nodes('Product')]
+        built = 0
+        for product_id in product_ids:
+            if product_id not in self._traces and self.get(product_id) is not None:
+                built += 1
+        return built
+    
+    def _drop(self, product_id: str):
+        if self._traces.pop(product_id, None) is None:
+            return
+        for node_id in self._nodes.pop(product_id, ()):
+            products = self._by_node.get(node_id)
+            if products is not None:
+                products.discard(product_id)
+                if not products:
+                    del self._by_node[node_id]
+    
+    def invalidate(self, node_ids: Optional[Iterable[str]] = None):
+        """Mark stale every trace that includes any of node_ids (all traces if None)"""
+        with self._lock:
+            self._generation += 1
+            if node_ids is None:
+                self._invalidations += len(self._traces)
+                self._traces.clear()
+                self._nodes.clear()
+                self._by_node.clear()
+                return
+            for node_id in node_ids:
+                for product_id in list(self._by_node.get(node_id, ())):
+                    self._drop(product_id)
+                    self._invalidations += 1
+    
+    def close(self):
+        """Stop following changes to the database"""
+        if hasattr(self.db, 'remove_listener'):
+            self.db.remove_listener(self.invalidate)
+    
+    def clear(self):
+        """Drop all traces and reset the statistics"""
+        with self._lock:
+            self._traces.clear()
+            self._nodes.clear()
+            self._by_node.clear()
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Get lineage view statistics"""
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'invalidations': self._invalidations,
+            'size': len(self._traces)
+        }
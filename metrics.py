@@ -0,0 +1,151 @@
+"""
+Metrics for Supply Chain Validator
+Pluggable sinks for GraphRAG stage latencies and LLM token counts
+
+GraphRAGEngine reports to a MetricsSink. The base class discards everything;
+HistogramRegistry keeps in-process histograms and counters that can be read
+as percentile summaries or exported in the Prometheus text exposition format.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds: sub-millisecond for in-memory retrieval up to 30s for slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+
+@contextmanager
+def span(timings: Dict[str, float], name: str):
+    """Record the wall time of the with-block in timings[name], in milliseconds"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+
+class MetricsSink:
+    """Destination for engine metrics; this base implementation discards everything"""
+    
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        """Record one sample of a distribution (e.g. a latency in seconds)"""
+    
+    def increment(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None):
+        """Add to a monotonically increasing counter"""
+
+
+class Histogram:
+    """Bucketed distribution plus a bounded window of recent samples for exact percentiles"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 2048):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+    
+    def percentile(self, q: float) -> float:
+        """q-th percentile (0-100) of the recent samples"""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+class HistogramRegistry(MetricsSink):
+    """In-process metrics store: histograms and counters keyed by name and labels"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 2048):
+        self.buckets = buckets
+        self.window = window
+        self._histograms = {}  # {name: {label key: Histogram}}
+        self._counters = {}  # {name: {label key: float}}
+        self._lock = threading.Lock()
+    
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets, self.window)
+            histogram.observe(value)
+    
+    def increment(self, name: str, value: float = 1.0, labels: Optional[Dict[str, str]] = None):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+    
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[Histogram]:
+        return self._histograms.get(name, {}).get(_label_key(labels))
+    
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None) -> float:
+        return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+    
+    def summary(self) -> List[Dict[str, Any]]:
+        """Count, mean and p50/p95/p99 for every histogram series"""
+        with self._lock:
+            return [
+                {
+                    'name': name,
+                    'labels': dict(key),
+                    'count': histogram.count,
+                    'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+                    'p50': histogram.percentile(50),
+                    'p95': histogram.percentile(95),
+                    'p99': histogram.percentile(99)
+                }
+                for name, series in self._histograms.items()
+                for key, histogram in series.items()
+            ]
+    
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{name}_bucket{_format_labels(key, (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+            for name, series in self._counters.items():
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value!r}")
+        return '\n'.join(lines) + '\n'
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
@@ -0,0 +1,136 @@
+"""
+Query Plan Cache for Supply Chain Validator
+Reuses LLM-generated query plans for repeated questions
+
+Plans are keyed by the normalized question and a fingerprint of the graph
+schema, so a schema change makes every older entry unreachable (and prunes it).
+The in-memory cache is an LRU with an optional TTL; an optional SQLite file
+keeps plans across restarts.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+def normalize_question(question: str) -> str:
+    """Canonical form of a question: Unicode-normalized, lowercased, single-spaced, without trailing punctuation"""
+    text = unicodedata.normalize('NFKC', question).lower()
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.rstrip('?!.').strip()
+
+
+def schema_fingerprint(schema_text: str) -> str:
+    """Short stable hash of a schema description"""
+    return hashlib.sha256(schema_text.encode('utf-8')).hexdigest()[:16]
+
+
+class PlanCache:
+    """LRU (optionally TTL-bounded) cache of query plans, optionally persisted to SQLite"""
+    
+    def __init__(self, maxsize: int = 256, ttl: Optional[float] = None, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()  # {(fingerprint, question): (plan json, created)}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS query_plans ("
+                "fingerprint TEXT NOT NULL, question TEXT NOT NULL, plan TEXT NOT NULL, created REAL NOT NULL, "
+                "PRIMARY KEY (fingerprint, question))"
+            )
+            self._db.commit()
+    
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+    
+    def get(self, question: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Cached plan for a question under a schema fingerprint, or None"""
+        key = (fingerprint, normalize_question(question))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT plan, created FROM query_plans WHERE fingerprint = ? AND question = ?", key
+                ).fetchone()
+                if row is not None:
+                    entry = row
+                    self._store(key, entry)
+            if entry is not None and self._expired(entry[1]):
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._hits += 1
+        return json.loads(entry[0])
+    
+    def put(self, question: str, fingerprint: str, plan: Dict[str, Any]):
+        """Store a plan (a copy is kept, so callers may mutate theirs)"""
+        if self.maxsize <= 0:
+            return
+        key = (fingerprint, normalize_question(question))
+        entry = (json.dumps(plan), time.time())
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO query_plans VALUES (?, ?, ?, ?)", key + entry)
+                self._db.commit()
+    
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def _discard(self, key):
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM query_plans WHERE fingerprint = ? AND question = ?", key)
+            self._db.commit()
+    
+    def retain(self, fingerprint: str):
+        """Drop every plan made under a different schema fingerprint"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] != fingerprint]:
+                del self._entries[key]
+            if self._db is not None:
+                self._db.execute("DELETE FROM query_plans WHERE fingerprint != ?", (fingerprint,))
+                self._db.commit()
+    
+    def clear(self):
+        """Drop all plans and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM query_plans")
+                self._db.commit()
+    
+    def stats(self) -> Dict[str, int]:
+        """Get plan cache statistics"""
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
+    
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
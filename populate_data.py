@@ -6,14 +6,26 @@ Includes suppliers, materials, factories, certifications, collections, and produ
 from graph_database import GraphDatabase
 from datetime import datetime
 
-def populate_supply_chain_data(db: GraphDatabase):
-    """Populate the database with comprehensive supply chain data"""
+def create_default_indexes(db: GraphDatabase):
+    """Secondary indexes used by the query engine (mirrors the Neo4j schema in neo4j_setup.py)"""
+    db.create_index('Supplier', 'name')
+    db.create_index('Material', 'type')
+    db.create_index('Factory', 'location')
+    db.create_index('Certification', 'type')
+    db.create_index('Collection', 'year', kind='sorted')
+
+def populate_supply_chain_data(db: GraphDatabase, quiet: bool = False):
+    """Populate the database with comprehensive supply chain data (quiet=True suppresses output)"""
     
-    print("🔄 Populating supply chain database...")
+    if not quiet:
+        print("🔄 Populating supply chain database...")
     
     # Clear existing data
     db.clear()
     
+    # Secondary indexes
+    create_default_indexes(db)
+    
     # ==================== SUPPLIERS ====================
     suppliers = [
         {
@@ -68,10 +80,6 @@ def populate_supply_chain_data(db: GraphDatabase):
         }
     ]
     
-    for supplier in suppliers:
-        db.create_node('Supplier', supplier)
-        print(f"  ✓ Created supplier: {supplier['name']}")
-    
     # ==================== MATERIALS ====================
     materials = [
         {
@@ -136,10 +144,6 @@ def populate_supply_chain_data(db: GraphDatabase):
         }
     ]
     
-    for material in materials:
-        db.create_node('Material', material)
-        print(f"  ✓ Created material: {material['name']}")
-    
     # ==================== FACTORIES ====================
     factories = [
         {
@@ -184,10 +188,6 @@ def populate_supply_chain_data(db: GraphDatabase):
         }
     ]
     
-    for factory in factories:
-        db.create_node('Factory', factory)
-        print(f"  ✓ Created factory: {factory['name']}")
-    
     # ==================== CERTIFICATIONS ====================
     certifications = [
         {
@@ -252,10 +252,6 @@ def populate_supply_chain_data(db: GraphDatabase):
         }
     ]
     
-    for cert in certifications:
-        db.create_node('Certification', cert)
-        print(f"  ✓ Created certification: {cert['name']}")
-    
     # ==================== COLLECTIONS ====================
     collections = [
         {
@@ -287,10 +283,6 @@ def populate_supply_chain_data(db: GraphDatabase):
         }
     ]
     
-    for collection in collections:
-        db.create_node('Collection', collection)
-        print(f"  ✓ Created collection: {collection['name']}")
-    
     # ==================== PRODUCTS ====================
     products = [
         {
@@ -331,13 +323,7 @@ def populate_supply_chain_data(db: GraphDatabase):
         }
     ]
     
-    for product in products:
-        db.create_node('Product', product)
-        print(f"  ✓ Created product: {product['name']}")
-    
     # ==================== RELATIONSHIPS ====================
-    print("\n🔗 Creating relationships...")
-    
     # Supplier -> Material relationships
     relationships = [
         ('SUP001', 'MAT001', 'PROVIDES', {'since': '2015', 'volume': 'High'}),
@@ -392,12 +378,24 @@ def populate_supply_chain_data(db: GraphDatabase):
         ('MAT005', 'CERT004', 'REQUIRES_CERTIFICATION', {'status': 'Active', 'renewal_date': '2024-12-31'}),
     ]
     
-    for from_id, to_id, rel_type, props in relationships:
-        db.create_relationship(from_id, to_id, rel_type, props)
-        print(f"  ✓ Created: {from_id} -[{rel_type}]-> {to_id}")
+    # Load all nodes and relationships in one pass; indexes are built once at the end
+    nodes = (
+        [('Supplier', supplier) for supplier in suppliers] +
+        [('Material', material) for material in materials] +
+        [('Factory', factory) for factory in factories] +
+        [('Certification', cert) for cert in certifications] +
+        [('Collection', collection) for collection in collections] +
+        [('Product', product) for product in products]
+    )
+    db.bulk_load(nodes, relationships)
+    
+    if quiet:
+        return db
     
     # Print summary
     schema = db.get_schema()
+    for label, count in schema['label_counts'].items():
+        print(f"  ✓ Created {count} {label} nodes")
     print(f"\n✅ Database populated successfully!")
     print(f"   - Node labels: {', '.join(schema['node_labels'])}")
     print(f"   - Relationship types: {', '.join(schema['relationship_types'])}")
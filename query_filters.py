@@ -0,0 +1,117 @@
+"""
+Compiled Query Filters for Supply Chain Validator
+Plan filters turned into a predicate once per query instead of re-parsed per node
+
+CompiledFilters holds one test per filter key, with string needles already
+lower-cased. Candidates are narrowed through secondary indexes where the
+database has them; on a frozen GraphSnapshot, large labels are pre-filtered
+column-wise with NumPy instead. Whatever path produced them, the surviving
+nodes are checked by the same Python predicate, so every path returns exactly
+the nodes a plain scan would.
+"""
+
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+# Labels with at least this many nodes are pre-filtered column-wise on snapshots
+VECTORIZE_MIN_ROWS = 512
+
+# Keys that make a filter value a range rather than a value to compare with
+RANGE_KEYS = frozenset(('gt', 'gte', 'lt', 'lte'))
+
+# Lower-cased shadow of property values, shared across queries (values repeat a lot)
+_lower = lru_cache(maxsize=65536)(str.lower)
+
+
+def matches_range(value: Any, bounds: Dict) -> bool:
+    """Check a value against range bounds like {"gte": "2023", "lt": "2025"}"""
+    try:
+        if 'gt' in bounds and not value > bounds['gt']:
+            return False
+        if 'gte' in bounds and not value >= bounds['gte']:
+            return False
+        if 'lt' in bounds and not value < bounds['lt']:
+            return False
+        if 'lte' in bounds and not value <= bounds['lte']:
+            return False
+    except TypeError:
+        return False
+    return True
+
+
+class CompiledFilters:
+    """Query plan filters compiled into (key, op, operand) tests
+
+    op is "range" (operand is the bounds dict; only dicts keyed by some of
+    gt/gte/lt/lte are ranges), "contains" (case-insensitive substring;
+    operand is the lower-cased needle) or "equals".
+    """
+    
+    def __init__(self, filters: Optional[Dict[str, Any]] = None):
+        self.filters = dict(filters or {})
+        self.tests = []
+        for key, value in self.filters.items():
+            if isinstance(value, dict) and value and RANGE_KEYS.issuperset(value):
+                self.tests.append((key, 'range', value))
+            elif isinstance(value, str):
+                self.tests.append((key, 'contains', value.lower()))
+            else:
+                self.tests.append((key, 'equals', value))
+    
+    def __bool__(self) -> bool:
+        return bool(self.tests)
+    
+    def _passes(self, key: str, op: str, operand: Any, value: Any) -> bool:
+        if op == 'range':
+            return matches_range(value, operand)
+        if op == 'contains' and isinstance(value, str):
+            return operand in _lower(value)
+        return value == self.filters[key]
+    
+    def matches(self, node: Dict[str, Any]) -> bool:
+        """Check if a node matches every filter (a missing property counts as '')"""
+        for key, op, operand in self.tests:
+            if not self._passes(key, op, operand, node.get(key, '')):
+                return False
+        return True
+    
+    def candidates(self, db, label: str) -> Optional[List[str]]:
+        """Smallest set of node ids any secondary index can narrow the label to, or None
+
+        Indexes only hold nodes that have the property, so tests a missing
+        property passes (an empty needle, a range that includes '') are not
+        looked up.
+        """
+        candidates = None
+        for key, op, operand in self.tests:
+            if self._passes(key, op, operand, ''):
+                continue
+            if op == 'range':
+                ids = db.lookup_range(
+                    label, key,
+                    low=operand.get('gte', operand.get('gt')),
+                    high=operand.get('lte', operand.get('lt')),
+                    include_low='gt' not in operand,
+                    include_high='lt' not in operand
+                )
+            elif op == 'contains':
+                ids = db.search_index(label, key, operand)
+            else:
+                ids = db.lookup_nodes(label, key, operand)
+            if ids is not None and (candidates is None or len(ids) < len(candidates)):
+                candidates = ids
+        return candidates
+    
+    def select(self, db, label: str) -> List[Dict[str, Any]]:
+        """Nodes of a label matching the filters"""
+        if not self.tests:
+            return db.get_all_nodes(label)
+        candidates = self.candidates(db, label)
+        if candidates is not None:
+            nodes = db.get_nodes(candidates)
+        elif hasattr(db, 'select_nodes') and db.count_nodes(label) >= VECTORIZE_MIN_ROWS:
+            # select_nodes applies the predicate itself, before building whole nodes where that pays off
+            return db.select_nodes(label, self.tests, self.matches)
+        else:
+            nodes = db.get_all_nodes(label)
+        return [node for node in nodes if self.matches(node)]
@@ -0,0 +1,129 @@
+"""
+Result Packing for Supply Chain Validator
+Fits retrieval results into a token budget before they reach the answer prompt
+
+Rows are ranked by relevance to the question and the query plan filters,
+serialized compactly and added until the budget is spent. When not every row
+fits at full detail, properties that neither the question nor the plan refer
+to are stripped so that more rows fit. Tokens are estimated from characters
+(about four per token for English text and JSON) instead of running a
+tokenizer over every row.
+"""
+
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+from semantic_cache import question_terms
+
+CHARS_PER_TOKEN = 4
+
+# Properties kept on every row even when rows are stripped
+KEEP_PROPERTIES = frozenset(('id', 'name', '_type', 'relationships'))
+
+# Relationships listed per direction on a stripped row; the rest are only counted
+RELATIONSHIP_LIMIT = 10
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+
+def _row_text(row: Any) -> str:
+    """Lower-cased text of a row's values and the names of its related nodes, for relevance scoring"""
+    if not isinstance(row, dict):
+        return str(row).lower()
+    pieces = []
+    for key, value in row.items():
+        if isinstance(value, str):
+            pieces.append(value)
+        elif key == 'relationships' and isinstance(value, dict):
+            for rels in value.values():
+                pieces.extend(str(rel.get('to_name', rel.get('from_name', ''))) for rel in rels)
+    return ' '.join(pieces).lower()
+
+
+class ResultPacker:
+    """Ranks, trims and serializes retrieval results to fit a token budget (None for no limit)"""
+    
+    def __init__(self, token_budget: Optional[int] = 4000, chars_per_token: int = CHARS_PER_TOKEN):
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+    
+    def rank(self, question: str, query_plan: Dict[str, Any], rows: List[Any]) -> List[Any]:
+        """Rows ordered by how many question terms and filter values they mention (stable for ties)"""
+        terms = question_terms(question)
+        values = [str(value).lower() for value in (query_plan.get('filters') or {}).values()
+                  if isinstance(value, (str, int, float))]
+        if not terms and not values:
+            return list(rows)
+        
+        def score(row):
+            text = _row_text(row)
+            return sum(term in text for term in terms) + 2 * sum(value in text for value in values)
+        
+        return sorted(rows, key=score, reverse=True)
+    
+    def _relevant_properties(self, question: str, query_plan: Dict[str, Any]) -> Tuple[set, set]:
+        """Property names the plan refers to, and the question's content words"""
+        terms = set(question_terms(question))
+        keys = set(query_plan.get('filters') or {})
+        keys.update(field for field in query_plan.get('return_fields') or [] if isinstance(field, str))
+        return keys, terms
+    
+    def _strip(self, row: Any, keys: set, terms: set) -> Any:
+        """Row without unreferenced properties and with long relationship lists cut short"""
+        if not isinstance(row, dict):
+            return row
+        stripped = {
+            key: value for key, value in row.items()
+            if key in KEEP_PROPERTIES or key in keys
+            or any(word in terms for word in key.lower().split('_'))
+            or (isinstance(value, str) and any(term in value.lower() for term in terms))
+        }
+        relationships = stripped.get('relationships')
+        if isinstance(relationships, dict):
+            trimmed = {direction: rels[:RELATIONSHIP_LIMIT] for direction, rels in relationships.items()}
+            omitted = sum(len(rels) - len(trimmed[direction]) for direction, rels in relationships.items())
+            if omitted:
+                trimmed['omitted'] = omitted
+            stripped['relationships'] = trimmed
+        return stripped
+    
+    def _fill(self, rows: List[Any], budget: int, transform=None) -> List[str]:
+        """Serialized rows, in order, while they fit into budget characters"""
+        parts = []
+        used = 2  # the enclosing brackets
+        for row in rows:
+            text = _compact(transform(row) if transform else row)
+            used += len(text) + 1
+            if used > budget:
+                break
+            parts.append(text)
+        return parts
+    
+    def pack(self, question: str, query_plan: Dict[str, Any], rows: List[Any]) -> Tuple[str, Dict[str, Any]]:
+        """Text for the answer prompt and a report of what was kept"""
+        stripped = False
+        if self.token_budget is None:
+            parts = [_compact(row) for row in rows]
+        else:
+            ranked = self.rank(question, query_plan, rows)
+            # Leave room for the note about omitted rows
+            budget = self.token_budget * self.chars_per_token - 80
+            parts = self._fill(ranked, budget)
+            if len(parts) < len(ranked):
+                keys, terms = self._relevant_properties(question, query_plan)
+                trimmed = self._fill(ranked, budget, lambda row: self._strip(row, keys, terms))
+                if len(trimmed) > len(parts):
+                    parts, stripped = trimmed, True
+        
+        text = '[' + ','.join(parts) + ']'
+        omitted = len(rows) - len(parts)
+        if omitted:
+            text += f"\n({omitted} more of {len(rows)} results omitted to fit the token budget)"
+        return text, {
+            'rows': len(parts),
+            'truncated_rows': omitted,
+            'stripped': stripped,
+            'estimated_tokens': -(-len(text) // self.chars_per_token)
+        }
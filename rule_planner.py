@@ -0,0 +1,167 @@
+"""
+Rule-Based Query Planner for Supply Chain Validator
+Turns recognizable questions into query plans without an LLM round trip
+
+The planner looks for a label word ("suppliers", "factories", ...) naming what
+the question asks for, and for property values of that label's nodes (names,
+locations, types, certifications, collections, ...) mentioned in the question.
+The values come from a gazetteer built from the graph itself. A plan is only
+produced when every content word of the question is accounted for by the
+label, a value, or the name of the property that value belongs to; anything
+else is left to the LLM planner. A label's gazetteer is rebuilt after any of
+its nodes changes.
+"""
+
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+from semantic_cache import STOPWORDS, question_terms
+
+# Words naming each label in questions; the second entry is used in the plan intent
+LABEL_WORDS = {
+    'Supplier': ('supplier', 'suppliers', 'vendor', 'vendors'),
+    'Material': ('material', 'materials', 'fabric', 'fabrics'),
+    'Factory': ('factory', 'factories', 'manufacturer', 'manufacturers', 'workshop', 'workshops'),
+    'Certification': ('certification', 'certifications', 'certificate', 'certificates'),
+    'Collection': ('collection', 'collections'),
+    'Product': ('product', 'products', 'item', 'items'),
+}
+
+# Request phrasing that does not change what is asked
+FILLER = frozenset(
+    "list show display get every available currently exist exists existing registered operating "
+    "situated certified hold holds having carry carries about details information info".split()
+)
+
+# Property values longer than this are descriptions rather than names
+MAX_VALUE_LENGTH = 80
+
+
+def _tokens(text: str) -> List[str]:
+    tokens = (token.strip('.,;:!?()"\'') for token in unicodedata.normalize('NFKC', text).lower().split())
+    return [token for token in tokens if token]
+
+
+def _label_words(label: str) -> tuple:
+    return LABEL_WORDS.get(label, (label.lower(), label.lower() + 's'))
+
+
+class RulePlanner:
+    """Deterministic planner for questions about one label filtered by known property values"""
+    
+    def __init__(self, db):
+        self.db = db
+        self._gazetteers = {}  # {label: ({phrase: (property, value)}, longest phrase in tokens)}
+        self._label_counts = {}
+        if hasattr(db, 'add_listener'):
+            # Relationships never change a gazetteer, so only node changes are followed
+            db.add_listener(self.invalidate, relationships=False)
+    
+    def invalidate(self, node_ids: Optional[List[str]] = None):
+        """Drop the gazetteers of the labels of node_ids (all gazetteers if None)"""
+        if node_ids is None:
+            self._gazetteers.clear()
+            return
+        for node_id in node_ids:
+            if not self._gazetteers:
+                return
+            node = self.db.nodes.get(node_id)
+            if node is not None:
+                self._gazetteers.pop(node['label'], None)
+    
+    def close(self):
+        """Stop following changes to the database"""
+        if hasattr(self.db, 'remove_listener'):
+            self.db.remove_listener(self.invalidate)
+    
+    def _gazetteer(self, label: str):
+        """Map from normalized value phrases of label's nodes to the (property, value) they come from"""
+        if label not in self._gazetteers:
+            whole, parts = {}, {}
+            seen = set()
+            for node in self.db.get_all_nodes(label):
+                for prop, value in node.items():
+                    if prop == 'id' or not isinstance(value, str) or len(value) > MAX_VALUE_LENGTH:
+                        continue
+                    if (prop, value) in seen:
+                        continue
+                    seen.add((prop, value))
+                    for target, texts in ((whole, (value,)), (parts, value.split(',') if ',' in value else ())):
+                        for text in texts:
+                            text = text.strip()
+                            words = _tokens(text)
+                            if any(word not in STOPWORDS and any(ch.isalnum() for ch in word) for word in words):
+                                target.setdefault(' '.join(words), (prop, text))
+            # A phrase that is a complete value of some property wins over a fragment of another
+            phrases = {**parts, **whole}
+            longest = max((phrase.count(' ') + 1 for phrase in phrases), default=0)
+            self._gazetteers[label] = (phrases, longest)
+        return self._gazetteers[label]
+    
+    def plan(self, question: str) -> Optional[Dict[str, Any]]:
+        """Query plan for the question, or None unless the rules account for all of it"""
+        schema = self.db.get_schema()
+        label_counts = schema['label_counts']
+        if label_counts != self._label_counts:
+            # Rebuild the gazetteers of labels that gained or lost nodes
+            for label in list(self._gazetteers):
+                if label_counts.get(label) != self._label_counts.get(label):
+                    del self._gazetteers[label]
+            self._label_counts = dict(label_counts)
+        
+        tokens = _tokens(question)
+        word_labels = {word: label for label in schema['node_labels'] for word in _label_words(label)}
+        mentioned = [(position, word_labels[token]) for position, token in enumerate(tokens) if token in word_labels]
+        if mentioned:
+            # The first label named is what the question asks for
+            candidates = [mentioned[0]]
+        else:
+            candidates = [(None, label) for label in schema['node_labels']]
+        
+        plans = [plan for plan in (self._plan_for(tokens, position, label, word_labels) for position, label in candidates)
+                 if plan is not None]
+        return plans[0] if len(plans) == 1 else None
+    
+    def _plan_for(self, tokens: List[str], position: Optional[int], label: str,
+                  word_labels: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        phrases, longest = self._gazetteer(label)
+        filters = {}
+        leftover = []
+        i = 0
+        while i < len(tokens):
+            if i == position:
+                i += 1
+                continue
+            for length in range(min(longest, len(tokens) - i), 0, -1):
+                if position is not None and i < position < i + length:
+                    continue
+                match = phrases.get(' '.join(tokens[i:i + length]))
+                if match is not None:
+                    prop, value = match
+                    if prop in filters:
+                        return None  # two values for one property cannot be expressed as filters
+                    filters[prop] = value
+                    i += length
+                    break
+            else:
+                leftover.append(tokens[i])
+                i += 1
+        
+        property_words = {word for prop in filters for word in question_terms(prop.replace('_', ' '))}
+        for word in question_terms(' '.join(leftover)):
+            if word in FILLER or word in property_words:
+                continue
+            # Another label may only qualify a value ("products in collection X")
+            if word in word_labels and filters:
+                continue
+            return None
+        if position is None and not filters:
+            return None
+        
+        return {
+            "intent": f"find {_label_words(label)[1]}",
+            "entities": [label],
+            "filters": filters,
+            "relationships": [],
+            "return_fields": []
+        }
@@ -0,0 +1,183 @@
+"""
+Semantic Question Cache for Supply Chain Validator
+Matches re-phrased questions to ones already planned, without an embedding model
+
+Questions are embedded offline as hashed TF-IDF vectors over word unigrams and
+character trigrams, so "who supplies leather for 2024" and "leather suppliers
+2024 collection" land close together. A lookup is an exact nearest-neighbour
+search (one matrix-vector product) over the cached questions. Cosine
+similarity alone cannot tell "suppliers in Italy" from "suppliers in Spain", so
+a neighbour only counts as a match when, in addition, every content word of
+each question has a counterpart in the other: the same number, or a word
+sharing most of its character trigrams ("supplies" / "suppliers").
+"""
+
+import json
+import re
+import threading
+import zlib
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from plan_cache import normalize_question
+
+# Words that carry no meaning for matching supply chain questions
+STOPWORDS = frozenset(
+    "a an the of for in on at to from by with and or is are was were be been do does did "
+    "what which who whom whose where when how show list give find tell me all any our their "
+    "its this that these those there please used using have has located based collection collections".split()
+)
+
+# Minimum Dice coefficient of character trigrams for two words to count as the same term
+TERM_SIMILARITY = 0.5
+
+
+def question_terms(question: str) -> List[str]:
+    """Content words of a question"""
+    return [word for word in re.findall(r'[a-z0-9]+', normalize_question(question)) if word not in STOPWORDS]
+
+
+def embed(question: str, dim: int = 4096) -> np.ndarray:
+    """Sub-linear term frequencies of hashed word and character-trigram features"""
+    indexes = []
+    for word in question_terms(question):
+        indexes.append(zlib.crc32(b'w:' + word.encode('utf-8')) % dim)
+        padded = f'<{word}>'.encode('utf-8')
+        indexes.extend(zlib.crc32(b't:' + padded[i:i + 3]) % dim for i in range(len(padded) - 2))
+    counts = np.bincount(np.asarray(indexes, dtype=np.int64), minlength=dim).astype(np.float32)
+    nonzero = counts > 0
+    counts[nonzero] = 1 + np.log(counts[nonzero])
+    return counts
+
+
+def _trigrams(word: str) -> frozenset:
+    padded = f'<{word}>'
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _covered(terms: List[str], other: List[str]) -> bool:
+    """Whether every term has a counterpart among other (numbers must match exactly)"""
+    other_trigrams = [_trigrams(word) for word in other if not any(ch.isdigit() for ch in word)]
+    for word in terms:
+        if word in other:
+            continue
+        if any(ch.isdigit() for ch in word):
+            return False
+        trigrams = _trigrams(word)
+        if not any(2 * len(trigrams & candidate) >= TERM_SIMILARITY * (len(trigrams) + len(candidate))
+                   for candidate in other_trigrams):
+            return False
+    return True
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of query plans for paraphrased questions"""
+    
+    def __init__(self, threshold: float = 0.7, maxsize: int = 512, dim: int = 4096):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.dim = dim
+        self._questions = []  # normalized questions, one per row
+        self._entries = []  # (original question, fingerprint, plan json, terms)
+        self._vectors = []  # term frequencies, stacked into the index on demand
+        self._last_used = []
+        self._clock = 0
+        self._index = None  # (idf, L2-normalized TF-IDF rows), rebuilt after writes
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+    
+    def _build_index(self):
+        if self._index is None:
+            vectors = np.vstack(self._vectors)
+            df = np.count_nonzero(vectors, axis=0)
+            idf = (np.log((1 + len(self._entries)) / (1 + df)) + 1).astype(np.float32)
+            weighted = vectors * idf
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            self._index = (idf, weighted / norms)
+        return self._index
+    
+    def lookup(self, question: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Closest cached question planned under fingerprint, as {'question', 'plan', 'similarity'}, or None"""
+        vector = embed(question, self.dim)
+        terms = question_terms(question)
+        with self._lock:
+            match = None
+            if self._entries and vector.any():
+                idf, matrix = self._build_index()
+                query = vector * idf
+                scores = matrix @ (query / np.linalg.norm(query))
+                for row in np.argsort(-scores):
+                    if scores[row] < self.threshold:
+                        break
+                    original, entry_fingerprint, plan, entry_terms = self._entries[row]
+                    if entry_fingerprint == fingerprint and _covered(terms, entry_terms) and _covered(entry_terms, terms):
+                        self._clock += 1
+                        self._last_used[row] = self._clock
+                        match = {'question': original, 'plan': json.loads(plan), 'similarity': float(scores[row])}
+                        break
+            if match is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return match
+    
+    def add(self, question: str, fingerprint: str, plan: Dict[str, Any]):
+        """Remember the plan made for a question (replacing an earlier entry for the same question)"""
+        if self.maxsize <= 0:
+            return
+        normalized = normalize_question(question)
+        entry = (question, fingerprint, json.dumps(plan), question_terms(question))
+        vector = embed(question, self.dim)
+        with self._lock:
+            self._clock += 1
+            if normalized in self._questions:
+                row = self._questions.index(normalized)
+                self._entries[row] = entry
+                self._vectors[row] = vector
+                self._last_used[row] = self._clock
+            else:
+                if len(self._entries) >= self.maxsize:
+                    self._remove([int(np.argmin(self._last_used))])
+                self._questions.append(normalized)
+                self._entries.append(entry)
+                self._vectors.append(vector)
+                self._last_used.append(self._clock)
+            self._index = None
+    
+    def _remove(self, rows: List[int]):
+        removed = set(rows)
+        keep = [row for row in range(len(self._entries)) if row not in removed]
+        self._questions = [self._questions[row] for row in keep]
+        self._entries = [self._entries[row] for row in keep]
+        self._last_used = [self._last_used[row] for row in keep]
+        self._vectors = [self._vectors[row] for row in keep]
+        self._index = None
+    
+    def retain(self, fingerprint: str):
+        """Drop every entry made under a different schema fingerprint"""
+        with self._lock:
+            stale = [row for row, entry in enumerate(self._entries) if entry[1] != fingerprint]
+            if stale:
+                self._remove(stale)
+    
+    def clear(self):
+        """Drop all entries and reset the statistics"""
+        with self._lock:
+            self._remove(list(range(len(self._entries))))
+            self._hits = 0
+            self._misses = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get semantic cache statistics"""
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'threshold': self.threshold
+        }
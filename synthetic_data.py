@@ -0,0 +1,403 @@
+"""
+Synthetic Supply Chain Generator for Supply Chain Validator
+Seeded, scalable graphs on the populate_data schema for benchmarking
+
+The same (scale, seed) pair always produces the same graph, whatever the batch
+size, so performance changes can be measured against identical data. At
+scale=1 the graph has about 1,000 nodes; every label grows linearly with scale,
+so scale 10,000 gives about 10 million nodes.
+"""
+
+import argparse
+import time
+from typing import Dict, List, Any, Iterator, Tuple
+import numpy as np
+
+from graph_database import GraphDatabase
+from populate_data import create_default_indexes
+
+# Nodes per label at scale=1
+LABEL_SIZES = {
+    'Supplier': 80,
+    'Material': 160,
+    'Factory': 40,
+    'Certification': 20,
+    'Collection': 20,
+    'Product': 680,
+}
+
+ID_PREFIXES = {
+    'Supplier': 'SUP',
+    'Material': 'MAT',
+    'Factory': 'FAC',
+    'Certification': 'CERT',
+    'Collection': 'COL',
+    'Product': 'PROD',
+}
+
+# Relationship generation. For every node of the driver label a fan-out count
+# is drawn from the distribution and that many distinct partners of the other
+# label are picked with popularity skew: partner = floor(n * u ** skew), so a
+# skew of 1 is uniform and larger values concentrate edges on a few hubs
+# (the dominant tanneries, mills and certifiers).
+# (rel_type, source label, target label, driver label, (distribution, parameter), skew)
+EDGE_SPECS = [
+    ('PROVIDES', 'Supplier', 'Material', 'Material', ('poisson+1', 0.6), 1.8),
+    ('SUPPLIED_TO', 'Material', 'Factory', 'Material', ('geometric', 0.5), 1.5),
+    ('MANUFACTURES', 'Factory', 'Product', 'Product', ('poisson+1', 0.1), 1.5),
+    ('PART_OF', 'Product', 'Collection', 'Product', ('assigned', None), None),
+    ('HAS_CERTIFICATION', 'Supplier', 'Certification', 'Supplier', ('poisson', 1.5), 2.5),
+    ('HAS_CERTIFICATION', 'Factory', 'Certification', 'Factory', ('poisson', 2.0), 2.5),
+    ('REQUIRES_CERTIFICATION', 'Material', 'Certification', 'Material', ('bernoulli', 0.1), 2.0),
+]
+
+# Share of suppliers, factories and products located outside Italy
+FOREIGN_SHARE = 0.12
+
+# Random draws are made in fixed-size chunks, each with its own seeded stream,
+# so the output does not depend on how callers batch it
+CHUNK_SIZE = 65536
+
+REGIONS = ['Tuscany', 'Como', 'Biella', 'Veneto', 'Marche', 'Lombardy', 'Piedmont', 'Campania']
+ITALIAN_CITIES = ['Florence', 'Milan', 'Como', 'Biella', 'Venice', 'Vicenza', 'Naples', 'Prato', 'Fermo', 'Arezzo']
+FOREIGN_LOCATIONS = [
+    ('Porto', 'Portugal'), ('Istanbul', 'Turkey'), ('Shanghai', 'China'),
+    ('Timisoara', 'Romania'), ('Tirana', 'Albania'), ('Dhaka', 'Bangladesh'),
+]
+# (type, name, origin)
+MATERIALS = [
+    ('Leather', 'Calf Leather', 'Italian Calves'),
+    ('Silk', 'Mulberry Silk', 'Italian Silkworms'),
+    ('Wool', 'Merino Wool', 'Italian Merino Sheep'),
+    ('Wool', 'Cashmere', 'Mongolian Goats'),
+    ('Leather', 'Python Leather', 'Southeast Asia'),
+    ('Cotton', 'Organic Cotton', 'Italian Organic Farms'),
+]
+GRADES = ['A+', 'A', 'B', 'Superfine', 'Grade A']
+LEVELS = ['High', 'Medium', 'Low']
+SUPPLIER_SUFFIXES = ['Consortium', 'Mills', 'Producers', 'Group', 'Artisans', 'Tannery']
+FACTORY_TYPES = ['Leather Goods Manufacturing', 'Handbag & Accessories', 'Leather Weaving', 'Textile & Garment']
+# (name, type, issuing body)
+CERTIFICATIONS = [
+    ('Made in Italy', 'Origin Certification', 'Italian Ministry of Economic Development'),
+    ('LWG Gold Rating', 'Environmental Certification', 'Leather Working Group'),
+    ('GOTS Organic', 'Organic Certification', 'Global Organic Textile Standard'),
+    ('CITES Permit', 'Wildlife Trade Certification', 'Convention on International Trade in Endangered Species'),
+    ('ISO 9001:2015', 'Quality Management', 'International Organization for Standardization'),
+    ('SA 8000', 'Social Accountability', 'Social Accountability International'),
+]
+BRANDS = ['Gucci', 'Prada', 'Bottega Veneta', 'Loro Piana', 'Fendi', 'Valentino', 'Ferragamo', 'Versace']
+SEASONS = [('SS', 'Spring/Summer'), ('FW', 'Fall/Winter'), ('Cruise', 'Cruise'), ('PF', 'Pre-Fall')]
+CATEGORIES = ['Handbag', 'Tote Bag', 'Clutch', 'Outerwear', 'Scarf', 'Loafers', 'Belt', 'Knitwear']
+VOLUMES = ['Low', 'Medium', 'High', 'Very High']
+FREQUENCIES = ['Weekly', 'Monthly', 'Quarterly']
+UNITS = ['sq meters', 'meters', 'kg']
+
+
+def scale_sizes(scale: float) -> Dict[str, int]:
+    """Node count per label for a scale factor"""
+    return {label: max(1, int(round(size * scale))) for label, size in LABEL_SIZES.items()}
+
+
+def node_id(label: str, index: int) -> str:
+    """Id of the index-th synthetic node of a label (SUP001, SUP002, ...)"""
+    return f"{ID_PREFIXES[label]}{index + 1:03d}"
+
+
+def _rng(seed: int, stream: int, chunk: int) -> np.random.Generator:
+    return np.random.default_rng([seed, stream, chunk])
+
+
+def _chunks(count: int):
+    for chunk, start in enumerate(range(0, count, CHUNK_SIZE)):
+        yield chunk, start, min(start + CHUNK_SIZE, count)
+
+
+def _assigned(indexes: np.ndarray, count: int) -> np.ndarray:
+    """Deterministic many-to-one assignment (product -> collection) spread by a multiplicative hash"""
+    return (indexes.astype(np.uint64) * np.uint64(2654435761) % np.uint64(count)).astype(np.int64)
+
+
+def _collection_name(index: int) -> str:
+    brand = BRANDS[index % len(BRANDS)]
+    season = SEASONS[(index // len(BRANDS)) % len(SEASONS)][1]
+    year = 2015 + index % 11
+    return f"{brand} {season} {year}"
+
+
+def _location(rng: np.random.Generator, size: int) -> List[Tuple[str, str]]:
+    """(city, country) pairs, FOREIGN_SHARE of them outside Italy"""
+    foreign = rng.random(size) < FOREIGN_SHARE
+    cities = rng.integers(len(ITALIAN_CITIES), size=size)
+    abroad = rng.integers(len(FOREIGN_LOCATIONS), size=size)
+    return [
+        FOREIGN_LOCATIONS[a] if f else (ITALIAN_CITIES[c], 'Italy')
+        for f, c, a in zip(foreign.tolist(), cities.tolist(), abroad.tolist())
+    ]
+
+
+def _supplier_nodes(rng: np.random.Generator, start: int, stop: int, sizes: Dict[str, int]):
+    size = stop - start
+    locations = _location(rng, size)
+    regions = rng.integers(len(REGIONS), size=size).tolist()
+    materials = rng.integers(len(MATERIALS), size=size).tolist()
+    suffixes = rng.integers(len(SUPPLIER_SUFFIXES), size=size).tolist()
+    established = rng.integers(1850, 2020, size=size).tolist()
+    employees = rng.integers(20, 1500, size=size).tolist()
+    ratings = rng.integers(len(GRADES) - 2, size=size).tolist()
+    for offset, i in enumerate(range(start, stop)):
+        city, country = locations[offset]
+        kind = MATERIALS[materials[offset]][0]
+        yield 'Supplier', {
+            'id': node_id('Supplier', i),
+            'name': f"{REGIONS[regions[offset]]} {kind} {SUPPLIER_SUFFIXES[suffixes[offset]]} {i + 1}",
+            'location': f"{city}, {country}",
+            'country': country,
+            'type': f"{kind} Supplier",
+            'established': str(established[offset]),
+            'employees': str(employees[offset]),
+            'sustainability_rating': GRADES[ratings[offset]]
+        }
+
+
+def _material_nodes(rng: np.random.Generator, start: int, stop: int, sizes: Dict[str, int]):
+    size = stop - start
+    materials = rng.integers(len(MATERIALS), size=size).tolist()
+    grades = rng.integers(len(GRADES), size=size).tolist()
+    levels = rng.integers(len(LEVELS), size=size).tolist()
+    for offset, i in enumerate(range(start, stop)):
+        kind, name, origin = MATERIALS[materials[offset]]
+        yield 'Material', {
+            'id': node_id('Material', i),
+            'name': f"{name} {i + 1}",
+            'type': kind,
+            'origin': origin,
+            'grade': GRADES[grades[offset]],
+            'sustainability': LEVELS[levels[offset]]
+        }
+
+
+def _factory_nodes(rng: np.random.Generator, start: int, stop: int, sizes: Dict[str, int]):
+    size = stop - start
+    locations = _location(rng, size)
+    brands = rng.integers(len(BRANDS), size=size).tolist()
+    types = rng.integers(len(FACTORY_TYPES), size=size).tolist()
+    capacity = (rng.integers(5, 200, size=size) * 1000).tolist()
+    employees = rng.integers(50, 2000, size=size).tolist()
+    for offset, i in enumerate(range(start, stop)):
+        city, country = locations[offset]
+        yield 'Factory', {
+            'id': node_id('Factory', i),
+            'name': f"{BRANDS[brands[offset]]} {city} Workshop {i + 1}",
+            'location': f"{city}, {country}",
+            'country': country,
+            'type': FACTORY_TYPES[types[offset]],
+            'capacity': f"{capacity[offset]} units/year",
+            'employees': str(employees[offset])
+        }
+
+
+def _certification_nodes(rng: np.random.Generator, start: int, stop: int, sizes: Dict[str, int]):
+    size = stop - start
+    valid_from = rng.integers(2018, 2025, size=size).tolist()
+    duration = rng.integers(1, 6, size=size).tolist()
+    levels = rng.integers(len(LEVELS), size=size).tolist()
+    for offset, i in enumerate(range(start, stop)):
+        name, kind, issuer = CERTIFICATIONS[i % len(CERTIFICATIONS)]
+        series = i // len(CERTIFICATIONS)
+        yield 'Certification', {
+            'id': node_id('Certification', i),
+            'name': f"{name} #{series + 1}" if series else name,
+            'type': kind,
+            'issuing_body': issuer,
+            'valid_from': f"{valid_from[offset]}-01-01",
+            'valid_until': f"{valid_from[offset] + duration[offset]}-12-31",
+            'confidence_level': LEVELS[levels[offset]]
+        }
+
+
+def _collection_nodes(rng: np.random.Generator, start: int, stop: int, sizes: Dict[str, int]):
+    size = stop - start
+    days = rng.integers(1, 29, size=size).tolist()
+    for offset, i in enumerate(range(start, stop)):
+        name = _collection_name(i)
+        season = SEASONS[(i // len(BRANDS)) % len(SEASONS)][0]
+        year = name.rsplit(' ', 1)[1]
+        yield 'Collection', {
+            'id': node_id('Collection', i),
+            'name': name,
+            'year': year,
+            'season': season,
+            'brand': BRANDS[i % len(BRANDS)],
+            'launch_date': f"{year}-{1 + (i % 12):02d}-{days[offset]:02d}"
+        }
+
+
+def _product_nodes(rng: np.random.Generator, start: int, stop: int, sizes: Dict[str, int]):
+    size = stop - start
+    categories = rng.integers(len(CATEGORIES), size=size).tolist()
+    prices = (rng.lognormal(7.5, 0.6, size=size).round(-1)).astype(np.int64).tolist()
+    foreign = (rng.random(size) < FOREIGN_SHARE).tolist()
+    abroad = rng.integers(len(FOREIGN_LOCATIONS), size=size).tolist()
+    collections = _assigned(np.arange(start, stop), sizes['Collection']).tolist()
+    for offset, i in enumerate(range(start, stop)):
+        category = CATEGORIES[categories[offset]]
+        collection = collections[offset]
+        yield 'Product', {
+            'id': node_id('Product', i),
+            'name': f"{category} {i + 1}",
+            'sku': f"{BRANDS[collection % len(BRANDS)][:2].upper()}-{category[:3].upper()}-{i + 1:07d}",
+            'category': category,
+            'price_eur': str(prices[offset]),
+            'collection': _collection_name(collection),
+            'made_in': FOREIGN_LOCATIONS[abroad[offset]][1] if foreign[offset] else 'Italy'
+        }
+
+
+NODE_BUILDERS = {
+    'Supplier': _supplier_nodes,
+    'Material': _material_nodes,
+    'Factory': _factory_nodes,
+    'Certification': _certification_nodes,
+    'Collection': _collection_nodes,
+    'Product': _product_nodes,
+}
+
+
+def _fan_out(rng: np.random.Generator, distribution: Tuple[str, Any], size: int) -> np.ndarray:
+    """Number of partners for each of size driver nodes"""
+    kind, param = distribution
+    if kind == 'poisson':
+        return rng.poisson(param, size=size)
+    if kind == 'poisson+1':
+        return 1 + rng.poisson(param, size=size)
+    if kind == 'geometric':
+        return rng.geometric(param, size=size)
+    if kind == 'bernoulli':
+        return (rng.random(size) < param).astype(np.int64)
+    raise ValueError(f"Unknown fan-out distribution: {kind}")
+
+
+def _edge_properties(rel_type: str, rng: np.random.Generator, size: int) -> List[Dict[str, Any]]:
+    """Relationship properties in the style of populate_data"""
+    if rel_type == 'PROVIDES':
+        since = rng.integers(1990, 2024, size=size).tolist()
+        volume = rng.integers(len(VOLUMES), size=size).tolist()
+        return [{'since': str(s), 'volume': VOLUMES[v]} for s, v in zip(since, volume)]
+    if rel_type == 'SUPPLIED_TO':
+        quantity = (rng.integers(1, 100, size=size) * 100).tolist()
+        unit = rng.integers(len(UNITS), size=size).tolist()
+        frequency = rng.integers(len(FREQUENCIES), size=size).tolist()
+        return [
+            {'quantity': f"{q} {UNITS[u]}", 'frequency': FREQUENCIES[f]}
+            for q, u, f in zip(quantity, unit, frequency)
+        ]
+    if rel_type == 'MANUFACTURES':
+        lead = rng.integers(15, 120, size=size).tolist()
+        batch = (rng.integers(1, 20, size=size) * 50).tolist()
+        return [{'lead_time': f"{d} days", 'batch_size': str(b)} for d, b in zip(lead, batch)]
+    if rel_type == 'PART_OF':
+        featured = (rng.random(size) < 0.2).tolist()
+        return [{'featured': 'Yes' if f else 'No'} for f in featured]
+    if rel_type == 'HAS_CERTIFICATION':
+        verified = (rng.random(size) < 0.95).tolist()
+        day = rng.integers(0, 5 * 365, size=size)
+        dates = np.datetime_as_string(np.datetime64('2019-01-01') + day).tolist()
+        return [{'verified': 'Yes' if v else 'No', 'verified_date': d} for v, d in zip(verified, dates)]
+    if rel_type == 'REQUIRES_CERTIFICATION':
+        active = (rng.random(size) < 0.9).tolist()
+        year = rng.integers(2024, 2028, size=size).tolist()
+        return [{'status': 'Active' if a else 'Expired', 'renewal_date': f"{y}-12-31"} for a, y in zip(active, year)]
+    return [{} for _ in range(size)]
+
+
+def generate_nodes(scale: float = 1.0, seed: int = 42) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Stream (label, properties) pairs for every synthetic node"""
+    sizes = scale_sizes(scale)
+    for stream, (label, builder) in enumerate(NODE_BUILDERS.items()):
+        for chunk, start, stop in _chunks(sizes[label]):
+            yield from builder(_rng(seed, stream, chunk), start, stop, sizes)
+
+
+def generate_relationships(scale: float = 1.0, seed: int = 42) -> Iterator[Tuple[str, str, str, Dict[str, Any]]]:
+    """Stream (from_id, to_id, rel_type, properties) tuples for every synthetic relationship"""
+    sizes = scale_sizes(scale)
+    for stream, (rel_type, source, target, driver, distribution, skew) in enumerate(EDGE_SPECS, len(NODE_BUILDERS)):
+        other = target if driver == source else source
+        other_count = sizes[other]
+        for chunk, start, stop in _chunks(sizes[driver]):
+            rng = _rng(seed, stream, chunk)
+            drivers = np.arange(start, stop, dtype=np.int64)
+            if distribution[0] == 'assigned':
+                partners = _assigned(drivers, other_count)
+            else:
+                drivers = np.repeat(drivers, _fan_out(rng, distribution, stop - start))
+                partners = (other_count * rng.random(len(drivers)) ** skew).astype(np.int64)
+                # One edge per (driver, partner) pair, ordered by driver
+                pairs = np.unique(drivers * other_count + partners)
+                drivers, partners = pairs // other_count, pairs % other_count
+            
+            properties = _edge_properties(rel_type, rng, len(drivers))
+            driver_ids = [node_id(driver, i) for i in drivers.tolist()]
+            other_ids = [node_id(other, i) for i in partners.tolist()]
+            if driver == source:
+                yield from zip(driver_ids, other_ids, [rel_type] * len(driver_ids), properties)
+            else:
+                yield from zip(other_ids, driver_ids, [rel_type] * len(driver_ids), properties)
+
+
+def _batches(items, batch_size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def populate_synthetic_data(db: GraphDatabase, scale: float = 1.0, seed: int = 42,
+                            batch_size: int = 100000, quiet: bool = False) -> GraphDatabase:
+    """Replace the database contents with a synthetic supply chain graph.
+    
+    Nodes and relationships are generated lazily and loaded through bulk_load
+    in batches of batch_size, so only one batch of raw records is held at a time.
+    """
+    db.clear()
+    create_default_indexes(db)
+    
+    start = time.perf_counter()
+    for batch in _batches(generate_nodes(scale, seed), batch_size):
+        db.bulk_load(batch)
+        if not quiet:
+            print(f"  ✓ Loaded {db.count_nodes():,} nodes")
+    for batch in _batches(generate_relationships(scale, seed), batch_size):
+        db.bulk_load(relationships=batch)
+        if not quiet:
+            print(f"  ✓ Loaded {db.count_relationships():,} relationships")
+    
+    if not quiet:
+        schema = db.get_schema()
+        print(f"\n✅ Synthetic graph generated in {time.perf_counter() - start:.1f}s (scale={scale}, seed={seed})")
+        print(f"   - Total nodes: {schema['node_count']:,}")
+        print(f"   - Total relationships: {schema['relationship_count']:,}")
+    return db
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic supply chain graph")
+    parser.add_argument('--scale', type=float, default=1.0, help="scale factor (1 = ~1,000 nodes)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=100000)
+    parser.add_argument('--snapshot', help="write a binary snapshot to this path")
+    parser.add_argument('--jsonl', help="export JSON Lines to this path (.gz for gzip)")
+    args = parser.parse_args()
+    
+    db = populate_synthetic_data(GraphDatabase(), args.scale, args.seed, args.batch_size)
+    if args.snapshot:
+        db.freeze().save(args.snapshot)
+        print(f"\n💾 Snapshot written to: {args.snapshot}")
+    if args.jsonl:
+        db.export_jsonl(args.jsonl)
+        print(f"\n💾 JSON Lines written to: {args.jsonl}")
@@ -0,0 +1,103 @@
+import pytest
+
+from answer_cache import AnswerCache
+from benchmark import FakeLLM
+from graph_database import GraphDatabase
+from graph_rag_engine import GraphRAGEngine
+from plan_cache import PlanCache
+from populate_data import populate_supply_chain_data
+from semantic_cache import SemanticCache
+
+QUESTION = "Which suppliers in Italy provide our materials?"
+
+
+@pytest.fixture
+def db():
+    db = GraphDatabase()
+    populate_supply_chain_data(db, quiet=True)
+    return db
+
+
+@pytest.fixture
+def engine(db):
+    return GraphRAGEngine(db, llm=FakeLLM(), rule_planner=False)
+
+
+def test_repeated_question_hits_plan_and_answer_cache(engine):
+    first = engine.query(QUESTION)
+    second = engine.query(QUESTION)
+    assert (first['plan_source'], first['answer_cached']) == ('llm', False)
+    assert (second['plan_source'], second['answer_cached']) == ('cache', True)
+    assert second['answer'] == first['answer']
+    assert engine.llm.calls == 2
+
+
+def test_plan_cache_dropped_when_schema_changes(engine, db):
+    engine.query(QUESTION)
+    db.create_node('Warehouse', {'name': 'Depot'})
+    assert engine.query(QUESTION)['plan_source'] == 'llm'
+
+
+def test_answer_cache_invalidated_by_update_of_a_result_node(engine, db):
+    result = engine.query(QUESTION)
+    result_ids = {row['id'] for row in result['raw_results']}
+    unrelated = next(node['id'] for node in db.get_all_nodes('Product') if node['id'] not in result_ids)
+    
+    db.update_node(unrelated, {'price_eur': '1'})
+    assert engine.query(QUESTION)['answer_cached'] is True
+    
+    supplier_id = next(iter(result_ids))
+    db.update_node(supplier_id, {'employees': '1'})
+    after = engine.query(QUESTION)
+    assert after['answer_cached'] is False
+    assert engine.answer_cache.stats()['invalidations'] >= 1
+
+
+def test_answer_cache_invalidation_by_node():
+    cache = AnswerCache()
+    cache.put('q', '[1]', 'answer one', ['A', 'B'])
+    cache.put('q', '[2]', 'answer two', ['C'])
+    cache.invalidate(['B'])
+    assert cache.get('q', '[1]') is None
+    assert cache.get('q', '[2]') == 'answer two'
+    cache.invalidate(None)
+    assert cache.get('q', '[2]') is None
+
+
+def test_plan_cache_keyed_by_normalized_question_and_fingerprint():
+    cache = PlanCache()
+    cache.put('Which  suppliers?', 'f1', {'intent': 'x'})
+    assert cache.get('which suppliers', 'f1') == {'intent': 'x'}
+    assert cache.get('which suppliers', 'f2') is None
+    cache.retain('f2')
+    assert cache.get('which suppliers', 'f1') is None
+
+
+def test_semantic_cache_matches_paraphrases_only():
+    cache = SemanticCache()
+    cache.add("Which suppliers in Italy provide leather?", 'f', {'intent': 'italy'})
+    match = cache.lookup("which leather suppliers provide in Italy", 'f')
+    assert match is not None and match['plan'] == {'intent': 'italy'}
+    assert cache.lookup("Which suppliers in Spain provide leather?", 'f') is None
+    assert cache.lookup("which leather suppliers provide in Italy", 'other') is None
+    cache.retain('other')
+    assert cache.stats()['size'] == 0
+
+
+def test_semantic_match_reuses_plan_in_engine(db):
+    engine = GraphRAGEngine(db, llm=FakeLLM(), rule_planner=False, semantic_cache=SemanticCache())
+    engine.query(QUESTION)
+    paraphrase = engine.query("which suppliers provide our materials in italy")
+    assert paraphrase['plan_source'] == 'semantic'
+    assert paraphrase['answer_cached'] is True
+    assert engine.llm.calls == 2
+
+
+def test_close_unregisters_engine_listeners(db):
+    before = list(db._listeners)
+    with GraphRAGEngine(db, llm=FakeLLM()) as engine:
+        assert len(db._listeners) == len(before) + 3
+        engine.query(QUESTION)
+    assert db._listeners == before
+    db.update_node('SUP001', {'name': 'Renamed'})
+    assert engine.answer_cache.stats()['invalidations'] == 0
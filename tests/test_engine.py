@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from answer_cache import AnswerCache
+from benchmark import QUESTIONS, FakeLLM
+from graph_database import GraphDatabase
+from graph_rag_engine import GraphRAGEngine
+from populate_data import populate_supply_chain_data
+
+
+class StubLLM(FakeLLM):
+    """FakeLLM whose async calls take longer for earlier questions and fail on a marker word"""
+    
+    async def ainvoke(self, messages):
+        prompt = messages[-1].content
+        if 'explode' in prompt:
+            raise RuntimeError("model unavailable")
+        delays = [0.02 * (len(QUESTIONS) - i) for i, question in enumerate(QUESTIONS) if question in prompt]
+        await asyncio.sleep(max(delays, default=0))
+        return self._reply(messages)
+
+
+@pytest.fixture
+def db():
+    db = GraphDatabase()
+    populate_supply_chain_data(db, quiet=True)
+    return db
+
+
+def _engine(db, llm=None, **kwargs):
+    return GraphRAGEngine(db, llm=llm or FakeLLM(), rule_planner=False, **kwargs)
+
+
+def _without_timings(result):
+    return {key: value for key, value in result.items() if key != 'timings_ms'}
+
+
+def test_aquery_many_keeps_question_order_and_matches_query(db):
+    expected = [_without_timings(_engine(db).query(question)) for question in QUESTIONS]
+    results = asyncio.run(_engine(db, StubLLM()).aquery_many(QUESTIONS, concurrency=len(QUESTIONS)))
+    assert [_without_timings(result) for result in results] == expected
+
+
+def test_aquery_many_failures(db):
+    questions = [QUESTIONS[0], "Why does the planner explode?", QUESTIONS[1]]
+    with pytest.raises(RuntimeError):
+        asyncio.run(_engine(db, StubLLM()).aquery_many(questions))
+    
+    results = asyncio.run(_engine(db, StubLLM()).aquery_many(questions, return_exceptions=True))
+    assert isinstance(results[1], RuntimeError)
+    assert [result['question'] for result in (results[0], results[2])] == [QUESTIONS[0], QUESTIONS[1]]
+    
+    with pytest.raises(ValueError):
+        asyncio.run(_engine(db).aquery_many(questions, concurrency=0))
+
+
+@pytest.mark.parametrize('repeats, answer_cache_size', [(1, 1024), (2, 1024), (2, 0)])
+def test_query_stream_events_and_result_match_query(db, repeats, answer_cache_size):
+    question = QUESTIONS[0]
+    expected_engine = _engine(db, answer_cache=AnswerCache(maxsize=answer_cache_size))
+    streaming_engine = _engine(db, answer_cache=AnswerCache(maxsize=answer_cache_size))
+    for _ in range(repeats):
+        expected = expected_engine.query(question)
+        events = list(streaming_engine.query_stream(question))
+    
+    kinds = [event['type'] for event in events]
+    tokens = kinds.count('token')
+    assert kinds == ['plan', 'results'] + ['token'] * tokens + ['done']
+    assert tokens == (1 if expected['answer_cached'] else len(expected['answer'].split()))
+    assert expected['answer_cached'] == (repeats > 1 and answer_cache_size > 0)
+    assert events[0]['plan_source'] == expected['plan_source'] == ('cache' if repeats > 1 else 'llm')
+    assert ''.join(event['text'] for event in events if event['type'] == 'token') == expected['answer']
+    
+    result = events[-1]['result']
+    assert 'first_token' in result['timings_ms']
+    assert _without_timings(result) == _without_timings(expected)
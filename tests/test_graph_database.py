@@ -0,0 +1,182 @@
+import json
+
+import pytest
+
+from graph_database import GraphDatabase
+
+
+@pytest.fixture
+def db():
+    db = GraphDatabase()
+    first = db.create_node('Foo', {'name': 'first'})
+    second = db.create_node('Foo', {'name': 'second'})
+    bar = db.create_node('Bar', {'id': 'BAR1', 'name': 'bar'})
+    db.create_relationship(first, bar, 'LINKS')
+    db.create_relationship(second, bar, 'LINKS')
+    return db
+
+
+def test_match_by_generated_id(db):
+    assert db.execute_cypher('MATCH (n:Foo {id: "Foo_0"}) RETURN n') == [{'n': {'id': 'Foo_0', 'name': 'first'}}]
+    assert db.execute_cypher('MATCH (n:Foo {id: $id}) RETURN n', {'id': 'Foo_1'}) == [
+        {'n': {'id': 'Foo_1', 'name': 'second'}}]
+    assert db.execute_cypher('MATCH (n:Foo) WHERE n.id = "Foo_1" RETURN n') == [{'n': {'id': 'Foo_1', 'name': 'second'}}]
+
+
+def test_match_by_id_respects_label(db):
+    assert db.execute_cypher('MATCH (n:Bar {id: "Foo_0"}) RETURN n') == []
+    assert db.execute_cypher('MATCH (n:Foo {id: "missing"}) RETURN n') == []
+
+
+def test_match_by_id_inside_path(db):
+    rows = db.execute_cypher('MATCH (f:Foo {id: "Foo_1"})-[:LINKS]->(b:Bar {id: "BAR1"}) RETURN f, b')
+    assert [(row['f']['id'], row['b']['id']) for row in rows] == [('Foo_1', 'BAR1')]
+
+
+def test_comma_separated_patterns_are_a_cartesian_product(db):
+    rows = db.execute_cypher('MATCH (f:Foo), (b:Bar) RETURN f, b')
+    assert sorted((row['f']['id'], row['b']['id']) for row in rows) == [('Foo_0', 'BAR1'), ('Foo_1', 'BAR1')]
+    assert db.execute_cypher('MATCH (f:Foo), (m:Missing) RETURN f') == []
+
+
+def test_comma_separated_patterns_join_on_shared_variables(db):
+    rows = db.execute_cypher('MATCH (f:Foo)-[:LINKS]->(b:Bar), (g:Foo)-[:LINKS]->(b) RETURN f, g')
+    assert sorted((row['f']['id'], row['g']['id']) for row in rows) == [
+        ('Foo_0', 'Foo_0'), ('Foo_0', 'Foo_1'), ('Foo_1', 'Foo_0'), ('Foo_1', 'Foo_1')]
+
+
+@pytest.mark.parametrize('name', ['SKIP 1', 'LIMIT 0', 'x AND n.name = "first"', 'RETURN n'])
+def test_keywords_inside_quoted_strings_are_literal(db, name):
+    node_id = db.create_node('Foo', {'name': name})
+    for query in (f"MATCH (n:Foo) WHERE n.name = '{name}' RETURN n",
+                  f"MATCH (n:Foo {{name: '{name}'}}) RETURN n"):
+        assert db.execute_cypher(query) == [{'n': {'id': node_id, 'name': name}}]
+    rows = db.execute_cypher(f"MATCH (n:Foo) WHERE n.name <> '{name}' AND n.name <> 'first' RETURN n SKIP 0 LIMIT 5")
+    assert [row['n']['name'] for row in rows] == ['second']
+
+
+def test_unparseable_pattern_raises(db):
+    with pytest.raises(ValueError):
+        db.execute_cypher('MATCH (f:Foo)~~(b) RETURN f')
+
+
+def _contents(db):
+    return (dict(db.nodes.items()), list(db.relationships), db.get_schema(), db.list_indexes(), db.node_counter)
+
+
+@pytest.fixture
+def supply_chain():
+    from populate_data import populate_supply_chain_data
+    db = GraphDatabase()
+    populate_supply_chain_data(db, quiet=True)
+    return db
+
+
+def test_bulk_load_rejects_dangling_endpoint_and_leaves_database_unchanged(supply_chain):
+    before = _contents(supply_chain)
+    with pytest.raises(ValueError):
+        supply_chain.bulk_load(
+            [('Supplier', {'id': 'SUP_NEW', 'name': 'New'})],
+            [('SUP_NEW', 'MAT001', 'PROVIDES'), ('SUP_NEW', 'NO_SUCH_NODE', 'PROVIDES')]
+        )
+    assert _contents(supply_chain) == before
+    assert supply_chain.lookup_nodes('Supplier', 'name', 'New') == []
+
+
+def test_bulk_load_indexes_new_nodes(supply_chain):
+    supply_chain.bulk_load([('Supplier', {'id': 'SUP_NEW', 'name': 'New'})], [('SUP_NEW', 'MAT001', 'PROVIDES')])
+    assert supply_chain.lookup_nodes('Supplier', 'name', 'New') == ['SUP_NEW']
+    assert supply_chain.neighbours('SUP_NEW', 'PROVIDES') == ['MAT001']
+
+
+@pytest.mark.parametrize('frozen', [False, True])
+def test_get_all_relationships_returns_plain_records(supply_chain, frozen):
+    db = supply_chain.freeze() if frozen else supply_chain
+    relationships = db.get_all_relationships()
+    assert type(relationships) is list
+    assert json.loads(json.dumps(relationships)) == list(supply_chain.relationships)
+    assert db.get_all_relationships('PROVIDES') == [rel for rel in relationships if rel['type'] == 'PROVIDES']
+
+
+def test_listeners_can_skip_relationship_changes(supply_chain):
+    every, nodes_only = [], []
+    supply_chain.add_listener(every.append)
+    supply_chain.add_listener(nodes_only.append, relationships=False)
+    supply_chain.create_relationship('SUP001', 'MAT002', 'PROVIDES')
+    supply_chain.update_node('SUP001', {'name': 'Renamed'})
+    supply_chain.remove_listener(every.append)
+    supply_chain.clear()
+    assert every == [['SUP001', 'MAT002'], ['SUP001']]
+    assert nodes_only == [['SUP001'], None]
+
+
+def test_json_round_trip(supply_chain, tmp_path):
+    path = str(tmp_path / 'graph.json')
+    supply_chain.export_to_json(path)
+    loaded = GraphDatabase()
+    loaded.import_from_json(path)
+    # The JSON format predates secondary indexes and does not record them
+    assert _contents(loaded)[:3] == _contents(supply_chain)[:3]
+    assert loaded.node_counter == supply_chain.node_counter
+
+
+@pytest.mark.parametrize('filename', ['graph.jsonl', 'graph.jsonl.gz'])
+def test_jsonl_round_trip(supply_chain, tmp_path, filename):
+    path = str(tmp_path / filename)
+    supply_chain.export_jsonl(path, batch_size=7)
+    loaded = GraphDatabase()
+    loaded.import_jsonl(path, batch_size=5)
+    assert _contents(loaded) == _contents(supply_chain)
+    assert loaded.lookup_nodes('Supplier', 'name', 'Tuscany Leather Consortium') == ['SUP001']
+
+
+def _brute_force(db, hops, first_label):
+    """Every (start, end) of paths matching hops [(rel_type, min, max)], no edge used twice"""
+    edges = list(enumerate(db.relationships))
+    results = []
+    
+    def walk(node, k, count, used, start):
+        rel_type, low, high = hops[k]
+        if count >= low:
+            if k + 1 == len(hops):
+                results.append((start, node))
+            else:
+                walk(node, k + 1, 0, used, start)
+        if high is not None and count >= high:
+            return
+        for e, rel in edges:
+            if e not in used and rel['from'] == node and rel['type'] == rel_type:
+                walk(rel['to'], k, count + 1, used | {e}, start)
+    
+    for node_id, node in db.nodes.items():
+        if node['label'] == first_label:
+            walk(node_id, 0, 0, frozenset(), node_id)
+    return sorted(results)
+
+
+@pytest.mark.parametrize('pattern, hops', [
+    ('-[:PROVIDES]->(m)-[:SUPPLIED_TO]->', [('PROVIDES', 1, 1), ('SUPPLIED_TO', 1, 1)]),
+    ('-[:PROVIDES]->(m)-[:SUPPLIED_TO]->(f)-[:MANUFACTURES]->',
+     [('PROVIDES', 1, 1), ('SUPPLIED_TO', 1, 1), ('MANUFACTURES', 1, 1)]),
+    ('-[:FEEDS*1..3]->', [('FEEDS', 1, 3)]),
+    ('-[:FEEDS*0..2]->', [('FEEDS', 0, 2)]),
+    ('-[:FEEDS*]->', [('FEEDS', 1, None)]),
+    ('-[:FEEDS*2]->(x)-[:PROVIDES]->', [('FEEDS', 2, 2), ('PROVIDES', 1, 1)]),
+])
+def test_match_paths_agree_with_brute_force(pattern, hops):
+    import random
+    rng = random.Random(7)
+    db = GraphDatabase()
+    suppliers = [db.create_node('Supplier', {'name': f's{i}'}) for i in range(8)]
+    materials = [db.create_node('Material', {'name': f'm{i}'}) for i in range(6)]
+    factories = [db.create_node('Factory', {'name': f'f{i}'}) for i in range(4)]
+    products = [db.create_node('Product', {'name': f'p{i}'}) for i in range(5)]
+    for sources, targets, rel_type, count in ((suppliers, suppliers, 'FEEDS', 14),
+                                              (suppliers, materials, 'PROVIDES', 12),
+                                              (materials, factories, 'SUPPLIED_TO', 10),
+                                              (factories, products, 'MANUFACTURES', 8)):
+        for _ in range(count):
+            db.create_relationship(rng.choice(sources), rng.choice(targets), rel_type)
+    
+    rows = db.execute_cypher(f'MATCH (s:Supplier){pattern}(t) RETURN s, t')
+    assert sorted((row['s']['id'], row['t']['id']) for row in rows) == _brute_force(db, hops, 'Supplier')
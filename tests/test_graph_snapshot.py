@@ -0,0 +1,90 @@
+import pytest
+
+from graph_database import GraphDatabase
+from graph_snapshot import GraphSnapshot
+from populate_data import populate_supply_chain_data
+from query_filters import CompiledFilters
+from synthetic_data import populate_synthetic_data
+
+
+@pytest.fixture(scope='module')
+def db():
+    db = GraphDatabase()
+    populate_supply_chain_data(db, quiet=True)
+    return db
+
+
+def _assert_same_graph(db, snapshot):
+    assert snapshot.get_all_nodes() == db.get_all_nodes()
+    assert list(snapshot.relationships) == list(db.relationships)
+    assert snapshot.get_schema() == db.get_schema()
+    assert snapshot.list_indexes() == db.list_indexes()
+    for node_id in db.nodes:
+        assert snapshot.out_edges(node_id) == db.out_edges(node_id)
+        assert snapshot.in_edges(node_id) == db.in_edges(node_id)
+        assert snapshot.neighbours(node_id, direction='both') == db.neighbours(node_id, direction='both')
+
+
+def test_freeze_matches_database(db):
+    _assert_same_graph(db, db.freeze())
+
+
+def test_save_and_mmap_load_round_trip(db, tmp_path):
+    path = str(tmp_path / 'graph.snap')
+    db.freeze().save(path)
+    loaded = GraphSnapshot.load(path)
+    _assert_same_graph(db, loaded)
+    for index in db.list_indexes():
+        for value in db.get_index(index['label'], index['property']).values():
+            assert sorted(loaded.lookup_nodes(index['label'], index['property'], value)) == \
+                sorted(db.lookup_nodes(index['label'], index['property'], value))
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.snap'
+    path.write_bytes(b'not a snapshot at all')
+    with pytest.raises(ValueError):
+        GraphSnapshot.load(str(path))
+
+
+def test_neighbourhoods_match_per_node_edges(db):
+    snapshot = db.freeze()
+    node_ids = [node['id'] for node in db.get_all_nodes()] + ['missing']
+    for rel_type in (None, ['PROVIDES', 'SUPPLIED_TO']):
+        expected = db.neighbourhoods(node_ids, rel_type)
+        assert snapshot.neighbourhoods(node_ids, rel_type) == expected
+        assert 'missing' not in expected
+        for node_id, grouped in expected.items():
+            assert [(rel['type'], rel['to']) for rel in db.out_edges(node_id, rel_type)] == \
+                [(rel_type_, to_id) for rel_type_, to_id, _, _ in grouped['outgoing']]
+
+
+@pytest.mark.parametrize('filters', [
+    {'category': 'bag'},
+    {'category': 'BAG', 'made_in': 'italy'},
+    {'price_eur': {'gte': '1000', 'lt': '2000'}},
+    {'made_in': ''},
+    {'no_such_property': 'x'},
+])
+def test_select_nodes_matches_plain_scan(filters):
+    db = populate_synthetic_data(GraphDatabase(), 2, 42, quiet=True)
+    compiled = CompiledFilters(filters)
+    expected = [node for node in db.get_all_nodes('Product') if compiled.matches(node)]
+    assert compiled.select(db.freeze(), 'Product') == expected
+
+
+def test_get_nodes_keeps_order_and_skips_unknown_ids(db):
+    snapshot = db.freeze()
+    node_ids = [node['id'] for node in db.get_all_nodes()][::-3] + ['missing']
+    assert snapshot.get_nodes(node_ids) == db.get_nodes(node_ids)
+    assert snapshot.get_nodes([]) == []
+
+
+def test_first_node_and_relationship_match_full_listings(db):
+    for graph in (db, db.freeze()):
+        for label in graph.get_schema()['node_labels']:
+            assert graph.first_node(label) == graph.get_all_nodes(label)[0]
+        for rel_type in graph.get_schema()['relationship_types']:
+            assert graph.first_relationship(rel_type) == graph.get_all_relationships(rel_type)[0]
+        assert graph.first_node('Missing') is None
+        assert graph.first_relationship('MISSING') is None
@@ -0,0 +1,45 @@
+import pytest
+
+from graph_database import GraphDatabase
+from lineage import LineageView, build_trace
+from populate_data import populate_supply_chain_data
+
+
+@pytest.fixture
+def db():
+    db = GraphDatabase()
+    populate_supply_chain_data(db, quiet=True)
+    return db
+
+
+def test_view_matches_fresh_build(db):
+    view = LineageView(db)
+    for product in db.get_all_nodes('Product'):
+        assert view.get(product['id']) == build_trace(db, product['id'])[0]
+    assert view.get('missing') is None
+
+
+def test_returned_traces_can_be_modified(db):
+    view = LineageView(db)
+    expected = build_trace(db, 'PROD001')[0]
+    for _ in range(2):  # the first read builds the trace, the second is a hit
+        trace = view.get('PROD001')
+        trace['product']['name'] = 'changed'
+        trace['materials'][0]['suppliers'].clear()
+        trace['suppliers'].append({'id': 'SUP999'})
+    assert view.get('PROD001') == expected
+    assert view.stats()['hits'] == 2
+
+
+def test_new_relationship_rebuilds_touched_traces_only(db):
+    view = LineageView(db)
+    view.materialize()
+    material = view.get('PROD001')['materials'][0]['name']
+    material_id = next(node['id'] for node in db.get_all_nodes('Material') if node['name'] == material)
+    supplier_id = db.create_node('Supplier', {'name': 'Siena Tannery', 'location': 'Siena, Italy'})
+    db.create_relationship(supplier_id, material_id, 'PROVIDES')
+    
+    trace = view.get('PROD001')
+    assert 'Siena Tannery' in [supplier['name'] for supplier in trace['suppliers']]
+    assert trace == build_trace(db, 'PROD001')[0]
+    assert 0 < view.stats()['invalidations'] < len(db.get_all_nodes('Product'))
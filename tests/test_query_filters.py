@@ -0,0 +1,44 @@
+import pytest
+
+from graph_database import GraphDatabase
+from query_filters import VECTORIZE_MIN_ROWS, CompiledFilters
+
+
+def _products(rows, kind=None):
+    db = GraphDatabase()
+    for n in range(rows):
+        properties = {'name': f'p{n}', 'size': {'w': n % 2}}
+        if n % 2 == 0:
+            properties['category'] = 'bag' if n % 4 == 0 else 'shoe'
+        db.create_node('Product', properties)
+    if kind:
+        db.create_index('Product', 'category', kind)
+    return db
+
+
+@pytest.mark.parametrize('rows', [4, VECTORIZE_MIN_ROWS])
+@pytest.mark.parametrize('kind', [None, 'hash', 'sorted'])
+@pytest.mark.parametrize('filters', [
+    {'category': ''},
+    {'category': 'bag'},
+    {'category': {'lt': 'c'}},
+    {'category': {'gte': 'c'}},
+    {'size': {'w': 1}},
+    {'size': {}},
+])
+def test_select_does_not_depend_on_indexes(rows, kind, filters):
+    db = _products(rows, kind)
+    compiled = CompiledFilters(filters)
+    expected = [node['name'] for node in _products(rows).get_all_nodes('Product') if compiled.matches(node)]
+    assert [node['name'] for node in compiled.select(db, 'Product')] == expected
+    assert [node['name'] for node in compiled.select(db.freeze(), 'Product')] == expected
+
+
+def test_only_bound_dicts_are_ranges():
+    assert CompiledFilters({'price': {'gte': 1, 'lt': 5}}).tests == [('price', 'range', {'gte': 1, 'lt': 5})]
+    assert CompiledFilters({'size': {'w': 1}}).tests == [('size', 'equals', {'w': 1})]
+    assert CompiledFilters({'size': {}}).tests == [('size', 'equals', {})]
+    compiled = CompiledFilters({'size': {'w': 1}})
+    assert compiled.matches({'size': {'w': 1}})
+    assert not compiled.matches({'size': {'w': 2}})
+    assert not compiled.matches({})
@@ -0,0 +1,48 @@
+import json
+
+from result_packer import ResultPacker
+
+PLAN = {'entities': ['Supplier'], 'filters': {'location': 'Italy'}, 'return_fields': ['name', 'location']}
+QUESTION = "Which suppliers in Italy provide leather?"
+
+
+def _suppliers(count, notes=''):
+    return [
+        {'id': f'SUP{n:04d}', 'name': f'Supplier {n}', 'location': 'Florence, Italy' if n % 3 else 'Lyon, France',
+         'established': str(1900 + n % 100), 'notes': notes}
+        for n in range(count)
+    ]
+
+
+def _rows(text):
+    return json.loads(text.split('\n', 1)[0])
+
+
+def test_results_under_budget_pass_through():
+    rows = _suppliers(5)
+    text, report = ResultPacker(token_budget=4000).pack(QUESTION, PLAN, rows)
+    assert sorted(_rows(text), key=lambda row: row['id']) == rows
+    assert (report['rows'], report['truncated_rows'], report['stripped']) == (5, 0, False)
+    assert report['estimated_tokens'] <= 4000
+    assert ResultPacker(token_budget=None).pack(QUESTION, PLAN, rows)[0] == json.dumps(rows, separators=(',', ':'))
+
+
+def test_results_over_budget_are_cut_and_counted():
+    rows = _suppliers(500, notes='long unrelated commentary ' * 5)
+    text, report = ResultPacker(token_budget=500).pack(QUESTION, PLAN, rows)
+    kept = _rows(text)
+    assert 0 < report['rows'] == len(kept) < len(rows)
+    assert report['truncated_rows'] == len(rows) - len(kept)
+    assert text.endswith(f"({report['truncated_rows']} more of {len(rows)} results omitted to fit the token budget)")
+    assert report['estimated_tokens'] <= 500
+    # Unreferenced properties go first, and rows from Italy rank ahead of the rest
+    assert report['stripped'] and all('notes' not in row and 'Italy' in row['location'] for row in kept)
+
+
+def test_single_oversized_record():
+    rows = [{'id': 'SUP0001', 'name': 'Supplier ' * 1000, 'location': 'Florence, Italy'}]
+    text, report = ResultPacker(token_budget=100).pack(QUESTION, PLAN, rows)
+    assert _rows(text) == []
+    assert (report['rows'], report['truncated_rows']) == (0, 1)
+    assert text.endswith("(1 more of 1 results omitted to fit the token budget)")
+    assert report['estimated_tokens'] <= 100
@@ -0,0 +1,62 @@
+import pytest
+
+from graph_database import GraphDatabase
+from populate_data import populate_supply_chain_data
+from rule_planner import RulePlanner
+
+
+@pytest.fixture
+def db():
+    db = GraphDatabase()
+    populate_supply_chain_data(db, quiet=True)
+    return db
+
+
+@pytest.mark.parametrize('question, label, filters', [
+    ("List all suppliers in Florence", 'Supplier', {'location': 'Florence'}),
+    ("Show me all handbag products", 'Product', {'category': 'Handbag'}),
+    ("Which factories are in Italy?", 'Factory', {'country': 'Italy'}),
+    ("Collections from 2024", 'Collection', {'year': '2024'}),
+    ("List all suppliers", 'Supplier', {}),
+])
+def test_recognized_questions(db, question, label, filters):
+    plan = RulePlanner(db).plan(question)
+    assert plan['entities'] == [label]
+    assert plan['filters'] == filters
+    assert plan['relationships'] == []
+
+
+@pytest.mark.parametrize('question', [
+    "Which suppliers in Florence have the best prices?",
+    "Who supplies the leather for the 2024 collection?",
+    "Which suppliers in Atlantis?",
+])
+def test_questions_with_unexplained_words_are_left_to_the_llm(db, question):
+    assert RulePlanner(db).plan(question) is None
+
+
+def test_new_nodes_extend_the_gazetteer(db):
+    planner = RulePlanner(db)
+    assert planner.plan("List all suppliers in Atlantis") is None
+    db.create_node('Supplier', {'id': 'SUP_ATL', 'name': 'Deep Sea Leather', 'location': 'Atlantis'})
+    assert planner.plan("List all suppliers in Atlantis")['filters'] == {'location': 'Atlantis'}
+
+
+def test_updated_values_replace_old_ones(db):
+    planner = RulePlanner(db)
+    assert planner.plan("List all suppliers in Florence")['filters'] == {'location': 'Florence'}
+    for node in db.get_all_nodes('Supplier'):
+        if 'Florence' in node['location']:
+            db.update_node(node['id'], {'location': 'Siena, Italy'})
+    assert planner.plan("List all suppliers in Florence") is None
+    assert planner.plan("List all suppliers in Siena")['filters'] == {'location': 'Siena'}
+
+
+def test_new_relationships_keep_the_gazetteers(db):
+    planner = RulePlanner(db)
+    planner.plan("List all suppliers in Florence")
+    gazetteer = planner._gazetteers['Supplier']
+    db.create_relationship('SUP001', 'MAT002', 'PROVIDES')
+    db.bulk_load(relationships=[('SUP002', 'MAT001', 'PROVIDES')])
+    assert planner.plan("List all suppliers in Florence")['filters'] == {'location': 'Florence'}
+    assert planner._gazetteers['Supplier'] is gazetteer